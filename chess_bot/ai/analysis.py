@@ -0,0 +1,327 @@
+"""
+Analysis Session Manager - runs analysis searches in background threads and
+queues their per-iteration results for streaming to the client. Identical
+requests made while a search runs share it.
+
+Unlike bot moves, analysis runs in the web process: its streams need every
+iteration's result as it completes, while the search executor's workers
+answer each job once. A search holds the GIL the web threads need, so a
+web process runs one analysis search at a time (MAX_ANALYSIS_SESSIONS);
+other analysis requests get a 503 until it ends, unless they ask for the
+same analysis and share it.
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from .engine.bot import Bot, MAX_MULTIPV
+
+
+# Fixed: every further search would take GIL time from the request threads
+MAX_ANALYSIS_SESSIONS = 1
+MAX_ANALYSIS_TIME_MS = int(os.environ.get('BOT_MAX_ANALYSIS_TIME_MS', '60000'))
+
+
+class AnalysisBotPool:
+    """
+    Idle analysis bots, reused between sessions: building a bot allocates
+    its transposition table, which takes over a second.
+    """
+    
+    def __init__(self, max_idle: int = MAX_ANALYSIS_SESSIONS):
+        self.idle = []
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        
+        # Metrics
+        self.bots_created = 0
+        self.bots_reused = 0
+    
+    def acquire(self) -> Bot:
+        """An idle bot, or a new one (built without holding the lock)"""
+        with self.lock:
+            if self.idle:
+                self.bots_reused += 1
+                return self.idle.pop()
+            self.bots_created += 1
+        bot = Bot(use_opening_book=False)
+        bot.ponder_enabled = False
+        return bot
+    
+    def release(self, bot: Bot):
+        """Return a bot whose search has finished"""
+        bot.searcher.cancel_token = None
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(bot)
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'idle': len(self.idle),
+                'created': self.bots_created,
+                'reused': self.bots_reused,
+            }
+
+
+class AnalysisSubscription:
+    """One client's view of an analysis: its own queue of the search's events"""
+    
+    def __init__(self, analysis_id: str, session: 'AnalysisSession'):
+        self.analysis_id = analysis_id
+        self.session = session
+        # (event, data) tuples; ('done', result) or ('error', message) is last
+        self.events = queue.Queue()
+
+
+class AnalysisSession:
+    """
+    A single analysis search, shared by every client that asked for the same
+    position, line count and time while it runs. Its events are copied to
+    each subscriber's queue.
+    """
+    
+    # Finished sessions nobody streamed are dropped after this long
+    FINISHED_TTL_SECONDS = 60
+    
+    def __init__(self, fen: str, multipv: int, time_ms: int, bot_pool: AnalysisBotPool):
+        self.fen = fen
+        self.multipv = multipv
+        self.time_ms = time_ms
+        # The search thread takes a bot from the pool for the search
+        self.bot_pool = bot_pool
+        self.cancel_token = threading.Event()
+        
+        self.subscribers: Dict[str, AnalysisSubscription] = {}
+        # Latest 'info' data, replayed to clients that join mid-search
+        self.last_info = None
+        self.final_event = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.finished_at = None
+        self.stop_requested = False
+    
+    @property
+    def key(self) -> tuple:
+        return analysis_key(self.fen, self.multipv, self.time_ms)
+    
+    def start(self):
+        """Start the search thread"""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Search thread body"""
+        bot = None
+        try:
+            bot = self.bot_pool.acquire()
+            # A stop that came in first ends the search straight away
+            bot.searcher.cancel_token = self.cancel_token
+            result = bot.analyse(
+                self.fen, self.multipv, self.time_ms,
+                on_info=lambda info: self._publish('info', info)
+            )
+            final_event = ('done', result)
+        except Exception as e:
+            final_event = ('error', {'error': str(e)})
+        finally:
+            # Back in the pool before anyone hears the search has finished
+            if bot is not None:
+                self.bot_pool.release(bot)
+        try:
+            self._publish(*final_event)
+        finally:
+            self.finished_at = time.time()
+    
+    def _publish(self, event: str, data: dict):
+        """Copy an event to every subscriber"""
+        with self.lock:
+            if event == 'info':
+                self.last_info = data
+            else:
+                self.final_event = (event, data)
+            for subscription in self.subscribers.values():
+                subscription.events.put((event, data))
+    
+    def subscribe(self, analysis_id: str) -> Optional[AnalysisSubscription]:
+        """
+        Attach a client. It first gets the latest iteration's info, then live
+        events. Returns None once the search has finished or is stopping.
+        """
+        with self.lock:
+            if self.final_event or self.stop_requested:
+                return None
+            subscription = AnalysisSubscription(analysis_id, self)
+            if self.last_info:
+                subscription.events.put(('info', self.last_info))
+            self.subscribers[analysis_id] = subscription
+            return subscription
+    
+    def unsubscribe(self, analysis_id: str, final_result: bool = False) -> int:
+        """
+        Detach a client, optionally ending its stream with the best result
+        so far. Returns the number of clients left.
+        """
+        with self.lock:
+            subscription = self.subscribers.pop(analysis_id, None)
+            if subscription and final_result and not self.final_event:
+                result = dict(self.last_info or {'depth': 0, 'nodes': 0, 'time_ms': 0, 'lines': []})
+                result['fen'] = self.fen
+                subscription.events.put(('done', result))
+            return len(self.subscribers)
+    
+    def stop(self):
+        """Stop the search; remaining streams still receive the final result"""
+        with self.lock:
+            self.stop_requested = True
+        self.cancel_token.set()
+        if self.thread:
+            self.thread.join()
+    
+    def is_running(self) -> bool:
+        """Started (or about to be) and not finished"""
+        return self.finished_at is None
+    
+    def is_stale(self) -> bool:
+        """Finished and not picked up for a while"""
+        return (self.finished_at is not None
+                and time.time() - self.finished_at > self.FINISHED_TTL_SECONDS)
+
+
+def analysis_key(fen: str, multipv: int, time_ms: int) -> tuple:
+    """Requests with the same key can share one search"""
+    return (' '.join(fen.split()), multipv, time_ms)
+
+
+class AnalysisManager:
+    """
+    Manages running analysis sessions. Concurrent requests for the same
+    analysis share one search (single-flight); each client gets its own
+    analysis_id and stream, and the search stops when its last client
+    stops or disconnects.
+    """
+    
+    def __init__(self):
+        self.subscriptions: Dict[str, AnalysisSubscription] = {}
+        # Sessions still accepting subscribers, by analysis key
+        self.inflight: Dict[tuple, AnalysisSession] = {}
+        self.lock = threading.Lock()
+        self.max_sessions = MAX_ANALYSIS_SESSIONS
+        self.bot_pool = AnalysisBotPool(MAX_ANALYSIS_SESSIONS)
+        
+        # Metrics
+        self.searches_started = 0
+        self.coalesced_requests = 0
+    
+    def start_analysis(self, fen: str, multipv: int = 1, time_ms: int = 5000) -> Optional[str]:
+        """
+        Start analysing a position, or join a running analysis of it.
+        Returns: analysis_id, or None if too many analyses are running
+        """
+        multipv = max(1, min(int(multipv), MAX_MULTIPV))
+        time_ms = max(1, min(int(time_ms), MAX_ANALYSIS_TIME_MS))
+        key = analysis_key(fen, multipv, time_ms)
+        analysis_id = str(uuid.uuid4())
+        
+        with self.lock:
+            self._cleanup_stale_sessions()
+            
+            session = self.inflight.get(key)
+            subscription = session.subscribe(analysis_id) if session else None
+            if subscription:
+                self.subscriptions[analysis_id] = subscription
+                self.coalesced_requests += 1
+                return analysis_id
+            
+            if self._running_sessions() >= self.max_sessions:
+                return None
+            
+            session = AnalysisSession(fen, multipv, time_ms, self.bot_pool)
+            self.subscriptions[analysis_id] = session.subscribe(analysis_id)
+            self.inflight[key] = session
+            self.searches_started += 1
+        
+        session.start()
+        return analysis_id
+    
+    def get_analysis(self, analysis_id: str) -> Optional[AnalysisSubscription]:
+        """Get a client's analysis subscription by ID"""
+        with self.lock:
+            return self.subscriptions.get(analysis_id)
+    
+    def stop_analysis(self, analysis_id: str) -> bool:
+        """
+        Stop a client's analysis (it stays available to stream its result).
+        The shared search only stops if no other client is following it.
+        """
+        subscription = self.get_analysis(analysis_id)
+        if not subscription:
+            return False
+        session = subscription.session
+        with self.lock:
+            others = len(session.subscribers) - (analysis_id in session.subscribers)
+            if others:
+                # Others still follow the search: end just this client's stream
+                session.unsubscribe(analysis_id, final_result=True)
+                return True
+            self._retire(session)
+        session.stop()
+        return True
+    
+    def remove_analysis(self, analysis_id: str):
+        """Forget a client's analysis; stop the search if nobody else follows it"""
+        with self.lock:
+            subscription = self.subscriptions.pop(analysis_id, None)
+            if not subscription:
+                return
+            session = subscription.session
+            if session.unsubscribe(analysis_id):
+                return
+            self._retire(session)
+        session.stop()
+    
+    def get_analysis_count(self) -> int:
+        """Get number of running analyses"""
+        with self.lock:
+            return self._running_sessions()
+    
+    def get_stats(self) -> dict:
+        """Analysis metrics"""
+        with self.lock:
+            return {
+                'running_analyses': self._running_sessions(),
+                'clients': len(self.subscriptions),
+                'searches_started': self.searches_started,
+                'coalesced_requests': self.coalesced_requests,
+                'bots': self.bot_pool.get_stats(),
+            }
+    
+    def _running_sessions(self) -> int:
+        """Distinct running searches (call with lock held)"""
+        sessions = {id(subscription.session): subscription.session
+                    for subscription in self.subscriptions.values()}
+        sessions.update((id(session), session) for session in self.inflight.values())
+        return sum(1 for session in sessions.values() if session.is_running())
+    
+    def _retire(self, session: AnalysisSession):
+        """Stop new requests joining a session (call with lock held)"""
+        if self.inflight.get(session.key) is session:
+            del self.inflight[session.key]
+    
+    def _cleanup_stale_sessions(self):
+        """Drop finished sessions and their unstreamed results (call with lock held)"""
+        for key, session in list(self.inflight.items()):
+            if session.final_event:
+                del self.inflight[key]
+        stale = [analysis_id for analysis_id, subscription in self.subscriptions.items()
+                 if subscription.session.is_stale()]
+        for analysis_id in stale:
+            del self.subscriptions[analysis_id]
+
+
+# Global analysis manager instance
+analysis_manager = AnalysisManager()
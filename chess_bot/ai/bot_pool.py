@@ -0,0 +1,225 @@
+"""
+Bot Pool - per-game Bot instances, kept warm (transposition table, history,
+ponder state) between a game's moves.
+Each search worker process has its own pool.
+
+Each bot holds well over 100 MB of search tables, so the pool is an LRU with
+a memory budget: making room evicts the least recently used idle bots, and
+bots unused for BOT_POOL_IDLE_SECONDS are released. Bots that are searching,
+pondering or serving a job are never evicted; the pool runs over budget
+rather than take a warm bot from an active game.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .engine.bot import Bot
+from .engine.strength import get_strength_profile
+
+
+POOL_MAX_BOTS = int(os.environ.get('BOT_POOL_MAX_BOTS', '100'))
+POOL_MEMORY_BUDGET_MB = int(os.environ.get('BOT_POOL_MEMORY_BUDGET_MB', '2048'))
+POOL_IDLE_SECONDS = int(os.environ.get('BOT_POOL_IDLE_SECONDS', '600'))
+# Build a bot when a search worker starts, so the first game doesn't wait
+# for its transposition table to be allocated
+POOL_SPARE_BOT = os.environ.get('BOT_POOL_SPARE_BOT', 'True') == 'True'
+
+# Fixed think time per difficulty when the client doesn't send a clock
+DIFFICULTY_THINK_TIME_MS = {
+    'easy': 500,
+    'medium': 2000,
+    'hard': 5000
+}
+
+
+class BotPool:
+    """Pool of bot instances for handling multiple games"""
+
+    # Idle bots are looked for at most this often
+    IDLE_CHECK_INTERVAL_SECONDS = 30
+
+    def __init__(self, max_bots: int = POOL_MAX_BOTS,
+                 memory_budget_mb: int = POOL_MEMORY_BUDGET_MB,
+                 idle_seconds: int = POOL_IDLE_SECONDS):
+        # game_id -> Bot, least recently used first
+        self.bots = OrderedDict()
+        self.max_bots = max(1, max_bots)  # Maximum concurrent games
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.idle_seconds = idle_seconds
+        self.last_used = {}  # game_id -> time
+        self.bot_bytes = {}  # game_id -> estimated memory
+        self.last_idle_check = time.time()
+        self.spare_bot = None
+        # Games with a bot_move job in progress. Their bots may be parked by
+        # the search scheduler, so other jobs must not wait on their threads.
+        self.active_games = set()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {'capacity': 0, 'memory': 0, 'idle': 0}
+        self.over_budget = 0
+
+    def get_bot(self, game_id: str, difficulty: str = 'medium') -> Bot:
+        """Get or create bot for game"""
+        self.evict_idle()
+        if game_id in self.bots:
+            self.hits += 1
+            self.bots.move_to_end(game_id)
+            self.last_used[game_id] = time.time()
+            return self.bots[game_id]
+
+        self.misses += 1
+        # Build the bot first so room is made for what it really holds
+        bot = self.spare_bot or Bot()
+        self.spare_bot = None
+        self._make_room(bot.memory_bytes())
+        bot.searcher.cancel_token = threading.Event()
+        
+        # Easy and medium play by node budget; think time is only a cap
+        bot.set_strength(get_strength_profile(difficulty))
+        if difficulty == 'easy':
+            bot.max_think_time_ms = 500
+            bot.use_max_think_time = True
+        elif difficulty == 'medium':
+            bot.max_think_time_ms = 2000
+            bot.use_max_think_time = True
+        elif difficulty == 'hard':
+            bot.max_think_time_ms = 5000
+            bot.use_max_think_time = False
+
+        self.bots[game_id] = bot
+        self.last_used[game_id] = time.time()
+        self.bot_bytes[game_id] = bot.memory_bytes()
+        return bot
+
+    def prepare_spare_bot(self):
+        """Build a bot ahead of time for the next new game"""
+        if self.spare_bot is None:
+            self.spare_bot = Bot()
+
+    def remove_bot(self, game_id: str):
+        """Remove bot from pool (an active job finishes without pondering)"""
+        bot = self.bots.pop(game_id, None)
+        self.last_used.pop(game_id, None)
+        self.bot_bytes.pop(game_id, None)
+        if bot and game_id not in self.active_games:
+            bot.stop_pondering()
+
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the pool's bots, the spare bot included"""
+        spare_bytes = self.spare_bot.memory_bytes() if self.spare_bot is not None else 0
+        return sum(self.bot_bytes.values()) + spare_bytes
+
+    def _is_evictable(self, game_id: str) -> bool:
+        return game_id not in self.active_games and not self.bots[game_id].is_busy()
+
+    def _make_room(self, incoming_bytes: int):
+        """Evict least recently used idle bots until one more bot fits"""
+        while self.bots:
+            if len(self.bots) >= self.max_bots:
+                reason = 'capacity'
+            elif self.memory_bytes() + incoming_bytes > self.memory_budget_bytes:
+                reason = 'memory'
+            else:
+                return
+            victim = next((game_id for game_id in self.bots if self._is_evictable(game_id)), None)
+            if victim is None:
+                # Every bot is busy: go over budget rather than stall a game
+                self.over_budget += 1
+                return
+            self.remove_bot(victim)
+            self.evictions[reason] += 1
+
+    def evict_idle(self):
+        """Release bots unused for idle_seconds (checked periodically)"""
+        now = time.time()
+        if now - self.last_idle_check < self.IDLE_CHECK_INTERVAL_SECONDS:
+            return
+        self.last_idle_check = now
+        idle = [game_id for game_id in self.bots
+                if now - self.last_used[game_id] > self.idle_seconds and self._is_evictable(game_id)]
+        for game_id in idle:
+            self.remove_bot(game_id)
+            self.evictions['idle'] += 1
+
+    def cancel_search(self, game_id: str):
+        """Stop a game's running search"""
+        bot = self.bots.get(game_id)
+        # Only while a job runs: a leftover cancel would stop the next move
+        if bot and game_id in self.active_games:
+            bot.stop_search()
+
+    def clear_cancel(self, game_id: str):
+        """Reset a game's cancel token once its job is over"""
+        bot = self.bots.get(game_id)
+        if bot:
+            bot.searcher.cancel_token.clear()
+
+    def stop_pondering(self, except_game_id: Optional[str] = None):
+        """Stop every ponder search except one game's, freeing the CPU for a real search"""
+        for game_id, bot in list(self.bots.items()):
+            if game_id != except_game_id and game_id not in self.active_games:
+                bot.stop_pondering()
+
+    def get_stats(self) -> dict:
+        """Pool size, memory and eviction metrics"""
+        lookups = self.hits + self.misses
+        return {
+            'bots': len(self.bots),
+            'max_bots': self.max_bots,
+            'busy_bots': sum(1 for game_id in list(self.bots) if not self._is_evictable(game_id)),
+            'memory_mb': round(self.memory_bytes() / (1024 * 1024), 1),
+            'memory_budget_mb': round(self.memory_budget_bytes / (1024 * 1024), 1),
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': dict(self.evictions),
+            'over_budget': self.over_budget,
+            'spare_bot': self.spare_bot is not None,
+            'idle_seconds': self.idle_seconds,
+        }
+
+
+CLOCK_FIELDS = ('white_time_ms', 'black_time_ms', 'white_increment_ms', 'black_increment_ms')
+
+
+def parse_clock(data: dict) -> dict:
+    """
+    The game clock fields present in a request, as ints.
+    Raises ValueError naming the field when one isn't a non-negative integer.
+    """
+    clock = {}
+    for field in CLOCK_FIELDS:
+        if field not in data:
+            continue
+        value = data[field]
+        # JSON numbers may arrive as floats; booleans are ints in Python
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{field} must be a non-negative integer")
+        clock[field] = value
+    return clock
+
+
+def choose_time_limits(bot: Bot, clock: Optional[dict], difficulty: str) -> tuple:
+    """
+    Get (soft_limit_ms, hard_limit_ms) for the bot's next search.
+    Uses the game clock when there is one
+    (white_time_ms, black_time_ms, white_increment_ms, black_increment_ms,
+    validated by parse_clock).
+    """
+    if clock and 'white_time_ms' in clock and 'black_time_ms' in clock:
+        return bot.choose_time_limits(
+            int(clock['white_time_ms']),
+            int(clock['black_time_ms']),
+            int(clock.get('white_increment_ms', 0)),
+            int(clock.get('black_increment_ms', 0))
+        )
+
+    # A fixed think time is the whole budget for the move, as before the
+    # soft/hard split: iterations may start until it is used up
+    time_ms = DIFFICULTY_THINK_TIME_MS.get(difficulty, 2000)
+    return time_ms, time_ms
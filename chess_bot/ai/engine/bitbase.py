@@ -0,0 +1,299 @@
+"""
+King and pawn vs king (KPK) bitbase.
+Generated by retrograde analysis on first use and cached to disk as a bit
+array with one win/draw bit per position, so KPK endings are scored
+exactly instead of searched.
+
+Positions are normalized so the pawn is white and on files a-d; the table
+is indexed by side to move, pawn square and both king squares.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+from .piece import Piece
+
+
+logger = logging.getLogger(__name__)
+
+# Scores for a won KPK position, relative to the side with the pawn.
+# Well below mate scores; the pawn rank term makes the search push the pawn.
+KNOWN_WIN_SCORE = 10000
+PAWN_RANK_BONUS = 20
+
+# Table layout: wk | bk << 6 | stm << 12 | pawn_index << 13
+NUM_PAWN_SQUARES = 24  # files a-d, ranks 2-7
+TABLE_SIZE = NUM_PAWN_SQUARES << 13
+
+BITBASE_MAGIC = b'KPKBB001'
+
+# Classification states used during generation
+INVALID = 0
+UNKNOWN = 1
+DRAW = 2
+WIN = 4
+
+WHITE_TO_MOVE = 0
+BLACK_TO_MOVE = 1
+
+
+def _king_moves(square):
+    """Squares a king on square can step to"""
+    file, rank = square % 8, square // 8
+    return [
+        (rank + dr) * 8 + file + df
+        for dr in (-1, 0, 1) for df in (-1, 0, 1)
+        if (dr or df) and 0 <= rank + dr < 8 and 0 <= file + df < 8
+    ]
+
+
+def _distance(a, b):
+    """Chebyshev (king move) distance between two squares"""
+    return max(abs(a % 8 - b % 8), abs(a // 8 - b // 8))
+
+
+KING_MOVES = [_king_moves(square) for square in range(64)]
+
+
+def _pawn_index(pawn_square):
+    """Index of a normalized pawn square (files a-d, ranks 2-7)"""
+    return (pawn_square % 8) * 6 + pawn_square // 8 - 1
+
+
+def _pawn_square(pawn_index):
+    return (pawn_index % 6 + 1) * 8 + pawn_index // 6
+
+
+def table_index(side_to_move, white_king, black_king, pawn_square):
+    """Table index of a normalized position"""
+    return white_king | (black_king << 6) | (side_to_move << 12) | (_pawn_index(pawn_square) << 13)
+
+
+def _pawn_attacks(pawn_square):
+    file = pawn_square % 8
+    attacks = set()
+    if file > 0:
+        attacks.add(pawn_square + 7)
+    if file < 7:
+        attacks.add(pawn_square + 9)
+    return attacks
+
+
+def _initial_state(side_to_move, white_king, black_king, pawn_square):
+    """Classify positions that don't depend on their successors"""
+    if (_distance(white_king, black_king) <= 1 or white_king == pawn_square
+            or black_king == pawn_square):
+        return INVALID
+
+    pawn_attacks = _pawn_attacks(pawn_square)
+
+    if side_to_move == WHITE_TO_MOVE:
+        # Black king in check with white to move can't happen
+        if black_king in pawn_attacks:
+            return INVALID
+
+        # Pawn on the 7th promotes safely
+        promotion_square = pawn_square + 8
+        if (pawn_square // 8 == 6 and white_king != promotion_square
+                and (_distance(black_king, promotion_square) > 1
+                     or _distance(white_king, promotion_square) == 1)):
+            return WIN
+        return UNKNOWN
+
+    # Black to move: stalemate or the pawn is captured
+    covered = set(KING_MOVES[white_king]) | pawn_attacks
+    if all(square in covered for square in KING_MOVES[black_king]):
+        return DRAW
+    if pawn_square in KING_MOVES[black_king] and pawn_square not in KING_MOVES[white_king]:
+        return DRAW
+    return UNKNOWN
+
+
+def _classify(db, side_to_move, white_king, black_king, pawn_square):
+    """Classify a position from the states of its successors"""
+    results = 0
+
+    if side_to_move == WHITE_TO_MOVE:
+        pawn_bits = _pawn_index(pawn_square) << 13
+        base = (black_king << 6) | (BLACK_TO_MOVE << 12) | pawn_bits
+        for square in KING_MOVES[white_king]:
+            results |= db[square | base]
+
+        rank = pawn_square // 8
+        push_square = pawn_square + 8
+        if rank < 6:
+            results |= db[table_index(BLACK_TO_MOVE, white_king, black_king, push_square)]
+        if rank == 1 and push_square != white_king and push_square != black_king:
+            results |= db[table_index(BLACK_TO_MOVE, white_king, black_king, push_square + 8)]
+
+        if results & WIN:
+            return WIN
+        return UNKNOWN if results & UNKNOWN else DRAW
+
+    base = white_king | (WHITE_TO_MOVE << 12) | (_pawn_index(pawn_square) << 13)
+    for square in KING_MOVES[black_king]:
+        results |= db[base | (square << 6)]
+
+    if results & DRAW:
+        return DRAW
+    return UNKNOWN if results & UNKNOWN else WIN
+
+
+def generate_kpk():
+    """
+    Generate the KPK table by retrograde analysis.
+    Returns a bytearray bit array with a set bit for every won position.
+    """
+    db = bytearray(TABLE_SIZE)
+    unknown = []
+
+    for pawn_index in range(NUM_PAWN_SQUARES):
+        pawn_square = _pawn_square(pawn_index)
+        for side_to_move in (WHITE_TO_MOVE, BLACK_TO_MOVE):
+            for black_king in range(64):
+                for white_king in range(64):
+                    state = _initial_state(side_to_move, white_king, black_king, pawn_square)
+                    index = table_index(side_to_move, white_king, black_king, pawn_square)
+                    db[index] = state
+                    if state == UNKNOWN:
+                        unknown.append((index, side_to_move, white_king, black_king, pawn_square))
+
+    # Iterate until no unknown position can be resolved.
+    # Whatever is still unknown after that is a draw.
+    changed = True
+    while changed:
+        changed = False
+        still_unknown = []
+        for entry in unknown:
+            state = _classify(db, *entry[1:])
+            if state == UNKNOWN:
+                still_unknown.append(entry)
+            else:
+                db[entry[0]] = state
+                changed = True
+        unknown = still_unknown
+
+    bits = bytearray(TABLE_SIZE // 8)
+    for index in range(TABLE_SIZE):
+        if db[index] == WIN:
+            bits[index >> 3] |= 1 << (index & 7)
+    return bits
+
+
+class KPKBitbase:
+    """Probe interface over the KPK win/draw bit array"""
+
+    def __init__(self, bits):
+        if len(bits) != TABLE_SIZE // 8:
+            raise ValueError(f"KPK bitbase has wrong size: {len(bits)} bytes")
+        self.bits = bytes(bits)
+
+    def is_win(self, strong_to_move, strong_king, weak_king, pawn_square):
+        """
+        Check if the side with the pawn wins.
+        Squares are from the strong side's point of view (pawn moving up).
+        """
+        if pawn_square % 8 > 3:
+            strong_king ^= 7
+            weak_king ^= 7
+            pawn_square ^= 7
+
+        side_to_move = WHITE_TO_MOVE if strong_to_move else BLACK_TO_MOVE
+        index = table_index(side_to_move, strong_king, weak_king, pawn_square)
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def probe(self, board):
+        """
+        Score a KPK position relative to the side to move.
+        Returns None if the board isn't exactly king and pawn vs king.
+        """
+        pawn_square = -1
+        pawn_piece = 0
+        for square, piece in enumerate(board.square):
+            if piece != 0 and Piece.piece_type(piece) != Piece.KING:
+                if pawn_square >= 0 or Piece.piece_type(piece) != Piece.PAWN:
+                    return None
+                pawn_square = square
+                pawn_piece = piece
+        if pawn_square < 0:
+            return None
+
+        strong_is_white = Piece.is_white(pawn_piece)
+        strong_king = board.king_square[0 if strong_is_white else 1]
+        weak_king = board.king_square[1 if strong_is_white else 0]
+
+        # Flip black's pawn so it moves up the board
+        if not strong_is_white:
+            strong_king ^= 56
+            weak_king ^= 56
+            pawn_square ^= 56
+
+        strong_to_move = board.white_to_move == strong_is_white
+        if not self.is_win(strong_to_move, strong_king, weak_king, pawn_square):
+            return 0
+
+        score = KNOWN_WIN_SCORE + (pawn_square // 8) * PAWN_RANK_BONUS
+        return score if strong_to_move else -score
+
+    def save(self, path):
+        """Write the bitbase atomically"""
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(BITBASE_MAGIC)
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(BITBASE_MAGIC)] != BITBASE_MAGIC:
+            raise ValueError("Not a KPK bitbase file")
+        return cls(data[len(BITBASE_MAGIC):])
+
+
+def default_bitbase_path():
+    """Cache location: BOT_BITBASE_DIR or the assets directory"""
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    bitbase_dir = Path(os.environ.get('BOT_BITBASE_DIR', base_dir / 'assets'))
+    return bitbase_dir / 'KPK.bin'
+
+
+def load_kpk_bitbase(path=None):
+    """Load the cached KPK bitbase, generating and caching it if missing"""
+    path = Path(path) if path else default_bitbase_path()
+
+    if path.exists():
+        try:
+            return KPKBitbase.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Regenerating KPK bitbase: %s", e)
+
+    bitbase = KPKBitbase(generate_kpk())
+    try:
+        bitbase.save(path)
+    except OSError as e:
+        # Still usable for this process, and for processes forked after
+        # the warm-up (ai/warmup.py); others generate it again
+        logger.warning("Could not cache KPK bitbase (set BOT_BITBASE_DIR to a writable "
+                       "directory): %s", e)
+    return bitbase
+
+
+# Process-wide bitbase, shared read-only by every Searcher in the process
+_shared_bitbase = None
+_shared_bitbase_lock = threading.Lock()
+
+
+def get_kpk_bitbase():
+    """Get the process-wide KPK bitbase, loading it on first use"""
+    global _shared_bitbase
+
+    if _shared_bitbase is None:
+        with _shared_bitbase_lock:
+            if _shared_bitbase is None:
+                _shared_bitbase = load_kpk_bitbase()
+    return _shared_bitbase
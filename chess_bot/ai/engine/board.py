@@ -3,18 +3,38 @@ from .move import Move
 from .zobrist import Zobrist
 
 
+# Material key: a 4-bit piece count per (colour, piece type), kings excluded.
+# Adding or removing a piece adds or subtracts its weight.
+MATERIAL_KEY_BITS = 4
+
+
+def _build_material_key_weights():
+    """Material key weight for every piece value (index = piece)"""
+    weights = [0] * 16
+    for color_index, color in enumerate((Piece.WHITE, Piece.BLACK)):
+        for piece_type in (Piece.PAWN, Piece.KNIGHT, Piece.BISHOP, Piece.ROOK, Piece.QUEEN):
+            field = color_index * 5 + piece_type - 1
+            weights[piece_type | color] = 1 << (field * MATERIAL_KEY_BITS)
+    return weights
+
+
+MATERIAL_KEY_WEIGHTS = _build_material_key_weights()
+
+
 class GameState:
     """
     Stores all the state information needed to unmake a move.
     This allows fast unmake without FEN reload.
     """
     def __init__(self, captured_piece_type=0, en_passant_file=0, 
-                 castling_rights=0, fifty_move_counter=0, zobrist_key=0):
+                 castling_rights=0, fifty_move_counter=0, zobrist_key=0,
+                 material_key=0):
         self.captured_piece_type = captured_piece_type
         self.en_passant_file = en_passant_file
         self.castling_rights = castling_rights
         self.fifty_move_counter = fifty_move_counter
         self.zobrist_key = zobrist_key
+        self.material_key = material_key
 
 
 class Board:
@@ -119,12 +139,14 @@ class Board:
         
         # Calculate initial zobrist key
         zobrist_key = Zobrist.calculate_zobrist_key(self)
+        material_key = sum(MATERIAL_KEY_WEIGHTS[piece] for piece in self.square)
         self.current_game_state = GameState(
             captured_piece_type=0,
             en_passant_file=self.en_passant_file,
             castling_rights=self.castling_rights,
             fifty_move_counter=self.fifty_move_counter,
-            zobrist_key=zobrist_key
+            zobrist_key=zobrist_key,
+            material_key=material_key
         )
         
         # Initialize history
@@ -156,6 +178,7 @@ class Board:
         prev_castling_state = self.castling_rights
         prev_en_passant_file = self.en_passant_file
         new_zobrist_key = self.current_game_state.zobrist_key
+        new_material_key = self.current_game_state.material_key
         new_castling_rights = self.castling_rights
         new_en_passant_file = 0
         
@@ -182,6 +205,7 @@ class Board:
         
         # Handle captures
         if captured_piece_type != Piece.NONE:
+            new_material_key -= MATERIAL_KEY_WEIGHTS[captured_piece]
             if is_en_passant:
                 # En passant capture
                 capture_square = target_square + (-8 if self.white_to_move else 8)
@@ -224,6 +248,7 @@ class Board:
             # Remove pawn from zobrist, add promoted piece
             new_zobrist_key ^= Zobrist.pieces_array[moved_piece][target_square]
             new_zobrist_key ^= Zobrist.pieces_array[promo_piece][target_square]
+            new_material_key += MATERIAL_KEY_WEIGHTS[promo_piece] - MATERIAL_KEY_WEIGHTS[moved_piece]
             
             self.square[target_square] = promo_piece
         
@@ -276,7 +301,8 @@ class Board:
             en_passant_file=new_en_passant_file,
             castling_rights=new_castling_rights,
             fifty_move_counter=new_fifty_move_counter,
-            zobrist_key=new_zobrist_key
+            zobrist_key=new_zobrist_key,
+            material_key=new_material_key
         )
         self.game_state_history.append(new_state)
         self.current_game_state = new_state
@@ -363,6 +389,42 @@ class Board:
         if not in_search and self.repetition_position_history:
             self.repetition_position_history.pop()
     
+    def make_null_move(self):
+        """
+        Pass the turn without moving a piece (used by null-move pruning).
+        Only valid inside search; undo with unmake_null_move.
+        """
+        new_zobrist_key = self.current_game_state.zobrist_key
+        new_zobrist_key ^= Zobrist.side_to_move
+        new_zobrist_key ^= Zobrist.en_passant_file[self.en_passant_file]
+        
+        self.white_to_move = not self.white_to_move
+        self.en_passant_file = 0
+        self.fifty_move_counter += 1
+        self.ply_count += 1
+        
+        new_state = GameState(
+            captured_piece_type=0,
+            en_passant_file=0,
+            castling_rights=self.castling_rights,
+            fifty_move_counter=self.fifty_move_counter,
+            zobrist_key=new_zobrist_key,
+            material_key=self.current_game_state.material_key
+        )
+        self.game_state_history.append(new_state)
+        self.current_game_state = new_state
+    
+    def unmake_null_move(self):
+        """Undo a null move"""
+        self.white_to_move = not self.white_to_move
+        
+        self.game_state_history.pop()
+        self.current_game_state = self.game_state_history[-1]
+        
+        self.en_passant_file = self.current_game_state.en_passant_file
+        self.fifty_move_counter = self.current_game_state.fifty_move_counter
+        self.ply_count -= 1
+    
     def to_fen(self):
         """Convert current position to FEN string"""
         fen_parts = []
@@ -418,4 +480,9 @@ class Board:
     @property
     def zobrist_key(self):
         """Get current zobrist key"""
-        return self.current_game_state.zobrist_key
\ No newline at end of file
+        return self.current_game_state.zobrist_key
+    
+    @property
+    def material_key(self):
+        """Get current material signature (piece counts per colour and type)"""
+        return self.current_game_state.material_key
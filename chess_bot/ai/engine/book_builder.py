@@ -0,0 +1,145 @@
+"""
+Opening book builder.
+Aggregates position -> move counts from PGN games up to a ply limit and
+writes them in the compact book format CompactOpeningBook reads.
+
+Large PGN files are split into byte-range chunks aligned on game
+boundaries ([Event tags) and counted in parallel worker processes.
+
+Usage:
+    python -m ai.engine.book_builder <output.bin> <games.pgn> [<games.pgn> ...]
+        [--max-ply 16] [--min-count 2] [--workers 4]
+"""
+
+import argparse
+import os
+from collections import Counter
+from multiprocessing import Pool
+
+from .book_compiler import book_key, pack_move, write_book
+from .move_generator import MoveGenerator
+from .pgn import iter_pgn_games
+
+
+DEFAULT_MAX_PLY = 16
+DEFAULT_MIN_COUNT = 1
+# Chunks smaller than this aren't worth a separate worker task
+MIN_CHUNK_BYTES = 4 * 1024 * 1024
+GAME_START = b'[Event '
+
+
+def count_book_moves(games, max_ply=DEFAULT_MAX_PLY, counts=None):
+    """
+    Count (book key, packed move) pairs over the first max_ply plies of games.
+    games: iterable of PgnGame. Returns a Counter.
+    """
+    counts = counts if counts is not None else Counter()
+    move_generator = MoveGenerator()
+
+    for game in games:
+        for board, move in game.iter_moves(max_ply, move_generator):
+            counts[(book_key(board), pack_move(move.to_uci()))] += 1
+
+    return counts
+
+
+def _iter_chunk_lines(path, start, end):
+    """
+    Yield decoded lines of the games that start inside [start, end).
+    The chunk begins at the first game boundary at or after start and
+    reads past end to finish the last game it started.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        if start > 0:
+            # Skip the partial game owned by the previous chunk
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    return
+                if line.startswith(GAME_START):
+                    f.seek(offset)
+                    break
+
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            if offset >= end and line.startswith(GAME_START):
+                return
+            yield line.decode('utf-8', errors='replace')
+
+
+def _count_chunk(args):
+    """Worker: count book moves in one file chunk"""
+    path, start, end, max_ply = args
+    return count_book_moves(iter_pgn_games(_iter_chunk_lines(path, start, end)), max_ply)
+
+
+def split_file(path, num_chunks):
+    """Split a file into roughly equal byte ranges: [(start, end), ...]"""
+    size = os.path.getsize(path)
+    num_chunks = max(1, min(num_chunks, size // MIN_CHUNK_BYTES or 1))
+    chunk_size = size // num_chunks + 1
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)] or [(0, 0)]
+
+
+def count_pgn_files(paths, max_ply=DEFAULT_MAX_PLY, workers=None):
+    """Count book moves across PGN files, sharded over worker processes"""
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (path, start, end, max_ply)
+        for path in paths
+        for start, end in split_file(path, workers)
+    ]
+
+    counts = Counter()
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            counts.update(_count_chunk(task))
+        return counts
+
+    with Pool(processes=min(workers, len(tasks))) as pool:
+        for chunk_counts in pool.imap_unordered(_count_chunk, tasks):
+            counts.update(chunk_counts)
+    return counts
+
+
+def write_counts(counts, output_path, min_count=DEFAULT_MIN_COUNT):
+    """Write aggregated counts as a compact book. Returns records written."""
+    records = [
+        (key, packed_move, count)
+        for (key, packed_move), count in counts.items()
+        if count >= min_count
+    ]
+    return write_book(records, output_path)
+
+
+def build_book_from_games(games, output_path, max_ply=DEFAULT_MAX_PLY,
+                          min_count=DEFAULT_MIN_COUNT):
+    """Build a book from an iterable of PgnGame (e.g. platform games)"""
+    return write_counts(count_book_moves(games, max_ply), output_path, min_count)
+
+
+def build_book_from_pgn(paths, output_path, max_ply=DEFAULT_MAX_PLY,
+                        min_count=DEFAULT_MIN_COUNT, workers=None):
+    """Build a book from PGN files"""
+    counts = count_pgn_files(paths, max_ply, workers)
+    return write_counts(counts, output_path, min_count)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build an opening book from PGN files")
+    parser.add_argument('output')
+    parser.add_argument('pgn_files', nargs='+')
+    parser.add_argument('--max-ply', type=int, default=DEFAULT_MAX_PLY)
+    parser.add_argument('--min-count', type=int, default=DEFAULT_MIN_COUNT)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    num_records = build_book_from_pgn(
+        args.pgn_files, args.output, args.max_ply, args.min_count, args.workers
+    )
+    print(f"Wrote {num_records} book records to {args.output}")
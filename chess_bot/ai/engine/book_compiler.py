@@ -0,0 +1,113 @@
+"""
+Opening book compiler.
+Turns the text book (pos <fen> / <move> <count> lines) into a sorted binary
+file of fixed-size records that CompactOpeningBook memory-maps and probes
+by binary search on the position's zobrist key.
+
+File layout (little endian):
+    header:  magic (8s) | zobrist fingerprint (Q) | record count (Q) | reserved (Q)
+    records: book key (Q) | packed move (H) | weight (I), sorted by key
+"""
+
+import os
+import struct
+import sys
+from pathlib import Path
+
+from .board import Board
+from .move import Move
+from .zobrist import Zobrist
+from .book_loader import parse_book_txt
+
+
+BOOK_MAGIC = b'CBBOOK01'
+HEADER_FORMAT = '<8sQQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_FORMAT = '<QHI'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+MAX_WEIGHT = 0xFFFFFFFF
+
+
+def book_key(board):
+    """
+    Zobrist key used for book lookups.
+    The book ignores en passant (book.txt FENs never set it), so the
+    en passant component is removed from the board's key.
+    """
+    return board.zobrist_key ^ Zobrist.en_passant_file[board.en_passant_file]
+
+
+def zobrist_fingerprint():
+    """Identifies the zobrist tables a book was compiled with"""
+    if Zobrist.side_to_move is None:
+        Zobrist.initialize()
+    return Zobrist.side_to_move
+
+
+def pack_move(move_uci):
+    """Pack a UCI move into 16 bits"""
+    return Move.from_uci(move_uci).value
+
+
+def unpack_move(packed):
+    """Unpack a 16-bit move into UCI notation"""
+    return Move(packed & 0b111111, (packed >> 6) & 0b111111, packed >> 12).to_uci()
+
+
+def write_book(records, output_path):
+    """
+    Write (key, packed_move, weight) records as a compact book file.
+    Records are sorted by key, most played move first.
+    """
+    records = sorted(records, key=lambda record: (record[0], -record[2]))
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + f'.{os.getpid()}.tmp')
+
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, BOOK_MAGIC, zobrist_fingerprint(), len(records), 0))
+        for key, packed_move, weight in records:
+            f.write(struct.pack(RECORD_FORMAT, key, packed_move, min(weight, MAX_WEIGHT)))
+
+    # Atomic replace so concurrent readers never see a partial file
+    os.replace(tmp_path, output_path)
+    return len(records)
+
+
+def compile_book(txt_path, output_path):
+    """
+    Compile a book.txt file into the binary format.
+    Returns number of records written.
+    """
+    book_data = parse_book_txt(txt_path)
+
+    records = []
+    for fen, moves in book_data.items():
+        key = book_key(Board(fen))
+        for move_uci, count in moves:
+            records.append((key, pack_move(move_uci), count))
+
+    return write_book(records, output_path)
+
+
+def read_header(data):
+    """
+    Parse and validate a book header.
+    Returns record count, or None if the file is not usable with the
+    current zobrist tables.
+    """
+    if len(data) < HEADER_SIZE:
+        return None
+    magic, fingerprint, count, _ = struct.unpack_from(HEADER_FORMAT, data, 0)
+    if magic != BOOK_MAGIC or fingerprint != zobrist_fingerprint():
+        return None
+    if len(data) < HEADER_SIZE + count * RECORD_SIZE:
+        return None
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python -m ai.engine.book_compiler <book.txt> <book.bin>")
+        sys.exit(1)
+    num_records = compile_book(sys.argv[1], sys.argv[2])
+    print(f"Wrote {num_records} book records to {sys.argv[2]}")
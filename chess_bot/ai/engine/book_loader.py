@@ -1,4 +1,5 @@
 import os
+import threading
 from pathlib import Path
 
 def parse_book_txt(file_path):
@@ -48,6 +49,7 @@ def load_opening_book():
     base_dir = Path(__file__).resolve().parent.parent.parent
     
     possible_paths = [
+        base_dir / 'assets' / 'Book.txt',
         base_dir / 'assets' / 'book.txt',
         base_dir / 'ai' / 'resources' / 'book.txt',
         base_dir / 'book.txt',
@@ -73,4 +75,90 @@ def load_opening_book():
         return book_data
     except Exception as e:
         print(f"Error loading opening book: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def find_book_txt():
+    """Locate assets/Book.txt"""
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    book_path = base_dir / 'assets' / 'Book.txt'
+    return book_path if book_path.exists() else None
+
+
+def compiled_book_path(txt_path):
+    """Where the compiled binary book for txt_path lives"""
+    return Path(txt_path).with_suffix('.bin')
+
+
+def load_compact_opening_book():
+    """
+    Load the binary opening book, compiling it from Book.txt first if the
+    binary is missing, older than the text book, or built with other
+    zobrist tables.
+    Returns CompactOpeningBook or None.
+    """
+    from .book_compiler import compile_book
+    from .opening_book import CompactOpeningBook
+    
+    txt_path = find_book_txt()
+    if not txt_path:
+        print("Warning: Opening book not found")
+        return None
+    
+    bin_path = compiled_book_path(txt_path)
+    
+    if bin_path.exists() and bin_path.stat().st_mtime >= txt_path.stat().st_mtime:
+        try:
+            return CompactOpeningBook(bin_path)
+        except (OSError, ValueError) as e:
+            print(f"Recompiling opening book: {e}")
+    
+    try:
+        num_records = compile_book(txt_path, bin_path)
+        print(f"Compiled opening book with {num_records} moves to: {bin_path}")
+        return CompactOpeningBook(bin_path)
+    except Exception as e:
+        print(f"Error compiling opening book: {e}")
+        return None
+
+
+# Process-wide opening book, shared read-only by every Bot in the process
+_shared_book = None
+_shared_book_loaded = False
+_shared_book_lock = threading.Lock()
+
+
+def get_opening_book():
+    """
+    Get the process-wide opening book, loading it on first use.
+    Prefers the compiled binary book and falls back to the text book.
+    Returns CompactOpeningBook, OpeningBook or None.
+    """
+    global _shared_book, _shared_book_loaded
+    
+    if _shared_book_loaded:
+        return _shared_book
+    
+    with _shared_book_lock:
+        if not _shared_book_loaded:
+            from .opening_book import OpeningBook
+            
+            book = load_compact_opening_book()
+            if book is None:
+                book_data = load_opening_book()
+                book = OpeningBook(book_data) if book_data else None
+            
+            _shared_book = book
+            _shared_book_loaded = True
+    
+    return _shared_book
+
+
+def preload_opening_book():
+    """
+    Load the shared opening book now.
+    Call before forking workers (e.g. gunicorn --preload) so they share
+    the book's pages copy-on-write instead of each loading it.
+    """
+    if os.environ.get('BOT_PRELOAD_BOOK', 'True') != 'True':
+        return None
+    return get_opening_book()
@@ -1,34 +1,111 @@
 from .board import Board
 from .searcher import Searcher
 from .move import Move
-from .opening_book import OpeningBook
-from .book_loader import load_opening_book
+from .book_loader import get_opening_book
+from .time_manager import TimeManager
+from .move_generator import MoveGenerator
+from .strength import StrengthProfile
+from .governor import think_time_governor
+from .result_cache import result_cache
+import os
+import random
+import threading
 import time
 
 """
 Improved Bot with opening book support and better configuration.
 """
+
+# Pondering runs in background threads; cap how many run at once per process
+MAX_CONCURRENT_PONDERS = int(os.environ.get('BOT_MAX_CONCURRENT_PONDERS', '2'))
+MAX_PONDER_TIME_MS = int(os.environ.get('BOT_MAX_PONDER_TIME_MS', '30000'))
+_ponder_slots = threading.BoundedSemaphore(max(1, MAX_CONCURRENT_PONDERS))
+# Extra time a ponder hit waits for the search to stop past its hard limit
+PONDER_HIT_GRACE_MS = 500
+
+MAX_MULTIPV = 10
+
+
+def format_search_line(move, score: int, pv: list) -> dict:
+    """
+    Format a root line for API responses.
+    score is in centipawns from the side to move; mate is in moves
+    (negative when the side to move gets mated), or None.
+    """
+    mate = None
+    if Searcher.is_mate_score(score):
+        mate_in = (Searcher.num_ply_to_mate_from_score(score) + 1) // 2
+        mate = mate_in if score > 0 else -mate_in
+    return {
+        'move': move.to_uci() if move else None,
+        'score': score,
+        'mate': mate,
+        'pv': [pv_move.to_uci() for pv_move in pv],
+    }
+
+
 class Bot:  
     def __init__(self, use_opening_book=True):
         """Initialize bot"""
         self.board = Board()
         self.searcher = Searcher(self.board)
         
-        # Load opening book from book.txt
-        if use_opening_book:
-            book_data = load_opening_book()
-            self.opening_book = OpeningBook(book_data) if book_data else None
-        else:
-            self.opening_book = None
+        # The game as start position plus UCI moves played on self.board,
+        # so sync_game only has to apply new moves
+        self.game_start_fen = Board.START_FEN
+        self.game_moves = []
+        
+        # Shared process-wide opening book (loaded once per process)
+        self.opening_book = get_opening_book() if use_opening_book else None
         
         # Configuration
         self.use_max_think_time = False
         self.max_think_time_ms = 2500
         self.max_book_ply = 16  # Use book for first 8 moves
+        self.ponder_enabled = MAX_CONCURRENT_PONDERS > 0
+        self.max_ponder_time_ms = MAX_PONDER_TIME_MS
+        
+        # Strength profile (None: full strength, limited by time only)
+        self.strength = None
+        self.rng = random.Random()
+        
+        # Shared by every bot in the process; scales think time under load
+        self.governor = think_time_governor
+        # Shared by every bot in the process; None to always search
+        self.result_cache = result_cache
         
         # State
         self.is_thinking = False
         self.latest_move_is_book_move = False
+        
+        # Pondering state
+        self.is_pondering = False
+        self.ponder_move = None
+        self.ponder_thread = None
+        self.ponder_result = None
+        # (zobrist key after the move, expected reply) of the last cached
+        # move: the transposition table has no reply after a cache hit
+        self.cached_reply = None
+        # Set once the ponder search has started its clock; limits set
+        # before that would be overwritten by the ponder budget
+        self.ponder_started = threading.Event()
+    
+    def set_strength(self, profile: StrengthProfile):
+        """Play at a strength profile's level (None for full strength)"""
+        self.strength = profile
+        if profile and not profile.ponder:
+            self.ponder_enabled = False
+    
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the bot's search tables"""
+        ordering = self.searcher.move_ordering
+        tables = (ordering.history, ordering.counter_moves, ordering.continuation_history)
+        return (self.searcher.transposition_table.memory_bytes()
+                + sum(table.itemsize * len(table) for table in tables))
+    
+    def is_busy(self) -> bool:
+        """Searching, or running a ponder search"""
+        return self.is_thinking or (self.ponder_thread is not None and self.ponder_thread.is_alive())
     
     def notify_new_game(self):
         """Notify bot of new game"""
@@ -37,41 +114,70 @@ class Bot:
     
     def set_position(self, fen: str):
         """Set board position from FEN"""
+        self.stop_pondering()
         self.board = Board(fen)
         self.searcher.board = self.board
+        self.game_start_fen = fen
+        self.game_moves = []
+    
+    def sync_game(self, start_fen: str, moves: list):
+        """
+        Bring the board to a game given as start position and UCI moves.
+        Moves already on the board are kept, so only new moves are applied
+        and the game's repetition history is preserved.
+        """
+        self.stop_pondering()
+        known = len(self.game_moves)
+        if start_fen != self.game_start_fen or moves[:known] != self.game_moves:
+            self.set_position(start_fen)
+            known = 0
+        for move_string in moves[known:]:
+            self.make_move(move_string)
     
     def make_move(self, move_string: str):
         """Make move on board"""
-        move = Move.from_uci(move_string)
-        self.board.make_move(move)
+        self.board.make_move(self._find_move(move_string))
+        self.game_moves.append(move_string)
+    
+    def _find_move(self, move_string: str) -> Move:
+        """Resolve a UCI string to the legal move (with en passant/double push flags)"""
+        for move in MoveGenerator().generate_moves(self.board):
+            if move.to_uci() == move_string:
+                return move
+        return Move.from_uci(move_string)
     
     def choose_think_time(self, time_remaining_white_ms: int, time_remaining_black_ms: int,
                           increment_white_ms: int, increment_black_ms: int) -> int:
         """
         Calculate thinking time based on time control.
         """
+        soft_ms, _ = self.choose_time_limits(
+            time_remaining_white_ms, time_remaining_black_ms,
+            increment_white_ms, increment_black_ms
+        )
+        return soft_ms
+    
+    def choose_time_limits(self, time_remaining_white_ms: int, time_remaining_black_ms: int,
+                           increment_white_ms: int, increment_black_ms: int) -> tuple:
+        """
+        Calculate soft and hard search limits based on time control.
+        Returns: (soft_limit_ms, hard_limit_ms)
+        """
         my_time_remaining_ms = time_remaining_white_ms if self.board.white_to_move else time_remaining_black_ms
         my_increment_ms = increment_white_ms if self.board.white_to_move else increment_black_ms
         
-        # Get fraction of remaining time (plan for 40 moves)
-        think_time_ms = my_time_remaining_ms / 40.0
-        
-        # Clamp if maximum limit imposed
-        if self.use_max_think_time:
-            think_time_ms = min(self.max_think_time_ms, think_time_ms)
-        
-        # Add increment
-        if my_time_remaining_ms > my_increment_ms * 2:
-            think_time_ms += my_increment_ms * 0.8
-        
-        min_think_time = min(50, my_time_remaining_ms * 0.25)
-        return int(max(min_think_time, think_time_ms))
+        max_think_time_ms = self.max_think_time_ms if self.use_max_think_time else None
+        return TimeManager.allocate(my_time_remaining_ms, my_increment_ms,
+                                    max_think_time_ms=max_think_time_ms)
     
-    def think_timed(self, time_ms: int) -> tuple:
+    def think_timed(self, time_ms: int, soft_time_ms: int = None) -> tuple:
         """
         Main thinking function.
+        time_ms is the hard limit, soft_time_ms the point after which no new
+        iteration is started (defaults to a fraction of time_ms).
         Returns: (best_move_uci, evaluation, nodes_searched)
         """
+        self.stop_pondering()
         self.latest_move_is_book_move = False
         self.is_thinking = True
         
@@ -83,8 +189,15 @@ class Bot:
                 self.is_thinking = False
                 return book_move, 0, 0
         
+        # Another game may have searched this position deeply enough
+        cached = self._cached_move(time_ms, soft_time_ms)
+        if cached:
+            self.is_thinking = False
+            return cached
+        
         # Run search
-        best_move, evaluation, nodes = self.searcher.start_search(time_ms)
+        best_move, evaluation, nodes = self._search(time_ms, soft_time_ms)
+        self._store_result()
         
         self.is_thinking = False
         
@@ -93,6 +206,258 @@ class Bot:
         else:
             return None, 0, 0
     
+    def _search(self, time_ms: int, soft_time_ms: int = None) -> tuple:
+        """Search the current position at the bot's strength, governed by load"""
+        profile = self.strength
+        with self.governor.track_search():
+            contended = self.governor.pressure() > 1.0
+            
+            node_limit = None
+            if profile and profile.is_limited:
+                # Node and depth limits decide when a limited search ends;
+                # time_ms is only a safety cap
+                soft_time_ms = time_ms
+                node_limit = profile.node_limit
+            else:
+                soft_time_ms, time_ms, node_limit = self.governor.adjust_limits(time_ms, soft_time_ms)
+            
+            start_time = time.time()
+            best_move, evaluation, nodes = self.searcher.start_search(
+                time_ms, soft_time_ms,
+                multipv=profile.multipv if profile else 1,
+                node_limit=node_limit,
+                depth_limit=profile.depth_limit if profile else None
+            )
+            self.governor.record_search(nodes, (time.time() - start_time) * 1000, contended)
+        
+        if profile and not profile.is_deterministic and self.searcher.root_lines:
+            best_move, evaluation, _ = profile.choose_line(self.searcher.root_lines, self.rng)
+        return best_move, evaluation, nodes
+    
+    def _profile_name(self) -> str:
+        return self.strength.name if self.strength else 'full'
+    
+    def _search_target(self, time_ms: int, soft_time_ms: int = None) -> tuple:
+        """
+        (depth, nodes) a search with these limits would stop at, either one
+        None if unknown. Time-limited searches are converted to nodes at the
+        process's measured search speed.
+        """
+        profile = self.strength
+        if profile and profile.is_limited:
+            return profile.depth_limit, profile.node_limit
+        nps = self.governor.nps_estimate
+        if not nps:
+            return None, None
+        if soft_time_ms is None:
+            soft_time_ms = time_ms * TimeManager.SOFT_LIMIT_FRACTION
+        return None, int(nps * min(soft_time_ms, time_ms) / 1000)
+    
+    def _cached_move(self, time_ms: int, soft_time_ms: int = None):
+        """(move_uci, evaluation, 0) from the result cache, or None"""
+        self.cached_reply = None
+        if not self.result_cache or not self.result_cache.is_cacheable(self.board):
+            return None
+        min_depth, min_nodes = self._search_target(time_ms, soft_time_ms)
+        entry = self.result_cache.lookup(self.board, self._profile_name(), min_depth, min_nodes)
+        if not entry:
+            return None
+        
+        # Guard against zobrist collisions
+        moves = {move.to_uci(): move for move in MoveGenerator().generate_moves(self.board)}
+        lines = [(line[0], line[1], line[2] if len(line) > 2 else None)
+                 for line in entry['lines'] if line[0] in moves]
+        if not lines:
+            return None
+        move_uci, evaluation, reply_uci = (self.strength.choose_line(lines, self.rng)
+                                           if self.strength else lines[0])
+        if reply_uci:
+            move = moves[move_uci]
+            self.board.make_move(move)
+            self.cached_reply = (self.board.zobrist_key, reply_uci)
+            self.board.unmake_move(move)
+        return move_uci, evaluation, 0
+    
+    def _store_result(self):
+        """Share the search just finished through the result cache"""
+        if not self.result_cache or not self.result_cache.is_cacheable(self.board):
+            return
+        lines = [(move.to_uci(), score, pv[1].to_uci() if len(pv) > 1 else None)
+                 for move, score, pv in self.searcher.root_lines if move]
+        self.result_cache.store(self.board, self._profile_name(), self.searcher.current_depth,
+                                self.searcher.nodes_searched, lines)
+    
+    def analyse(self, fen: str, multipv: int = 1, time_ms: int = 1000, on_info=None) -> dict:
+        """
+        Analyse a position and return its best multipv lines.
+        Sets the bot's position to fen; the opening book is not used.
+        on_info, if given, is called with the info dict of every completed
+        iteration (from the searching thread).
+        Returns: {'fen', 'depth', 'nodes', 'time_ms', 'lines': [...]}
+        """
+        self.set_position(fen)
+        multipv = max(1, min(int(multipv), MAX_MULTIPV))
+        
+        start_time = time.time()
+        if on_info:
+            self.searcher.iteration_callback = lambda searcher: on_info(self._search_info(start_time))
+        
+        self.is_thinking = True
+        try:
+            self.searcher.start_search(time_ms, time_ms, multipv=multipv)
+        finally:
+            self.is_thinking = False
+            self.searcher.iteration_callback = None
+        
+        info = self._search_info(start_time)
+        info['fen'] = fen
+        return info
+    
+    def _search_info(self, start_time: float) -> dict:
+        """Depth, nodes, elapsed time and root lines of the last completed iteration"""
+        return {
+            'depth': self.searcher.current_depth,
+            'nodes': self.searcher.nodes_searched,
+            'time_ms': int((time.time() - start_time) * 1000),
+            'lines': [format_search_line(*line) for line in self.searcher.root_lines],
+        }
+    
+    def stop_search(self):
+        """
+        Cancel the running search from another thread.
+        With a cancel token the bot stays stopped until the token is cleared.
+        """
+        self.searcher.cancel()
+    
+    def start_pondering(self, max_ponder_time_ms: int = None) -> bool:
+        """
+        Search the expected opponent reply in the background.
+        Call after the bot's own move has been applied to self.board.
+        Returns True if a ponder search was started.
+        """
+        if not self.ponder_enabled or self.is_pondering:
+            return False
+        
+        # Book positions are answered instantly anyway
+        if self.opening_book and self.board.ply_count < self.max_book_ply:
+            return False
+        
+        ponder_move = self._expected_reply()
+        if ponder_move is None:
+            return False
+        
+        # Per-process cap on background searches
+        if not _ponder_slots.acquire(blocking=False):
+            return False
+        
+        self.board.make_move(ponder_move)
+        self.ponder_move = ponder_move
+        self.ponder_result = None
+        self.is_pondering = True
+        self.ponder_started.clear()
+        self.searcher.start_callback = self.ponder_started.set
+        
+        ponder_time_ms = min(max_ponder_time_ms or self.max_ponder_time_ms, self.max_ponder_time_ms)
+        self.ponder_thread = threading.Thread(
+            target=self._ponder, args=(ponder_time_ms,), daemon=True
+        )
+        self.ponder_thread.start()
+        return True
+    
+    def _ponder(self, ponder_time_ms: int):
+        """Ponder thread body"""
+        try:
+            self.ponder_result = self.searcher.start_search(ponder_time_ms, ponder_time_ms)
+        finally:
+            self.searcher.start_callback = None
+            # Don't leave ponder_hit waiting if the search failed to start
+            self.ponder_started.set()
+            _ponder_slots.release()
+    
+    def _expected_reply(self):
+        """
+        Expected opponent reply: the TT move for the current position, or
+        the reply stored with a cached move, if legal
+        """
+        tt_move = self.searcher.transposition_table.try_get_stored_move(self.board.zobrist_key)
+        if tt_move is not None:
+            matches = lambda move: move.value == tt_move.value
+        elif self.cached_reply and self.cached_reply[0] == self.board.zobrist_key:
+            matches = lambda move: move.to_uci() == self.cached_reply[1]
+        else:
+            return None
+        for move in MoveGenerator().generate_moves(self.board):
+            if matches(move):
+                return move
+        return None
+    
+    def ponder_hit(self, move_string: str, time_ms: int, soft_time_ms: int = None):
+        """
+        Handle the opponent's actual move while pondering.
+        On a ponder hit the running search becomes the real search, limited to
+        time_ms from when pondering started, and its result is returned.
+        It keeps running on the ponder thread, so a scheduler's yield hook
+        must not be set for it (see search_executor._run_bot_move).
+        On a miss the ponder search is cancelled and None is returned.
+        """
+        if not self.is_pondering:
+            return None
+        
+        if move_string != self.ponder_move.to_uci():
+            self.stop_pondering()
+            return None
+        
+        self.is_thinking = True
+        with self.governor.track_search():
+            soft_time_ms, time_ms, _ = self.governor.adjust_limits(time_ms, soft_time_ms)
+            self.ponder_started.wait(time_ms / 1000)
+            time_manager = self.searcher.time_manager
+            time_manager.update_limits(time_ms, soft_time_ms)
+            remaining_ms = max(0.0, time_ms - time_manager.elapsed_ms())
+            self.ponder_thread.join((remaining_ms + PONDER_HIT_GRACE_MS) / 1000)
+            # Past the hard limit: keep the last completed iteration
+            while self.ponder_thread.is_alive():
+                self.searcher.search_cancelled = True
+                self.ponder_thread.join(0.01)
+        self.is_thinking = False
+        
+        # The ponder move stays on the board as the opponent's move
+        self.game_moves.append(move_string)
+        self.is_pondering = False
+        self.ponder_move = None
+        self.ponder_thread = None
+        self.latest_move_is_book_move = False
+        
+        best_move, evaluation, nodes = self.ponder_result or (None, 0, 0)
+        if best_move is None:
+            return None
+        return best_move.to_uci(), evaluation, nodes
+    
+    def stop_pondering(self):
+        """Cancel a running ponder search and take back the expected reply"""
+        if not self.is_pondering:
+            return
+        
+        # The thread may not have reset its cancel flag yet, so keep setting it
+        while self.ponder_thread.is_alive():
+            self.searcher.search_cancelled = True
+            self.ponder_thread.join(0.01)
+        
+        # A pawn move or capture cleared the repetition history, which
+        # unmaking can't restore; replay the game instead
+        if self.board.fifty_move_counter == 0:
+            moves = self.game_moves
+            self.board = Board(self.game_start_fen)
+            self.searcher.board = self.board
+            for move_string in moves:
+                self.board.make_move(self._find_move(move_string))
+        else:
+            self.board.unmake_move(self.ponder_move)
+        self.is_pondering = False
+        self.ponder_move = None
+        self.ponder_thread = None
+        self.ponder_result = None
+    
     def get_board_fen(self) -> str:
         """Get current board FEN"""
         return self.board.to_fen()
@@ -0,0 +1,201 @@
+"""
+Endgame recognizers, dispatched on the board's material key.
+
+Each recognized material signature maps to one of:
+- DRAW: dead or trivially held draws; the search returns 0 without
+  searching and the evaluation is 0
+- EXACT: exact results from a bitbase (KPK); the search returns the
+  probed score without searching
+- EVALUATE: a specialised evaluation replacing the general one
+  (driving a bare king to the edge in KQK, KRK, KBNK, ...)
+Scaling factors for the general evaluation live in a second table keyed
+by the material key with pawns removed (opposite-coloured bishops).
+"""
+
+from functools import partial
+
+from .board import MATERIAL_KEY_BITS, MATERIAL_KEY_WEIGHTS
+from .piece import Piece
+from .bitbase import KNOWN_WIN_SCORE, get_kpk_bitbase
+
+
+DRAW = 0
+EXACT = 1
+EVALUATE = 2
+
+PIECE_LETTERS = {
+    'P': Piece.PAWN, 'N': Piece.KNIGHT, 'B': Piece.BISHOP,
+    'R': Piece.ROOK, 'Q': Piece.QUEEN
+}
+
+PIECE_VALUES = {
+    Piece.PAWN: 100, Piece.KNIGHT: 300, Piece.BISHOP: 320,
+    Piece.ROOK: 500, Piece.QUEEN: 900
+}
+
+# Both sides' pawn count fields
+PAWN_FIELDS_MASK = (
+    MATERIAL_KEY_WEIGHTS[Piece.PAWN | Piece.WHITE] * ((1 << MATERIAL_KEY_BITS) - 1) |
+    MATERIAL_KEY_WEIGHTS[Piece.PAWN | Piece.BLACK] * ((1 << MATERIAL_KEY_BITS) - 1)
+)
+
+# Opposite-coloured bishops with only pawns besides
+OPPOSITE_BISHOPS_SCALE = 0.5
+
+# Bare king mop-up weights for the specialised evaluations
+PUSH_TO_EDGE_WEIGHT = 20
+PUSH_CLOSE_WEIGHT = 10
+PUSH_TO_CORNER_WEIGHT = 40
+
+
+def material_key(white, black):
+    """
+    Material key for piece letters per side, e.g. material_key('KNN', 'K').
+    Kings are ignored.
+    """
+    key = 0
+    for pieces, color in ((white, Piece.WHITE), (black, Piece.BLACK)):
+        for letter in pieces.upper():
+            if letter != 'K':
+                key += MATERIAL_KEY_WEIGHTS[PIECE_LETTERS[letter] | color]
+    return key
+
+
+def _distance(a, b):
+    return max(abs(a % 8 - b % 8), abs(a // 8 - b // 8))
+
+
+def _edge_distance(square):
+    file, rank = square % 8, square // 8
+    return min(file, 7 - file, rank, 7 - rank)
+
+
+def _strong_side_score(board, strong_is_white, score):
+    """Convert a score for the strong side to the side to move"""
+    return score if board.white_to_move == strong_is_white else -score
+
+
+def _evaluate_kpk(board):
+    """KPK: exact win/draw from the bitbase"""
+    return get_kpk_bitbase().probe(board)
+
+
+def _evaluate_kxk(board, strong_is_white):
+    """
+    Mating material against a bare king: a known win, improved by driving
+    the weak king to the edge and bringing the strong king closer.
+    """
+    strong_king = board.king_square[0 if strong_is_white else 1]
+    weak_king = board.king_square[1 if strong_is_white else 0]
+
+    material = 0
+    for piece in board.square:
+        if piece != 0 and Piece.is_white(piece) == strong_is_white:
+            material += PIECE_VALUES.get(Piece.piece_type(piece), 0)
+
+    score = (KNOWN_WIN_SCORE + material
+             + (3 - _edge_distance(weak_king)) * PUSH_TO_EDGE_WEIGHT
+             + (7 - _distance(strong_king, weak_king)) * PUSH_CLOSE_WEIGHT)
+    return _strong_side_score(board, strong_is_white, score)
+
+
+def _evaluate_kbnk(board, strong_is_white):
+    """KBNK: like KXK, but the weak king is driven to a corner of the bishop's colour"""
+    score = _evaluate_kxk(board, strong_is_white)
+
+    bishop = Piece.BISHOP | (Piece.WHITE if strong_is_white else Piece.BLACK)
+    bishop_square = board.square.index(bishop)
+    # a1 and h8 are dark squares, a8 and h1 are light
+    corners = (0, 63) if (bishop_square % 8 + bishop_square // 8) % 2 == 0 else (7, 56)
+    weak_king = board.king_square[1 if strong_is_white else 0]
+    corner_distance = min(_distance(weak_king, corner) for corner in corners)
+
+    bonus = (7 - corner_distance) * PUSH_TO_CORNER_WEIGHT
+    return score + _strong_side_score(board, strong_is_white, bonus)
+
+
+def _scale_opposite_bishops(board):
+    """Bishops on opposite colours with only pawns besides are drawish"""
+    bishop_colors = [
+        (square % 8 + square // 8) % 2
+        for square, piece in enumerate(board.square)
+        if Piece.piece_type(piece) == Piece.BISHOP
+    ]
+    if bishop_colors[0] != bishop_colors[1]:
+        return OPPOSITE_BISHOPS_SCALE
+    return 1.0
+
+
+# material key -> (kind, function)
+ENDGAMES = {}
+# material key without pawns -> scaling function
+SCALING = {}
+
+
+def _register(strong, weak, kind, function=None):
+    """Register a recognizer for both colour assignments"""
+    for strong_is_white in (True, False):
+        if strong_is_white:
+            key = material_key(strong, weak)
+        else:
+            key = material_key(weak, strong)
+
+        if kind == EVALUATE:
+            ENDGAMES[key] = (kind, partial(function, strong_is_white=strong_is_white))
+        else:
+            ENDGAMES[key] = (kind, function)
+
+
+# Neither side can force mate
+for _strong, _weak in (('K', 'K'), ('KN', 'K'), ('KB', 'K'), ('KNN', 'K'),
+                       ('KN', 'KN'), ('KB', 'KN'), ('KB', 'KB')):
+    _register(_strong, _weak, DRAW)
+
+_register('KP', 'K', EXACT, _evaluate_kpk)
+
+for _strong in ('KQ', 'KR', 'KQQ', 'KQR', 'KRR', 'KQB', 'KQN', 'KRB', 'KRN'):
+    _register(_strong, 'K', EVALUATE, _evaluate_kxk)
+_register('KBN', 'K', EVALUATE, _evaluate_kbnk)
+
+SCALING[material_key('KB', 'KB')] = _scale_opposite_bishops
+
+
+def probe_endgame(board):
+    """
+    Exact score (relative to side to move) for dead draws and bitbase
+    positions, so the search can return without searching.
+    Returns None for anything else.
+    """
+    entry = ENDGAMES.get(board.material_key)
+    if entry is None:
+        return None
+
+    kind, function = entry
+    if kind == DRAW:
+        return 0
+    if kind == EXACT:
+        return function(board)
+    return None
+
+
+def evaluate_endgame(board):
+    """
+    Specialised evaluation (relative to side to move) for recognized
+    endgames. Returns None to use the general evaluation.
+    """
+    entry = ENDGAMES.get(board.material_key)
+    if entry is None:
+        return None
+
+    kind, function = entry
+    if kind == DRAW:
+        return 0
+    return function(board)
+
+
+def endgame_scale_factor(board):
+    """Factor for the general evaluation (1.0 when nothing is recognized)"""
+    scale_function = SCALING.get(board.material_key & ~PAWN_FIELDS_MASK)
+    if scale_function is None:
+        return 1.0
+    return scale_function(board)
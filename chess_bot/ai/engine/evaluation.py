@@ -1,4 +1,5 @@
 from .piece import Piece
+from .endgames import evaluate_endgame, endgame_scale_factor
 
 
 class Evaluation:
@@ -110,6 +111,11 @@ class Evaluation:
         Main evaluation - exact port of C# Evaluation.Evaluate()
         Returns score from perspective of side to move
         """
+        # Recognized endgames (draws, bitbases, bare king) have their own evaluation
+        endgame_score = evaluate_endgame(board)
+        if endgame_score is not None:
+            return endgame_score
+        
         white_eval = EvaluationData()
         black_eval = EvaluationData()
         
@@ -153,6 +159,11 @@ class Evaluation:
         perspective = 1 if board.white_to_move else -1
         eval_score = white_eval.sum() - black_eval.sum()
         
+        # Drawish material (e.g. opposite-coloured bishops)
+        scale = endgame_scale_factor(board)
+        if scale != 1.0:
+            eval_score = int(eval_score * scale)
+        
         return eval_score * perspective
     
     @staticmethod
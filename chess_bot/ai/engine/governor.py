@@ -0,0 +1,164 @@
+"""
+Think-time governor shared by every Bot in a process.
+
+Each search asks for its full time budget, so when many games want moves
+at once they all contend for the CPU and every move gets slow. The
+governor tracks the process's active searches and the host's load average
+and scales time budgets down under load (within configured bounds). It
+also caps the nodes of a scaled search at what the budget buys on an idle
+host, so searches that do get the CPU don't run longer than needed.
+
+In a search worker a SearchScheduler already shares the CPU between the
+process's searches: each runs on wall-clock time while the others hold the
+baton. There the governor only follows the host's load (time_sliced).
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+GOVERNOR_MIN_SCALE = float(os.environ.get('BOT_GOVERNOR_MIN_SCALE', '0.25'))
+GOVERNOR_MIN_TIME_MS = int(os.environ.get('BOT_GOVERNOR_MIN_TIME_MS', '100'))
+GOVERNOR_MAX_TIME_MS = int(os.environ.get('BOT_GOVERNOR_MAX_TIME_MS', '10000'))
+
+
+class ThinkTimeGovernor:
+    """Scales search budgets by process and host load"""
+
+    # Load average is read at most this often
+    LOAD_CHECK_INTERVAL_SECONDS = 1.0
+
+    # Weight of the newest sample in the nodes-per-second estimate
+    NPS_SMOOTHING = 0.2
+
+    def __init__(self, min_scale: float = GOVERNOR_MIN_SCALE,
+                 min_time_ms: int = GOVERNOR_MIN_TIME_MS,
+                 max_time_ms: int = GOVERNOR_MAX_TIME_MS,
+                 time_sliced: bool = False):
+        """
+        time_sliced: searches in this process are time-sliced by a
+            SearchScheduler, so they aren't counted as load
+        """
+        self.min_scale = min(1.0, max(0.01, min_scale))
+        self.min_time_ms = min_time_ms
+        self.max_time_ms = max_time_ms
+        self.lock = threading.Lock()
+        self.cpu_count = os.cpu_count() or 1
+        self.time_sliced = time_sliced
+
+        self.active_searches = 0
+        self.load_per_cpu = 0.0
+        self.last_load_check = 0.0
+        # Nodes per second of uncontended searches (None until measured)
+        self.nps_estimate = None
+
+        # Metrics
+        self.searches = 0
+        self.scaled_searches = 0
+
+    def _read_load(self) -> float:
+        """1-minute load average per CPU (0 where unavailable)"""
+        now = time.time()
+        if now - self.last_load_check >= self.LOAD_CHECK_INTERVAL_SECONDS:
+            self.last_load_check = now
+            try:
+                self.load_per_cpu = os.getloadavg()[0] / self.cpu_count
+            except (AttributeError, OSError):
+                self.load_per_cpu = 0.0
+        return self.load_per_cpu
+
+    def pressure(self) -> float:
+        """
+        How oversubscribed the CPU is (1.0 = fully used).
+        Searches in one process share a core (the GIL), so each active
+        search counts as a full core - unless a scheduler time-slices them,
+        which already shrinks each search's share of its budget.
+        """
+        with self.lock:
+            searches = 0.0 if self.time_sliced else float(self.active_searches)
+            return max(searches, self._read_load())
+
+    def scale(self) -> float:
+        """Factor for time budgets under the current load"""
+        return self._scale_for(self.pressure())
+
+    def _scale_for(self, pressure: float) -> float:
+        if pressure <= 1.0:
+            return 1.0
+        return max(self.min_scale, 1.0 / pressure)
+
+    def adjust_limits(self, time_ms: int, soft_time_ms: int = None) -> tuple:
+        """
+        Governed limits for a search about to start (count it as active first).
+        Returns: (soft_time_ms, time_ms, node_limit); node_limit is None when
+        the search isn't scaled or no speed estimate exists yet.
+        Without load the limits come back unchanged. A scaled limit is kept
+        within min_time_ms and max_time_ms, but never raised above the
+        limit asked for.
+        """
+        scale = self.scale()
+        with self.lock:
+            self.searches += 1
+            if scale >= 1.0:
+                return soft_time_ms, time_ms, None
+            self.scaled_searches += 1
+            nps_estimate = self.nps_estimate
+
+        time_ms = self._scaled(time_ms, scale, self.max_time_ms)
+        if soft_time_ms is not None:
+            soft_time_ms = self._scaled(soft_time_ms, scale, time_ms)
+
+        node_limit = None
+        if nps_estimate:
+            node_limit = max(1, int(nps_estimate * time_ms / 1000))
+        return soft_time_ms, time_ms, node_limit
+
+    def _scaled(self, time_ms: int, scale: float, cap_ms: int) -> int:
+        """time_ms scaled, capped at cap_ms and floored at min_time_ms (or time_ms if lower)"""
+        return max(min(self.min_time_ms, time_ms), min(int(time_ms * scale), cap_ms))
+
+    @contextmanager
+    def track_search(self):
+        """Count a search as active while the block runs"""
+        with self.lock:
+            self.active_searches += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active_searches -= 1
+
+    def record_search(self, nodes: int, elapsed_ms: float, contended: bool):
+        """Update the speed estimate from a finished search"""
+        if contended or nodes <= 0 or elapsed_ms <= 0:
+            return
+        nps = nodes * 1000 / elapsed_ms
+        with self.lock:
+            if self.nps_estimate is None:
+                self.nps_estimate = nps
+            else:
+                self.nps_estimate += self.NPS_SMOOTHING * (nps - self.nps_estimate)
+
+    def get_stats(self) -> dict:
+        """Governor state"""
+        pressure = self.pressure()
+        with self.lock:
+            return {
+                'active_searches': self.active_searches,
+                'time_sliced': self.time_sliced,
+                'load_per_cpu': round(self.load_per_cpu, 2),
+                'pressure': round(pressure, 2),
+                'scale': round(self._scale_for(pressure), 2),
+                'nps_estimate': int(self.nps_estimate) if self.nps_estimate else None,
+                'searches': self.searches,
+                'scaled_searches': self.scaled_searches,
+                'min_scale': self.min_scale,
+                'min_time_ms': self.min_time_ms,
+                'max_time_ms': self.max_time_ms,
+            }
+
+
+# Process-wide governor shared by every Bot
+think_time_governor = ThinkTimeGovernor()
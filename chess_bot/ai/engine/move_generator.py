@@ -2,28 +2,38 @@ from .piece import Piece
 from .move import Move
 
 
+def _compute_num_squares_to_edge():
+    """Number of squares to the edge for each square, per direction"""
+    num_squares_to_edge = [[0] * 8 for _ in range(64)]
+    for square in range(64):
+        rank = square // 8
+        file = square % 8
+        north = 7 - rank
+        south = rank
+        west = file
+        east = 7 - file
+        
+        num_squares_to_edge[square] = [
+            north, south, west, east,
+            min(north, west), min(south, east),
+            min(north, east), min(south, west)
+        ]
+    return num_squares_to_edge
+
+
 class MoveGenerator:
     """Generates legal moves with proper check detection"""
     
+    # Read-only tables, built once per process and shared by every
+    # instance (and, in forked workers, by every process)
+    DIRECTION_OFFSETS = [8, -8, -1, 1, 7, -7, 9, -9]
+    KNIGHT_OFFSETS = [15, 17, -17, -15, 10, -6, 6, -10]
+    NUM_SQUARES_TO_EDGE = _compute_num_squares_to_edge()
+    
     def __init__(self):
-        self.direction_offsets = [8, -8, -1, 1, 7, -7, 9, -9]
-        self.knight_offsets = [15, 17, -17, -15, 10, -6, 6, -10]
-        
-        # Precompute number of squares to edge for each square
-        self.num_squares_to_edge = [[0] * 8 for _ in range(64)]
-        for square in range(64):
-            rank = square // 8
-            file = square % 8
-            north = 7 - rank
-            south = rank
-            west = file
-            east = 7 - file
-            
-            self.num_squares_to_edge[square] = [
-                north, south, west, east,
-                min(north, west), min(south, east),
-                min(north, east), min(south, west)
-            ]
+        self.direction_offsets = self.DIRECTION_OFFSETS
+        self.knight_offsets = self.KNIGHT_OFFSETS
+        self.num_squares_to_edge = self.NUM_SQUARES_TO_EDGE
     
     def generate_moves(self, board, captures_only=False):
         """Generate all pseudo-legal moves"""
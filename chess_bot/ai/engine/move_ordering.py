@@ -3,6 +3,8 @@ Move Ordering for better alpha-beta pruning.
 Based on Chess-Coding-Adventure/src/Core/Search/MoveOrdering.cs
 """
 
+from array import array
+
 from .piece import Piece
 
 class MoveOrdering:
@@ -13,11 +15,26 @@ class MoveOrdering:
     WINNING_CAPTURE_BIAS = 8_000_000
     PROMOTE_BIAS = 6_000_000
     KILLER_BIAS = 4_000_000
+    COUNTER_MOVE_BIAS = 3_000_000
     LOSING_CAPTURE_BIAS = 2_000_000
     REGULAR_BIAS = 0
     
     MAX_KILLER_MOVE_PLY = 32
     
+    # History scores are kept within [-MAX_HISTORY, MAX_HISTORY] by gravity
+    MAX_HISTORY = 16384
+    MAX_HISTORY_BONUS = 1600
+    
+    # Flat table sizes
+    # history: [color][from_square][to_square]
+    HISTORY_SIZE = 2 * 64 * 64
+    # counter moves: [previous piece][previous to_square] -> move value
+    COUNTER_MOVE_SIZE = 16 * 64
+    # continuation history: [color][previous piece type][previous to][piece type][to]
+    PIECE_TO_SIZE = 6 * 64
+    CONTINUATION_BLOCKS = 2 * PIECE_TO_SIZE
+    CONTINUATION_SIZE = CONTINUATION_BLOCKS * PIECE_TO_SIZE
+    
     # Piece values for MVV-LVA
     PIECE_VALUES = {
         Piece.PAWN: 100,
@@ -31,12 +48,42 @@ class MoveOrdering:
     def __init__(self):
         """Initialize move ordering"""
         self.killer_moves = [[None, None] for _ in range(self.MAX_KILLER_MOVE_PLY)]
-        # History[color][from_square][to_square]
-        self.history = [[[0 for _ in range(64)] for _ in range(64)] for _ in range(2)]
+        self.history = array('i', bytes(4 * self.HISTORY_SIZE))
+        self.counter_moves = array('H', bytes(2 * self.COUNTER_MOVE_SIZE))
+        self.continuation_history = array('i', bytes(4 * self.CONTINUATION_SIZE))
+        # Continuation history is aged lazily, one block (the moves following
+        # one previous move) at a time: a block is halved once for every
+        # age_history call since it was last used
+        self.history_generation = 0
+        self.continuation_generations = array('I', bytes(4 * self.CONTINUATION_BLOCKS))
     
     def clear_history(self):
-        """Clear history heuristic"""
-        self.history = [[[0 for _ in range(64)] for _ in range(64)] for _ in range(2)]
+        """Clear history, counter-move and continuation tables in place"""
+        self.history[:] = array('i', bytes(4 * self.HISTORY_SIZE))
+        self.counter_moves[:] = array('H', bytes(2 * self.COUNTER_MOVE_SIZE))
+        self.continuation_history[:] = array('i', bytes(4 * self.CONTINUATION_SIZE))
+        self.history_generation = 0
+        self.continuation_generations[:] = array('I', bytes(4 * self.CONTINUATION_BLOCKS))
+    
+    def age_history(self):
+        """Halve history scores so older results fade (called per search)"""
+        self.history[:] = array('i', [value >> 1 for value in self.history])
+        # The continuation table is too large to halve on every search
+        self.history_generation += 1
+    
+    def _age_continuation_block(self, block):
+        """Apply the aging a continuation history block has missed"""
+        shift = self.history_generation - self.continuation_generations[block]
+        if not shift:
+            return
+        self.continuation_generations[block] = self.history_generation
+        start = block * self.PIECE_TO_SIZE
+        end = start + self.PIECE_TO_SIZE
+        # Scores are below 2**15, so larger shifts leave 0 or -1 anyway
+        shift = min(shift, 31)
+        self.continuation_history[start:end] = array(
+            'i', [value >> shift for value in self.continuation_history[start:end]]
+        )
     
     def clear_killers(self):
         """Clear killer moves"""
@@ -61,22 +108,34 @@ class MoveOrdering:
         return (move == self.killer_moves[ply][0] or 
                 move == self.killer_moves[ply][1])
     
-    def order_moves(self, moves, board, hash_move, ply_from_root):
+    def order_moves(self, moves, board, hash_move, ply_from_root, prev_move=None):
         """
         Order moves for better alpha-beta search.
-        Returns list of (move, score) tuples sorted by score (highest first).
+        prev_move is the move that led to this position (for counter-move
+        and continuation history).
+        Returns list of moves sorted by score (highest first).
         """
         move_scores = []
         
+        # Context of the previous move, shared by every move scored here
+        counter_move_value = 0
+        continuation_offset = -1
+        if prev_move is not None:
+            prev_piece = board.square[prev_move.target_square]
+            counter_move_value = self.counter_moves[self._counter_move_index(prev_piece, prev_move)]
+            continuation_offset = self._continuation_offset(board.white_to_move, prev_piece, prev_move)
+        
         for move in moves:
-            score = self._score_move(move, board, hash_move, ply_from_root)
+            score = self._score_move(move, board, hash_move, ply_from_root,
+                                     counter_move_value, continuation_offset)
             move_scores.append((move, score))
         
         # Sort by score (descending)
         move_scores.sort(key=lambda x: x[1], reverse=True)
         return [move for move, score in move_scores]
     
-    def _score_move(self, move, board, hash_move, ply_from_root):
+    def _score_move(self, move, board, hash_move, ply_from_root,
+                    counter_move_value=0, continuation_offset=-1):
         """Score a single move"""
         # Hash move gets highest priority
         if hash_move and move.value == hash_move.value:
@@ -112,20 +171,80 @@ class MoveOrdering:
         
         # Quiet moves
         if not is_capture:
-            # Killer moves
+            # Killer moves, then the counter move to the previous move
             if self.is_killer_move(move, ply_from_root):
                 score = self.KILLER_BIAS
+            elif counter_move_value and move.value == counter_move_value:
+                score = self.COUNTER_MOVE_BIAS
             else:
                 score = self.REGULAR_BIAS
             
             # History heuristic
             color_index = 0 if board.white_to_move else 1
-            score += self.history[color_index][start_square][target_square]
+            score += self.history[self._history_index(color_index, move)]
+            
+            # Continuation history
+            if continuation_offset >= 0:
+                score += self.continuation_history[
+                    continuation_offset + self._piece_to_index(moved_piece_type, target_square)
+                ]
         
         return score
     
-    def update_history(self, move, board, depth):
-        """Update history heuristic for a good quiet move"""
+    def update_history(self, move, board, depth, prev_move=None, quiets_tried=()):
+        """
+        Update history tables after a quiet move caused a beta cutoff.
+        The cutoff move gets a bonus, quiet moves tried before it a malus.
+        board must be at the position where the moves were played.
+        """
+        bonus = min(depth * depth, self.MAX_HISTORY_BONUS)
         color_index = 0 if board.white_to_move else 1
-        history_bonus = depth * depth
-        self.history[color_index][move.start_square][move.target_square] += history_bonus
\ No newline at end of file
+        
+        continuation_offset = -1
+        if prev_move is not None:
+            prev_piece = board.square[prev_move.target_square]
+            self.counter_moves[self._counter_move_index(prev_piece, prev_move)] = move.value
+            continuation_offset = self._continuation_offset(board.white_to_move, prev_piece, prev_move)
+        
+        self._update_move_history(move, board, color_index, continuation_offset, bonus)
+        for quiet_move in quiets_tried:
+            self._update_move_history(quiet_move, board, color_index, continuation_offset, -bonus)
+    
+    def _update_move_history(self, move, board, color_index, continuation_offset, bonus):
+        """Apply a gravity update to the history entries of one move"""
+        index = self._history_index(color_index, move)
+        self.history[index] = self._apply_gravity(self.history[index], bonus)
+        
+        if continuation_offset >= 0:
+            piece_type = Piece.piece_type(board.square[move.start_square])
+            index = continuation_offset + self._piece_to_index(piece_type, move.target_square)
+            self.continuation_history[index] = self._apply_gravity(
+                self.continuation_history[index], bonus
+            )
+    
+    def _apply_gravity(self, value, bonus):
+        """Move value towards the bonus, shrinking as it nears MAX_HISTORY"""
+        return value + bonus - value * abs(bonus) // self.MAX_HISTORY
+    
+    @staticmethod
+    def _history_index(color_index, move):
+        return (color_index * 64 + move.start_square) * 64 + move.target_square
+    
+    @staticmethod
+    def _counter_move_index(prev_piece, prev_move):
+        return prev_piece * 64 + prev_move.target_square
+    
+    @staticmethod
+    def _piece_to_index(piece_type, square):
+        return (piece_type - 1) * 64 + square
+    
+    def _continuation_offset(self, white_to_move, prev_piece, prev_move):
+        """Start of the continuation history block following prev_move"""
+        prev_piece_type = Piece.piece_type(prev_piece)
+        if prev_piece_type == Piece.NONE:
+            return -1
+        color_index = 0 if white_to_move else 1
+        prev_index = self._piece_to_index(prev_piece_type, prev_move.target_square)
+        block = color_index * self.PIECE_TO_SIZE + prev_index
+        self._age_continuation_block(block)
+        return block * self.PIECE_TO_SIZE
@@ -2,7 +2,15 @@
 Opening Book for chess bot - plays known good opening moves.
 """
 
+import bisect
+import mmap
 import random
+import struct
+
+from .book_compiler import (
+    book_key, read_header, unpack_move,
+    HEADER_SIZE, RECORD_FORMAT, RECORD_SIZE
+)
 
 
 class OpeningBook:
@@ -133,6 +141,89 @@ class OpeningBook:
             return ' '.join(parts[:4])
         return fen
 
+class CompactOpeningBook:
+    """
+    Binary opening book (see book_compiler) probed in place.
+    The file is memory-mapped, so processes share its pages and nothing
+    is parsed up front; lookups binary search on the board's zobrist key.
+    """
+    
+    def __init__(self, book_path):
+        """Memory-map a compiled book file"""
+        self.book_path = book_path
+        self.rng = random.Random()
+        
+        with open(book_path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        count = read_header(self.data)
+        if count is None:
+            self.data.close()
+            raise ValueError(f"Incompatible or corrupt book file: {book_path}")
+        self.count = count
+    
+    def __len__(self):
+        return self.count
+    
+    def _key_at(self, index):
+        return struct.unpack_from('<Q', self.data, HEADER_SIZE + index * RECORD_SIZE)[0]
+    
+    def _lower_bound(self, key):
+        """Index of the first record with record key >= key"""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+    
+    def get_moves(self, board):
+        """All book moves for a position: [(move_uci, weight), ...]"""
+        key = book_key(board)
+        moves = []
+        index = self._lower_bound(key)
+        while index < self.count:
+            record_key, packed_move, weight = struct.unpack_from(
+                RECORD_FORMAT, self.data, HEADER_SIZE + index * RECORD_SIZE
+            )
+            if record_key != key:
+                break
+            moves.append((unpack_move(packed_move), weight))
+            index += 1
+        return moves
+    
+    def has_book_move(self, board):
+        """Check if position is in book"""
+        return bool(self.get_moves(board))
+    
+    def try_get_book_move(self, board, weight_pow=0.5):
+        """
+        Get a book move for current position.
+        weight_pow: 0 = random, 1 = always most popular
+        Returns: (move_uci, is_book_move)
+        """
+        moves = self.get_moves(board)
+        if not moves:
+            return None, False
+        
+        total_weight = sum(count ** weight_pow for _, count in moves)
+        rand = self.rng.random() * total_weight
+        
+        cumulative = 0
+        for move_uci, count in moves:
+            cumulative += count ** weight_pow
+            if rand <= cumulative:
+                return move_uci, True
+        
+        return moves[0][0], True
+    
+    def close(self):
+        """Unmap the book file"""
+        self.data.close()
+
+
 # Example usage with polyglot book format (for .bin files)
 class PolyglotBook:
     """
@@ -143,13 +234,12 @@ class PolyglotBook:
     def __init__(self, book_path):
         """Load polyglot book from .bin file"""
         self.entries = []
+        self.keys = []
         self._load_polyglot_book(book_path)
     
     def _load_polyglot_book(self, book_path):
         """Load binary polyglot book"""
         try:
-            import struct
-            
             with open(book_path, 'rb') as f:
                 while True:
                     # Polyglot entry: 8 bytes key + 2 bytes move + 2 bytes weight + 4 bytes learn
@@ -157,7 +247,7 @@ class PolyglotBook:
                     if len(data) < 16:
                         break
                     
-                    key, move, weight, learn = struct.unpack(">QHHІ", data)
+                    key, move, weight, learn = struct.unpack(">QHHI", data)
                     self.entries.append({
                         'key': key,
                         'move': move,
@@ -168,11 +258,17 @@ class PolyglotBook:
             print(f"Warning: Book file {book_path} not found")
         except Exception as e:
             print(f"Error loading book: {e}")
+        
+        # Polyglot files are sorted by key; sort anyway so bisect is safe
+        self.entries.sort(key=lambda entry: entry['key'])
+        self.keys = [entry['key'] for entry in self.entries]
     
     def probe(self, zobrist_key):
         """Find moves for given zobrist key"""
         moves = []
-        for entry in self.entries:
-            if entry['key'] == zobrist_key:
-                moves.append((entry['move'], entry['weight']))
+        index = bisect.bisect_left(self.keys, zobrist_key)
+        while index < len(self.keys) and self.keys[index] == zobrist_key:
+            entry = self.entries[index]
+            moves.append((entry['move'], entry['weight']))
+            index += 1
         return moves
@@ -0,0 +1,198 @@
+"""
+Streaming PGN parser.
+Reads games one at a time from any iterable of lines (an open file, a
+generator over database rows, ...), so arbitrarily large inputs are never
+held in memory. SAN moves are resolved with the engine's MoveGenerator.
+"""
+
+import re
+
+from .board import Board
+from .move import Move
+from .move_generator import MoveGenerator
+from .piece import Piece
+
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+HEADER_RE = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+TOKEN_RE = re.compile(r'\{[^}]*\}?|;.*|\(|\)|\$\d+|[^\s(){};]+')
+MOVE_NUMBER_RE = re.compile(r'^\d+\.+')
+
+SAN_PIECES = {
+    'N': Piece.KNIGHT, 'B': Piece.BISHOP, 'R': Piece.ROOK,
+    'Q': Piece.QUEEN, 'K': Piece.KING
+}
+SAN_PROMOTIONS = {
+    'Q': Move.PROMOTE_TO_QUEEN_FLAG, 'N': Move.PROMOTE_TO_KNIGHT_FLAG,
+    'R': Move.PROMOTE_TO_ROOK_FLAG, 'B': Move.PROMOTE_TO_BISHOP_FLAG
+}
+
+
+class PgnGame:
+    """A parsed game: tag pairs plus the main line in SAN"""
+
+    def __init__(self):
+        self.headers = {}
+        self.san_moves = []
+        self.result = '*'
+
+    @property
+    def starting_fen(self):
+        return self.headers.get('FEN', Board.START_FEN)
+
+    def iter_moves(self, max_ply=None, move_generator=None):
+        """
+        Replay the game, yielding (board, move) before each move is made.
+        Stops at max_ply or at the first SAN move that can't be resolved.
+        The same Board object is yielded each time; copy what you need.
+        """
+        move_generator = move_generator or MoveGenerator()
+        board = Board(self.starting_fen)
+
+        for ply, san in enumerate(self.san_moves):
+            if max_ply is not None and ply >= max_ply:
+                return
+            move = san_to_move(board, san, move_generator)
+            if move is None:
+                return
+            yield board, move
+            board.make_move(move)
+
+
+def iter_pgn_games(lines):
+    """
+    Parse PGN text into PgnGame objects, one game at a time.
+    lines: any iterable of str (e.g. an open text file).
+    """
+    game = None
+    in_movetext = False
+    in_comment = False
+    variation_depth = 0
+
+    for line in lines:
+        line = line.strip()
+
+        # Continuation of a multi-line {comment}
+        if in_comment:
+            end = line.find('}')
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+
+        if not line or line.startswith('%'):
+            continue
+
+        header = HEADER_RE.match(line) if variation_depth == 0 else None
+        if header:
+            # A tag after movetext starts the next game
+            if in_movetext and game is not None:
+                yield game
+                game = None
+                in_movetext = False
+            if game is None:
+                game = PgnGame()
+            game.headers[header.group(1)] = header.group(2)
+            continue
+
+        if game is None:
+            game = PgnGame()
+        in_movetext = True
+
+        for token in TOKEN_RE.findall(line):
+            if token[0] == '{':
+                if not token.endswith('}'):
+                    in_comment = True
+                continue
+            if token[0] == ';' or token[0] == '$':
+                continue
+            if token == '(':
+                variation_depth += 1
+                continue
+            if token == ')':
+                variation_depth = max(0, variation_depth - 1)
+                continue
+            if variation_depth > 0:
+                continue
+
+            if token in RESULTS:
+                game.result = token
+                yield game
+                game = None
+                in_movetext = False
+                break
+
+            san = MOVE_NUMBER_RE.sub('', token)
+            if san:
+                game.san_moves.append(san)
+
+    if game is not None and (game.san_moves or game.headers):
+        yield game
+
+
+def san_to_move(board, san, move_generator=None):
+    """
+    Resolve a SAN move (e.g. 'Nbd7', 'exd6', 'e8=Q+', 'O-O') against the
+    legal moves in the position. Returns Move or None.
+    """
+    move_generator = move_generator or MoveGenerator()
+    san = san.rstrip('+#!?')
+    legal_moves = move_generator.generate_moves(board)
+
+    # Castling
+    if san in ('O-O', '0-0', 'O-O-O', '0-0-0'):
+        target_file = 6 if len(san) == 3 else 2
+        for move in legal_moves:
+            if move.flag == Move.CASTLE_FLAG and move.target_square % 8 == target_file:
+                return move
+        return None
+
+    # Promotion suffix: e8=Q or e8Q
+    promotion_flag = None
+    if '=' in san:
+        san, promotion = san.split('=', 1)
+        promotion_flag = SAN_PROMOTIONS.get(promotion[:1].upper())
+    elif len(san) > 2 and san[-1] in SAN_PROMOTIONS and san[-2].isdigit():
+        promotion_flag = SAN_PROMOTIONS[san[-1]]
+        san = san[:-1]
+
+    if not san:
+        return None
+
+    piece_type = SAN_PIECES.get(san[0], Piece.PAWN)
+    body = san[1:] if piece_type != Piece.PAWN else san
+    if len(body) < 2:
+        return None
+
+    target = body[-2:]
+    if target[0] not in 'abcdefgh' or target[1] not in '12345678':
+        return None
+    target_square = (ord(target[0]) - ord('a')) + (int(target[1]) - 1) * 8
+
+    # Disambiguation: whatever remains apart from the capture marker
+    disambiguation = body[:-2].replace('x', '')
+    from_file = from_rank = None
+    for char in disambiguation:
+        if char in 'abcdefgh':
+            from_file = ord(char) - ord('a')
+        elif char in '12345678':
+            from_rank = int(char) - 1
+
+    for move in legal_moves:
+        if move.target_square != target_square:
+            continue
+        if Piece.piece_type(board.square[move.start_square]) != piece_type:
+            continue
+        if from_file is not None and move.start_square % 8 != from_file:
+            continue
+        if from_rank is not None and move.start_square // 8 != from_rank:
+            continue
+        if move.is_promotion:
+            if move.flag != (promotion_flag or Move.PROMOTE_TO_QUEEN_FLAG):
+                continue
+        elif promotion_flag is not None:
+            continue
+        return move
+
+    return None
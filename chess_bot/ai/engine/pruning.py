@@ -0,0 +1,92 @@
+"""
+Forward pruning configuration for the searcher.
+Every technique can be switched on and off individually so its effect on
+node counts and playing strength can be measured in isolation.
+"""
+
+import math
+
+
+def _build_lmr_table(size):
+    """Precompute reductions: 0.75 + log(depth) * log(move_index) / 2.25"""
+    return [
+        [0 if depth == 0 or index == 0 else
+         int(0.75 + math.log(depth) * math.log(index) / 2.25)
+         for index in range(size)]
+        for depth in range(size)
+    ]
+
+
+class PruningConfig:
+    """Switches and margins for forward pruning and reductions"""
+
+    # Null-move pruning
+    NULL_MOVE_MIN_DEPTH = 3
+    NULL_MOVE_BASE_REDUCTION = 2
+    NULL_MOVE_DEPTH_DIVISOR = 4
+
+    # Reverse futility (static null-move) pruning
+    REVERSE_FUTILITY_MAX_DEPTH = 3
+    REVERSE_FUTILITY_MARGIN = 120  # per ply of remaining depth
+
+    # Futility pruning at frontier nodes, indexed by remaining depth
+    FUTILITY_MAX_DEPTH = 2
+    FUTILITY_MARGINS = [0, 200, 450]
+
+    # Late-move pruning: quiet moves searched before the rest are skipped,
+    # indexed by remaining depth
+    LATE_MOVE_PRUNING_MAX_DEPTH = 3
+    LATE_MOVE_PRUNING_COUNTS = [0, 8, 12, 18]
+
+    # Late-move reductions
+    LMR_MIN_DEPTH = 3
+    LMR_MIN_MOVE_INDEX = 3
+    LMR_TABLE_SIZE = 64
+
+    LMR_TABLE = _build_lmr_table(LMR_TABLE_SIZE)
+
+    def __init__(self, null_move=True, reverse_futility=True, futility=True,
+                 late_move_pruning=True, late_move_reductions=True):
+        """Initialize pruning switches (all enabled by default)"""
+        self.null_move = null_move
+        self.reverse_futility = reverse_futility
+        self.futility = futility
+        self.late_move_pruning = late_move_pruning
+        self.late_move_reductions = late_move_reductions
+
+    @classmethod
+    def disabled(cls):
+        """Config with every pruning technique switched off"""
+        return cls(null_move=False, reverse_futility=False, futility=False,
+                   late_move_pruning=False, late_move_reductions=False)
+
+    @classmethod
+    def from_dict(cls, options):
+        """Build a config from a {name: bool} dict, e.g. parsed from a bench run"""
+        config = cls()
+        known_options = config.to_dict()
+        for name, enabled in options.items():
+            if name not in known_options:
+                raise ValueError(f"Unknown pruning option: {name}")
+            setattr(config, name, bool(enabled))
+        return config
+
+    def to_dict(self):
+        """Current switches as a dict"""
+        return {
+            'null_move': self.null_move,
+            'reverse_futility': self.reverse_futility,
+            'futility': self.futility,
+            'late_move_pruning': self.late_move_pruning,
+            'late_move_reductions': self.late_move_reductions,
+        }
+
+    def null_move_reduction(self, ply_remaining):
+        """Depth reduction for the null-move search"""
+        return self.NULL_MOVE_BASE_REDUCTION + ply_remaining // self.NULL_MOVE_DEPTH_DIVISOR
+
+    def late_move_reduction(self, ply_remaining, move_index):
+        """Depth reduction for a late quiet move"""
+        depth = min(ply_remaining, self.LMR_TABLE_SIZE - 1)
+        index = min(move_index, self.LMR_TABLE_SIZE - 1)
+        return self.LMR_TABLE[depth][index]
@@ -1,56 +1,59 @@
 class RepetitionTable:
     """Tracks position history for draw by repetition detection"""
-    
-    def __init__(self, max_size=256):
+
+    def __init__(self):
         """Initialize repetition table"""
-        self.hashes = [0] * max_size
-        self.start_indices = [0] * (max_size + 1)
-        self.count = 0
-        self.max_size = max_size
-    
+        # Stack of position hashes, oldest first, for popping in order
+        self.hashes = []
+        # How often each hash is on the stack, for O(1) lookups
+        self.counts = {}
+
+    @property
+    def count(self):
+        """Number of positions on the stack"""
+        return len(self.hashes)
+
     def init(self, position_history):
         """
         Initialize from board's position history.
-        position_history should be a list of zobrist hashes from oldest to newest.
+        position_history should be a list of zobrist hashes from oldest to newest
+        (Board.repetition_position_history: the game since its last irreversible move).
         """
-        self.count = min(len(position_history), self.max_size)
-        
-        for i in range(self.count):
-            self.hashes[i] = position_history[i]
-            self.start_indices[i] = 0
-        
-        self.start_indices[self.count] = 0
-    
+        self.hashes = list(position_history)
+        self.counts = {}
+        for zobrist_hash in self.hashes:
+            self.counts[zobrist_hash] = self.counts.get(zobrist_hash, 0) + 1
+
     def push(self, zobrist_hash, reset=False):
         """
         Push a new position onto the stack.
-        reset=True means this is an irreversible move (pawn move or capture)
+        reset=True means this is an irreversible move (pawn move or capture).
+        Positions from before it can never recur, so they don't need to be
+        hidden from contains().
         """
-        if self.count < self.max_size:
-            self.hashes[self.count] = zobrist_hash
-            # If reset, this becomes new starting point for repetition checking
-            self.start_indices[self.count + 1] = self.count if reset else self.start_indices[self.count]
-        self.count += 1
-    
+        self.hashes.append(zobrist_hash)
+        self.counts[zobrist_hash] = self.counts.get(zobrist_hash, 0) + 1
+
     def pop(self):
         """Pop the last position from the stack"""
-        if self.count > 0:
-            self.count -= 1
-    
+        if self.hashes:
+            zobrist_hash = self.hashes.pop()
+            remaining = self.counts[zobrist_hash] - 1
+            if remaining:
+                self.counts[zobrist_hash] = remaining
+            else:
+                del self.counts[zobrist_hash]
+
     def try_pop(self):
         """Safely pop from stack"""
         self.pop()
-    
+
     def contains(self, zobrist_hash):
         """
-        Check if position has occurred before in current search.
-        Does not count the current position (count-1).
+        Check if position has occurred before in the game or current search.
+        Does not count the last position pushed.
         """
-        start = self.start_indices[self.count]
-        
-        # Check up to count-1 so current position is not counted
-        for i in range(start, self.count - 1):
-            if self.hashes[i] == zobrist_hash:
-                return True
-        
-        return False
\ No newline at end of file
+        occurrences = self.counts.get(zobrist_hash, 0)
+        if occurrences and self.hashes[-1] == zobrist_hash:
+            occurrences -= 1
+        return occurrences > 0
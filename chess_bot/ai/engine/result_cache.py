@@ -0,0 +1,182 @@
+"""
+Result cache shared by every Bot in a process (and optionally across
+replicas through Redis).
+
+Many games reach the same positions right after the opening book ends, and
+each would repeat the same search. A finished search stores its root lines
+with the depth and nodes it reached, keyed by (zobrist key, strength
+profile); a later search of the position returns them immediately if they
+reach the depth or node count that search would (its target). Noisy
+profiles still pick among the cached lines with their own randomness.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+RESULT_CACHE_SIZE = int(os.environ.get('BOT_RESULT_CACHE_SIZE', '10000'))
+# Empty: no shared tier
+RESULT_CACHE_REDIS_URL = os.environ.get('BOT_RESULT_CACHE_REDIS_URL', '')
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get('BOT_RESULT_CACHE_TTL', '86400'))
+# Positions further than this from the last pawn move or capture aren't
+# cached: the game history behind them can make repetitions change the result
+RESULT_CACHE_MAX_FIFTY_MOVE_COUNTER = int(os.environ.get('BOT_RESULT_CACHE_MAX_FIFTY', '20'))
+
+
+class RedisResultTier:
+    """Cached results in Redis as JSON, shared by every replica"""
+
+    KEY_PREFIX = 'bot:result:'
+
+    def __init__(self, url: str, ttl_seconds: int = RESULT_CACHE_TTL_SECONDS):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.errors = (redis.RedisError,)
+
+    def get(self, key: str) -> Optional[dict]:
+        data = self.client.get(self.KEY_PREFIX + key)
+        return json.loads(data) if data is not None else None
+
+    def set(self, key: str, entry: dict):
+        self.client.set(self.KEY_PREFIX + key, json.dumps(entry), ex=self.ttl_seconds)
+
+
+class ResultCache:
+    """LRU of search results by position and strength profile"""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, shared=None,
+                 max_fifty_move_counter: int = RESULT_CACHE_MAX_FIFTY_MOVE_COUNTER):
+        """
+        shared: optional second tier with get(key) / set(key, entry),
+            e.g. RedisResultTier
+        """
+        self.max_entries = max(1, max_entries)
+        self.shared = shared
+        self.max_fifty_move_counter = max_fifty_move_counter
+        # key -> {'depth', 'nodes', 'lines': [[move_uci, score, reply_uci], ...]}
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.shared_errors = 0
+
+    @staticmethod
+    def _key(board, profile_name: str) -> str:
+        return f"{profile_name}:{board.zobrist_key:016x}"
+
+    def is_cacheable(self, board) -> bool:
+        """Whether results for this position may be shared between games"""
+        return board.fifty_move_counter <= self.max_fifty_move_counter
+
+    @staticmethod
+    def _reaches(entry: dict, min_depth: Optional[int], min_nodes: Optional[int]) -> bool:
+        """Whether a cached search got as far as a search stopping at either target would"""
+        return ((min_depth is not None and entry['depth'] >= min_depth)
+                or (min_nodes is not None and entry.get('nodes', 0) >= min_nodes))
+
+    def lookup(self, board, profile_name: str, min_depth: int = None,
+               min_nodes: int = None) -> Optional[dict]:
+        """
+        Cached result for a search that would stop at min_depth or after
+        min_nodes (whichever comes first; None: no such limit), or None.
+        Without either target nothing is comparable and the lookup misses.
+        Returns {'depth', 'nodes', 'lines': [[move_uci, score, reply_uci], ...]}
+        (best first; reply_uci is the expected answer, or None).
+        """
+        if min_depth is None and min_nodes is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        key = self._key(board, profile_name)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self._reaches(entry, min_depth, min_nodes):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._shared_get(key)
+        with self.lock:
+            if entry is None or not self._reaches(entry, min_depth, min_nodes):
+                self.misses += 1
+                return None
+            self._put(key, entry)
+            self.shared_hits += 1
+            return entry
+
+    def store(self, board, profile_name: str, depth: int, nodes: int, lines: list):
+        """
+        Record a finished search's root lines [(move_uci, score, reply_uci), ...]
+        (best first)
+        """
+        if depth < 1 or not lines:
+            return
+        key = self._key(board, profile_name)
+        entry = {'depth': depth, 'nodes': nodes, 'lines': [list(line) for line in lines]}
+        with self.lock:
+            existing = self.entries.get(key)
+            if existing is not None and existing['depth'] > depth:
+                return
+            self._put(key, entry)
+            self.stores += 1
+        self._shared_set(key, entry)
+
+    def _put(self, key: str, entry: dict):
+        """Insert as most recently used, evicting the least (call with lock held)"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _shared_get(self, key: str) -> Optional[dict]:
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.get(key)
+        except self.shared.errors:
+            # The shared tier is an optimization; carry on without it
+            with self.lock:
+                self.shared_errors += 1
+            return None
+
+    def _shared_set(self, key: str, entry: dict):
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(key, entry)
+        except self.shared.errors:
+            with self.lock:
+                self.shared_errors += 1
+
+    def get_stats(self) -> dict:
+        """Cache metrics"""
+        with self.lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+                'stores': self.stores,
+                'shared': self.shared is not None,
+                'shared_errors': self.shared_errors,
+            }
+
+
+def _create_result_cache() -> ResultCache:
+    shared = RedisResultTier(RESULT_CACHE_REDIS_URL) if RESULT_CACHE_REDIS_URL else None
+    return ResultCache(shared=shared)
+
+
+# Process-wide result cache shared by every Bot
+result_cache = _create_result_cache()
@@ -7,7 +7,11 @@ from .evaluation import Evaluation
 from .transposition_table import TranspositionTable
 from .move_ordering import MoveOrdering
 from .repetition_table import RepetitionTable
+from .time_manager import TimeManager
+from .pruning import PruningConfig
 from .piece import Piece
+from .bitbase import get_kpk_bitbase, KNOWN_WIN_SCORE
+from .endgames import probe_endgame
 
 
 class Searcher:
@@ -15,18 +19,27 @@ class Searcher:
     
     # Constants
     MAX_EXTENSIONS = 16
+    MAX_DEPTH = 256
     IMMEDIATE_MATE_SCORE = 100000
     POSITIVE_INFINITY = 9999999
     NEGATIVE_INFINITY = -9999999
     
-    def __init__(self, board: Board):
+    # Aspiration windows
+    ASPIRATION_MIN_DEPTH = 4
+    ASPIRATION_WINDOW = 50
+    ASPIRATION_MAX_WINDOW = 1000
+    
+    def __init__(self, board: Board, pruning: Optional[PruningConfig] = None):
         """Initialize searcher"""
         self.board = board
+        self.pruning = pruning or PruningConfig()
         self.evaluation = Evaluation()
         self.move_generator = MoveGenerator()
         self.transposition_table = TranspositionTable(size_mb=64)
         self.move_ordering = MoveOrdering()
         self.repetition_table = RepetitionTable()
+        self.time_manager = TimeManager()
+        get_kpk_bitbase()  # Load before the first search starts its clock
         
         # Search state
         self.current_depth = 0
@@ -37,34 +50,82 @@ class Searcher:
         self.has_searched_at_least_one_move = False
         self.search_cancelled = False
         
+        # External cancellation: anything with is_set()/set(), e.g. a
+        # threading.Event or a multiprocessing.Event shared with another process.
+        # Unlike search_cancelled it survives start_search, so a cancel that
+        # arrives before the search starts isn't lost.
+        self.cancel_token = None
+        
+        # Triangular PV table: pv_table[ply] is the best line found from ply
+        self.pv_table = [[] for _ in range(self.MAX_DEPTH + self.MAX_EXTENSIONS + 2)]
+        
+        # MultiPV: root lines of the last completed iteration as
+        # (move, score, pv) tuples, best first
+        self.multipv = 1
+        self.root_lines = []
+        self.excluded_root_moves = set()
+        
+        # Called with the searcher after every completed iteration
+        self.iteration_callback = None
+        # Called once a search's clock has started (see start_search)
+        self.start_callback = None
+        
+        # Limits of the current search (see start_search)
+        self.node_limit = None
+        self.depth_limit = self.MAX_DEPTH
+        
+        # Called every CHECK_INTERVAL_NODES nodes; a cooperative scheduler
+        # uses it to park this search while others run
+        self.yield_hook = None
+        
         # Diagnostics
         self.nodes_searched = 0
         self.num_cutoffs = 0
         self.search_start_time = 0
         self.time_limit_ms = 0
+        self.nodes_until_time_check = TimeManager.CHECK_INTERVAL_NODES
     
     def clear_for_new_position(self):
         """Clear search data for new position"""
         self.move_ordering.clear()
         self.transposition_table.clear()
     
-    def start_search(self, time_ms: int) -> Tuple[Optional[Move], int, int]:
+    def start_search(self, time_ms: int, soft_time_ms: Optional[int] = None,
+                     multipv: int = 1, node_limit: Optional[int] = None,
+                     depth_limit: Optional[int] = None) -> Tuple[Optional[Move], int, int]:
         """
         Main search entry point.
+        time_ms is the hard limit; no new iteration starts after soft_time_ms.
+        With multipv > 1 the best multipv root moves are searched as separate
+        lines (see root_lines).
+        node_limit stops the search after that many nodes, depth_limit after
+        that iteration.
         Returns: (best_move, evaluation, nodes_searched)
         """
         # Initialize
         self.best_eval_this_iteration = self.best_eval = 0
         self.best_move_this_iteration = self.best_move = None
         self.search_cancelled = False
+        self.multipv = max(1, multipv)
+        self.node_limit = node_limit
+        self.depth_limit = min(depth_limit or self.MAX_DEPTH, self.MAX_DEPTH)
+        self.root_lines = []
+        self.excluded_root_moves = set()
         self.nodes_searched = 0
         self.num_cutoffs = 0
         self.current_depth = 0
+        # Before the clock starts, so the search doesn't pay for it
+        self.move_ordering.age_history()
         self.time_limit_ms = time_ms
         self.search_start_time = time.time()
+        self.nodes_until_time_check = TimeManager.CHECK_INTERVAL_NODES
+        self.time_manager.start(time_ms, soft_time_ms)
+        if self.start_callback is not None:
+            self.start_callback()
         
-        # Initialize repetition table
-        self.repetition_table.init([])
+        # Seed the repetition table with the game so far, so lines that
+        # return to earlier positions are scored as draws
+        self.repetition_table.init(self.board.repetition_position_history)
         
         # Run iterative deepening search
         self.run_iterative_deepening_search()
@@ -78,21 +139,19 @@ class Searcher:
     
     def run_iterative_deepening_search(self):
         """Iterative deepening loop"""
-        for search_depth in range(1, 257):
+        for search_depth in range(1, self.depth_limit + 1):
             self.has_searched_at_least_one_move = False
             self.current_iteration_depth = search_depth
             
-            # Check time before starting iteration
-            if self.should_stop_search():
+            # Don't start an iteration that is not expected to finish
+            if not self.time_manager.should_start_iteration():
                 break
             
             # Search at current depth
-            self.search(
-                ply_remaining=search_depth,
-                ply_from_root=0,
-                alpha=self.NEGATIVE_INFINITY,
-                beta=self.POSITIVE_INFINITY
-            )
+            if self.multipv > 1:
+                lines = self.search_root_lines(search_depth)
+            else:
+                self.aspiration_search(search_depth)
             
             # Check if search was cancelled
             if self.search_cancelled:
@@ -106,6 +165,13 @@ class Searcher:
                 self.current_depth = search_depth
                 self.best_move = self.best_move_this_iteration
                 self.best_eval = self.best_eval_this_iteration
+                if self.multipv > 1:
+                    self.root_lines = lines
+                else:
+                    self.root_lines = [(self.best_move, self.best_eval, self._root_pv())]
+                self.time_manager.on_iteration_complete(self.best_move, self.best_eval)
+                if self.iteration_callback:
+                    self.iteration_callback(self)
                 
                 # Reset for next iteration
                 self.best_eval_this_iteration = float('-inf')
@@ -116,10 +182,99 @@ class Searcher:
                     num_ply_to_mate = self.num_ply_to_mate_from_score(self.best_eval)
                     if num_ply_to_mate <= search_depth:
                         break
+                
+                # From a recognized draw or loss every reply is scored at
+                # depth 1. A won root keeps iterating: the winning line leaves
+                # the bitbase (promotion), and only deeper searches see how
+                # it continues.
+                root_endgame_score = probe_endgame(self.board)
+                if root_endgame_score is not None and root_endgame_score < KNOWN_WIN_SCORE:
+                    break
+    
+    def search_root_lines(self, search_depth: int) -> list:
+        """
+        MultiPV: search the root once per line, excluding the root moves of
+        the lines already found in this iteration. Later passes reuse the
+        transposition table filled by the earlier ones.
+        Returns: [(move, score, pv), ...] best first
+        """
+        lines = []
+        
+        try:
+            for line_index in range(self.multipv):
+                previous_score = None
+                if line_index < len(self.root_lines):
+                    previous_score = self.root_lines[line_index][1]
+                
+                self.best_move_this_iteration = None
+                self.has_searched_at_least_one_move = False
+                self.aspiration_search(search_depth, previous_score)
+                
+                # Cancelled, or no root moves left
+                if self.search_cancelled or self.best_move_this_iteration is None:
+                    break
+                
+                lines.append((self.best_move_this_iteration, self.best_eval_this_iteration, self._root_pv()))
+                self.excluded_root_moves.add(self.best_move_this_iteration.value)
+        finally:
+            self.excluded_root_moves = set()
+        
+        # The first line is the iteration's result, even if a later pass was cancelled
+        if lines:
+            self.best_move_this_iteration, self.best_eval_this_iteration = lines[0][0], lines[0][1]
+            self.has_searched_at_least_one_move = True
+        
+        return lines
+    
+    def _root_pv(self) -> list:
+        """Principal variation of the current root search, starting with its best move"""
+        best_move = self.best_move_this_iteration
+        if best_move is None:
+            return []
+        pv = self.pv_table[0]
+        if not pv or pv[0].value != best_move.value:
+            return [best_move]
+        return list(pv)
+    
+    def get_principal_variation(self) -> list:
+        """Principal variation of the last completed iteration"""
+        return self.root_lines[0][2] if self.root_lines else []
+    
+    def aspiration_search(self, search_depth: int, previous_score: Optional[int] = None) -> int:
+        """
+        Search the root with a window around the previous iteration's score.
+        The window is widened on the failing side until the score lands inside it.
+        """
+        if previous_score is None:
+            previous_score = self.best_eval
+        
+        if search_depth < self.ASPIRATION_MIN_DEPTH or self.is_mate_score(previous_score):
+            return self.search(search_depth, 0, self.NEGATIVE_INFINITY, self.POSITIVE_INFINITY)
+        
+        window = self.ASPIRATION_WINDOW
+        alpha = previous_score - window
+        beta = previous_score + window
+        
+        while True:
+            eval_score = self.search(search_depth, 0, alpha, beta)
+            
+            if self.search_cancelled:
+                return eval_score
+            
+            if eval_score <= alpha:
+                # Fail low: widen downwards
+                window *= 2
+                alpha = self.NEGATIVE_INFINITY if window > self.ASPIRATION_MAX_WINDOW else eval_score - window
+            elif eval_score >= beta:
+                # Fail high: widen upwards
+                window *= 2
+                beta = self.POSITIVE_INFINITY if window > self.ASPIRATION_MAX_WINDOW else eval_score + window
+            else:
+                return eval_score
     
     def search(self, ply_remaining: int, ply_from_root: int, alpha: int, beta: int,
                num_extensions: int = 0, prev_move: Optional[Move] = None, 
-               prev_was_capture: bool = False) -> int:
+               prev_was_capture: bool = False, allow_null_move: bool = True) -> int:
         """
         Main alpha-beta search with enhancements.
         """
@@ -127,6 +282,11 @@ class Searcher:
             self.search_cancelled = True
             return 0
         
+        self.pv_table[ply_from_root] = []
+        
+        # Root moves already reported by earlier MultiPV passes
+        root_exclusions = self.excluded_root_moves if ply_from_root == 0 else None
+        
         # Draw detection
         if ply_from_root > 0:
             # Fifty move rule
@@ -143,33 +303,94 @@ class Searcher:
             beta = min(beta, self.IMMEDIATE_MATE_SCORE - ply_from_root)
             if alpha >= beta:
                 return alpha
+            
+            # Recognized endgames: dead draws and bitbase results are exact
+            endgame_score = probe_endgame(self.board)
+            if endgame_score is not None:
+                return endgame_score
         
-        # Check transposition table
+        # Check transposition table (its root entry ignores MultiPV exclusions)
         zobrist_key = self._calculate_zobrist_key()
-        tt_value = self.transposition_table.lookup_evaluation(
-            zobrist_key, ply_remaining, ply_from_root, alpha, beta
-        )
+        tt_value = TranspositionTable.LOOKUP_FAILED
+        if not root_exclusions:
+            tt_value = self.transposition_table.lookup_evaluation(
+                zobrist_key, ply_remaining, ply_from_root, alpha, beta
+            )
         if tt_value != TranspositionTable.LOOKUP_FAILED:
             if ply_from_root == 0:
                 self.best_move_this_iteration = self.transposition_table.try_get_stored_move(zobrist_key)
                 if self.best_move_this_iteration:
                     self.best_eval_this_iteration = tt_value
+                    self.pv_table[0] = [self.best_move_this_iteration]
             return tt_value
         
         # Quiescence search at leaf nodes
         if ply_remaining == 0:
             return self.quiescence_search(alpha, beta)
         
+        in_check = self.is_side_to_move_in_check()
+        is_pv_node = beta - alpha > 1
+        pruning = self.pruning
+        
+        # Static evaluation for pruning decisions (only where it can be used)
+        static_eval = None
+        can_prune = (ply_from_root > 0 and not is_pv_node and not in_check
+                     and not self.is_mate_score(alpha) and not self.is_mate_score(beta))
+        if can_prune:
+            static_eval = Evaluation.evaluate(self.board)
+            
+            # Reverse futility pruning: far above beta near the horizon
+            if (pruning.reverse_futility
+                    and ply_remaining <= pruning.REVERSE_FUTILITY_MAX_DEPTH
+                    and static_eval - pruning.REVERSE_FUTILITY_MARGIN * ply_remaining >= beta):
+                return beta
+            
+            # Null-move pruning (not in pawn-only endings, to avoid zugzwang)
+            if (pruning.null_move and allow_null_move
+                    and ply_remaining >= pruning.NULL_MOVE_MIN_DEPTH
+                    and static_eval >= beta
+                    and self._has_non_pawn_material(self.board.white_to_move)):
+                reduction = pruning.null_move_reduction(ply_remaining)
+                self.board.make_null_move()
+                null_score = -self.search(
+                    max(0, ply_remaining - 1 - reduction),
+                    ply_from_root + 1,
+                    -beta,
+                    -beta + 1,
+                    num_extensions,
+                    None,
+                    False,
+                    allow_null_move=False
+                )
+                self.board.unmake_null_move()
+                
+                if self.search_cancelled:
+                    return 0
+                if null_score >= beta:
+                    self.num_cutoffs += 1
+                    return beta
+        
+        # Futility pruning: quiet moves can't raise a hopeless frontier node
+        futility_pruning = (can_prune and pruning.futility
+                            and ply_remaining <= pruning.FUTILITY_MAX_DEPTH
+                            and static_eval + pruning.FUTILITY_MARGINS[ply_remaining] <= alpha)
+        
+        # Late-move pruning: skip late quiet moves at shallow depth
+        late_move_limit = None
+        if (can_prune and pruning.late_move_pruning
+                and ply_remaining <= pruning.LATE_MOVE_PRUNING_MAX_DEPTH):
+            late_move_limit = pruning.LATE_MOVE_PRUNING_COUNTS[ply_remaining]
+        
         # Generate and order moves
         moves = self.move_generator.generate_moves(self.board)
         hash_move = self.transposition_table.try_get_stored_move(zobrist_key)
         ordered_moves = self.move_ordering.order_moves(
-            moves, self.board, hash_move, ply_from_root
+            moves, self.board, hash_move, ply_from_root, prev_move
         )
         
         # Checkmate/stalemate detection
         if len(ordered_moves) == 0:
-            if self.is_in_check():
+            if in_check:
                 # Checkmate
                 mate_score = self.IMMEDIATE_MATE_SCORE - ply_from_root
                 return -mate_score
@@ -177,6 +398,9 @@ class Searcher:
                 # Stalemate
                 return 0
         
+        if root_exclusions:
+            ordered_moves = [move for move in ordered_moves if move.value not in root_exclusions]
+        
         # Update repetition table
         if ply_from_root > 0 and prev_move:
             was_pawn_move = Piece.piece_type(self.board.square[prev_move.target_square]) == Piece.PAWN
@@ -184,14 +408,23 @@ class Searcher:
         
         evaluation_bound = TranspositionTable.UPPER_BOUND
         best_move_in_position = None
+        quiets_tried = []
         
         for i, move in enumerate(ordered_moves):
             captured_piece_type = Piece.piece_type(self.board.square[move.target_square])
             is_capture = captured_piece_type != 0
+            is_quiet = not is_capture and not move.is_promotion
+            
+            if late_move_limit is not None and is_quiet and i >= late_move_limit:
+                continue
             
             # Make move
             self.board.make_move(move, in_search=True)
             
+            if futility_pruning and is_quiet and i > 0 and not self.is_side_to_move_in_check():
+                self.board.unmake_move(move, in_search=True)
+                continue
+            
             # Extensions
             extension = 0
             if num_extensions < self.MAX_EXTENSIONS:
@@ -202,25 +435,8 @@ class Searcher:
                     if target_rank == 1 or target_rank == 6:  # Passed pawn
                         extension = 1
             
-            needs_full_search = True
-            eval_score = 0
-            
-            # Late move reduction
-            if extension == 0 and ply_remaining >= 3 and i >= 3 and not is_capture:
-                reduce_depth = 1
-                eval_score = -self.search(
-                    ply_remaining - 1 - reduce_depth,
-                    ply_from_root + 1,
-                    -alpha - 1,
-                    -alpha,
-                    num_extensions,
-                    move,
-                    is_capture
-                )
-                needs_full_search = eval_score > alpha
-            
-            # Full depth search
-            if needs_full_search:
+            if i == 0:
+                # Principal variation: full window
                 eval_score = -self.search(
                     ply_remaining - 1 + extension,
                     ply_from_root + 1,
@@ -230,6 +446,51 @@ class Searcher:
                     move,
                     is_capture
                 )
+            else:
+                needs_full_search = True
+                
+                # Late move reduction
+                if (pruning.late_move_reductions and extension == 0 and not in_check
+                        and ply_remaining >= pruning.LMR_MIN_DEPTH
+                        and i >= pruning.LMR_MIN_MOVE_INDEX and not is_capture):
+                    reduce_depth = pruning.late_move_reduction(ply_remaining, i)
+                    if is_pv_node:
+                        reduce_depth -= 1
+                    reduce_depth = max(1, min(reduce_depth, ply_remaining - 2))
+                    eval_score = -self.search(
+                        ply_remaining - 1 - reduce_depth,
+                        ply_from_root + 1,
+                        -alpha - 1,
+                        -alpha,
+                        num_extensions,
+                        move,
+                        is_capture
+                    )
+                    needs_full_search = eval_score > alpha
+                
+                if needs_full_search:
+                    # Null-window scout at full depth
+                    eval_score = -self.search(
+                        ply_remaining - 1 + extension,
+                        ply_from_root + 1,
+                        -alpha - 1,
+                        -alpha,
+                        num_extensions + extension,
+                        move,
+                        is_capture
+                    )
+                    
+                    # Re-search with the full window if the scout failed high
+                    if alpha < eval_score < beta:
+                        eval_score = -self.search(
+                            ply_remaining - 1 + extension,
+                            ply_from_root + 1,
+                            -beta,
+                            -alpha,
+                            num_extensions + extension,
+                            move,
+                            is_capture
+                        )
             
             # Unmake move
             self.board.unmake_move(move, in_search=True)
@@ -241,27 +502,40 @@ class Searcher:
             
             # Beta cutoff
             if eval_score >= beta:
-                self.transposition_table.store_evaluation(
-                    zobrist_key, ply_remaining, ply_from_root, beta,
-                    TranspositionTable.LOWER_BOUND, move
-                )
+                if not root_exclusions:
+                    self.transposition_table.store_evaluation(
+                        zobrist_key, ply_remaining, ply_from_root, beta,
+                        TranspositionTable.LOWER_BOUND, move
+                    )
                 
                 # Update move ordering data
                 if not is_capture:
                     self.move_ordering.add_killer_move(move, ply_from_root)
-                    self.move_ordering.update_history(move, self.board, ply_remaining)
+                    self.move_ordering.update_history(
+                        move, self.board, ply_remaining, prev_move, quiets_tried
+                    )
                 
                 if ply_from_root > 0:
                     self.repetition_table.try_pop()
+                else:
+                    # Fail high at the root (aspiration window): keep the move
+                    self.best_move_this_iteration = move
+                    self.best_eval_this_iteration = beta
+                    self.has_searched_at_least_one_move = True
+                    self.pv_table[0] = [move] + self.pv_table[1]
                 
                 self.num_cutoffs += 1
                 return beta
             
+            if not is_capture:
+                quiets_tried.append(move)
+            
             # New best move
             if eval_score > alpha:
                 evaluation_bound = TranspositionTable.EXACT
                 best_move_in_position = move
                 alpha = eval_score
+                self.pv_table[ply_from_root] = [move] + self.pv_table[ply_from_root + 1]
                 
                 if ply_from_root == 0:
                     self.best_move_this_iteration = move
@@ -271,10 +545,11 @@ class Searcher:
         if ply_from_root > 0:
             self.repetition_table.try_pop()
         
-        self.transposition_table.store_evaluation(
-            zobrist_key, ply_remaining, ply_from_root, alpha,
-            evaluation_bound, best_move_in_position
-        )
+        if not root_exclusions:
+            self.transposition_table.store_evaluation(
+                zobrist_key, ply_remaining, ply_from_root, alpha,
+                evaluation_bound, best_move_in_position
+            )
         
         return alpha
     
@@ -314,9 +589,53 @@ class Searcher:
         return alpha
     
     def should_stop_search(self) -> bool:
-        """Check if time limit exceeded"""
-        elapsed_ms = (time.time() - self.search_start_time) * 1000
-        return elapsed_ms >= self.time_limit_ms
+        """
+        Check if the search must stop.
+        The clock is only read every CHECK_INTERVAL_NODES calls.
+        """
+        if self.search_cancelled:
+            return True
+        
+        # Polled on every node: setting an Event is the only signal another
+        # thread or process has, and reading one is cheap next to a node
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            return True
+        
+        if self.node_limit is not None and self.nodes_searched >= self.node_limit:
+            return True
+        
+        self.nodes_until_time_check -= 1
+        if self.nodes_until_time_check > 0:
+            return False
+        
+        self.nodes_until_time_check = TimeManager.CHECK_INTERVAL_NODES
+        if self.yield_hook is not None:
+            self.yield_hook()
+        return self.time_manager.hard_limit_reached()
+    
+    def cancel(self):
+        """Stop the running search (callable from another thread)"""
+        self.search_cancelled = True
+        if self.cancel_token is not None:
+            self.cancel_token.set()
+    
+    def is_side_to_move_in_check(self) -> bool:
+        """Check if the side to move is in check"""
+        color_index = 0 if self.board.white_to_move else 1
+        king_square = self.board.king_square[color_index]
+        return self.move_generator.is_square_attacked(
+            self.board, king_square, not self.board.white_to_move
+        )
+    
+    def _has_non_pawn_material(self, is_white: bool) -> bool:
+        """Check if a side has any piece other than pawns and king"""
+        color = Piece.WHITE if is_white else Piece.BLACK
+        for piece in self.board.square:
+            if piece != 0 and Piece.piece_color(piece) == color:
+                piece_type = Piece.piece_type(piece)
+                if piece_type != Piece.PAWN and piece_type != Piece.KING:
+                    return True
+        return False
     
     def is_in_check(self) -> bool:
         """Check if current side is in check"""
@@ -0,0 +1,70 @@
+"""
+Strength profiles for the difficulty levels.
+
+Weaker levels are defined by how much they search (a node budget and a
+depth cap) rather than by think time, so they cost little CPU and play the
+same regardless of host load. They also search several root lines and pick
+among the close ones after adding noise to their scores, so they make
+plausible mistakes instead of always playing the engine's best move.
+"""
+
+from .searcher import Searcher
+
+
+class StrengthProfile:
+    """Search limits and move selection for one difficulty level"""
+
+    def __init__(self, name, node_limit=None, depth_limit=None, eval_noise=0,
+                 multipv=1, selection_window=0, ponder=True):
+        """
+        node_limit / depth_limit: search limits (None for time-limited search)
+        eval_noise: standard deviation (centipawns) of the noise added to
+            root line scores before choosing a move
+        multipv: number of root lines to choose from
+        selection_window: only lines within this many centipawns of the best are candidates
+        ponder: whether the bot thinks on the opponent's time
+        """
+        self.name = name
+        self.node_limit = node_limit
+        self.depth_limit = depth_limit
+        self.eval_noise = eval_noise
+        self.multipv = multipv
+        self.selection_window = selection_window
+        self.ponder = ponder
+
+    @property
+    def is_deterministic(self) -> bool:
+        """Same position, same limits -> same move"""
+        return self.eval_noise == 0 or self.multipv == 1
+
+    @property
+    def is_limited(self) -> bool:
+        """Searches are bounded by nodes or depth rather than by the clock"""
+        return self.node_limit is not None or self.depth_limit is not None
+
+    def choose_line(self, root_lines, rng):
+        """
+        Pick one of the searcher's root lines [(move, score, pv), ...] (best first).
+        Forced mates are always played.
+        """
+        best_line = root_lines[0]
+        if self.is_deterministic or len(root_lines) == 1 or Searcher.is_mate_score(best_line[1]):
+            return best_line
+
+        candidates = [line for line in root_lines
+                      if best_line[1] - line[1] <= self.selection_window]
+        return max(candidates, key=lambda line: line[1] + rng.gauss(0, self.eval_noise))
+
+
+STRENGTH_PROFILES = {
+    'easy': StrengthProfile('easy', node_limit=300, depth_limit=2, eval_noise=80,
+                            multipv=3, selection_window=200, ponder=False),
+    'medium': StrengthProfile('medium', node_limit=2000, depth_limit=5, eval_noise=25,
+                              multipv=3, selection_window=60, ponder=False),
+    'hard': StrengthProfile('hard'),
+}
+
+
+def get_strength_profile(difficulty: str) -> StrengthProfile:
+    """Profile for a difficulty level (medium if unknown)"""
+    return STRENGTH_PROFILES.get(difficulty, STRENGTH_PROFILES['medium'])
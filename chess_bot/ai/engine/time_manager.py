@@ -0,0 +1,159 @@
+"""
+Time management for the searcher.
+Splits the budget for a move into a soft and a hard deadline and decides
+whether another iterative deepening iteration is worth starting.
+"""
+
+import time
+
+
+class TimeManager:
+    """Soft/hard deadline bookkeeping for a single search"""
+
+    # The clock is only read once every this many nodes.
+    # Nodes cost hundreds of microseconds here, so a small interval is enough.
+    CHECK_INTERVAL_NODES = 32
+
+    # Fraction of the budget used as the soft limit for fixed-time searches
+    SOFT_LIMIT_FRACTION = 0.5
+
+    # Expected growth of search time from one depth to the next
+    BRANCHING_FACTOR_ESTIMATE = 3.0
+
+    # Soft limit scaling when the root best move changes / stays the same
+    INSTABILITY_SCALE = 1.4
+    STABILITY_SCALE = 0.85
+    STABLE_ITERATIONS_BEFORE_SHRINK = 3
+    MIN_SOFT_SCALE = 0.4
+    MAX_SOFT_SCALE = 2.0
+
+    # Score drop (centipawns) between iterations that extends the soft limit
+    SCORE_DROP_MARGIN = 30
+    SCORE_DROP_SCALE = 1.3
+
+    # Plan for this many moves when the clock has no moves-to-go
+    DEFAULT_MOVES_TO_GO = 40
+    # Never let the hard limit exceed this fraction of the remaining clock
+    MAX_CLOCK_FRACTION = 0.25
+    MIN_THINK_TIME_MS = 50
+
+    def __init__(self):
+        """Initialize time manager"""
+        self.start_time = 0.0
+        self.soft_limit_ms = 0
+        self.hard_limit_ms = 0
+        self.base_soft_limit_ms = 0
+        self.soft_scale = 1.0
+
+        # Stability tracking across iterations
+        self.last_best_move_value = None
+        self.last_score = None
+        self.stable_iterations = 0
+        self.iteration_start_ms = 0.0
+        self.last_iteration_ms = 0.0
+
+    def start(self, hard_limit_ms: int, soft_limit_ms: int = None):
+        """Start the clock for a new search"""
+        if soft_limit_ms is None:
+            soft_limit_ms = hard_limit_ms * self.SOFT_LIMIT_FRACTION
+
+        self.start_time = time.time()
+        self.hard_limit_ms = hard_limit_ms
+        self.base_soft_limit_ms = min(soft_limit_ms, hard_limit_ms)
+        self.soft_limit_ms = self.base_soft_limit_ms
+        self.soft_scale = 1.0
+
+        self.last_best_move_value = None
+        self.last_score = None
+        self.stable_iterations = 0
+        self.iteration_start_ms = 0.0
+        self.last_iteration_ms = 0.0
+
+    def update_limits(self, hard_limit_ms: int, soft_limit_ms: int = None):
+        """
+        Replace the limits of a running search, measured from its original start.
+        Used when a ponder search becomes the real search.
+        """
+        if soft_limit_ms is None:
+            soft_limit_ms = hard_limit_ms * self.SOFT_LIMIT_FRACTION
+
+        self.hard_limit_ms = hard_limit_ms
+        self.base_soft_limit_ms = min(soft_limit_ms, hard_limit_ms)
+        self.soft_limit_ms = min(self.hard_limit_ms, self.base_soft_limit_ms * self.soft_scale)
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the search started"""
+        return (time.time() - self.start_time) * 1000
+
+    def hard_limit_reached(self) -> bool:
+        """Check if the hard deadline has passed"""
+        return self.elapsed_ms() >= self.hard_limit_ms
+
+    def should_start_iteration(self) -> bool:
+        """
+        Decide whether to start the next iteration.
+        Stops once the soft limit has passed, or when the next iteration is
+        predicted to run past the hard limit.
+        """
+        elapsed = self.elapsed_ms()
+        if elapsed >= self.soft_limit_ms:
+            return False
+
+        predicted_ms = self.last_iteration_ms * self.BRANCHING_FACTOR_ESTIMATE
+        if elapsed + predicted_ms > self.hard_limit_ms:
+            return False
+
+        self.iteration_start_ms = elapsed
+        return True
+
+    def on_iteration_complete(self, best_move, score: int):
+        """
+        Update the soft limit after a completed iteration.
+        An unstable best move or a falling score extends the soft limit,
+        a best move that stays the same for several iterations shrinks it.
+        """
+        self.last_iteration_ms = self.elapsed_ms() - self.iteration_start_ms
+        best_move_value = best_move.value if best_move else None
+
+        if self.last_best_move_value is not None:
+            if best_move_value != self.last_best_move_value:
+                self.stable_iterations = 0
+                self.soft_scale *= self.INSTABILITY_SCALE
+            else:
+                self.stable_iterations += 1
+                if self.stable_iterations >= self.STABLE_ITERATIONS_BEFORE_SHRINK:
+                    self.soft_scale *= self.STABILITY_SCALE
+
+        if self.last_score is not None and score < self.last_score - self.SCORE_DROP_MARGIN:
+            self.soft_scale *= self.SCORE_DROP_SCALE
+
+        self.soft_scale = max(self.MIN_SOFT_SCALE, min(self.MAX_SOFT_SCALE, self.soft_scale))
+        self.soft_limit_ms = min(self.hard_limit_ms, self.base_soft_limit_ms * self.soft_scale)
+
+        self.last_best_move_value = best_move_value
+        self.last_score = score
+
+    @classmethod
+    def allocate(cls, time_remaining_ms: int, increment_ms: int,
+                 moves_to_go: int = None, max_think_time_ms: int = None) -> tuple:
+        """
+        Allocate soft and hard limits from a game clock.
+        Returns: (soft_limit_ms, hard_limit_ms)
+        """
+        moves_to_go = moves_to_go or cls.DEFAULT_MOVES_TO_GO
+
+        soft_ms = time_remaining_ms / moves_to_go
+        if time_remaining_ms > increment_ms * 2:
+            soft_ms += increment_ms * 0.8
+
+        hard_ms = min(soft_ms * 3, time_remaining_ms * cls.MAX_CLOCK_FRACTION + increment_ms * 0.8)
+
+        if max_think_time_ms is not None:
+            soft_ms = min(soft_ms, max_think_time_ms)
+            hard_ms = min(hard_ms, max_think_time_ms)
+
+        min_think_time = min(cls.MIN_THINK_TIME_MS, time_remaining_ms * 0.25)
+        hard_ms = max(min_think_time, hard_ms)
+        soft_ms = max(min_think_time, min(soft_ms, hard_ms))
+
+        return int(soft_ms), int(hard_ms)
@@ -6,6 +6,11 @@ class TranspositionTable:
     LOWER_BOUND = 1  # Beta cutoff (eval could be higher)
     UPPER_BOUND = 2  # All moves <= alpha (eval could be lower)
     
+    # Memory per entry: the Entry object with its attribute values plus the
+    # list slot (measured with tracemalloc on CPython 3.11; sys.getsizeof
+    # only sees the object header)
+    BYTES_PER_ENTRY = 120
+    
     def __init__(self, size_mb=64):
         """Initialize transposition table with given size in MB"""
         import sys
@@ -19,6 +24,10 @@ class TranspositionTable:
         self.entries = [Entry() for _ in range(num_entries)]
         self.enabled = True
     
+    def memory_bytes(self) -> int:
+        """Estimated memory held by the table"""
+        return self.count * self.BYTES_PER_ENTRY
+    
     def clear(self):
         """Clear all entries"""
         self.entries = [Entry() for _ in range(self.count)]
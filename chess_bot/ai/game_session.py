@@ -1,47 +1,308 @@
 """
 Game Session Manager - handles unique game IDs and multiple concurrent games.
-No database storage, just in-memory session management.
+No database storage: sessions live in memory, or in Redis when several
+bot-service replicas share them (BOT_SESSION_BACKEND=redis).
 """
 
+import json
+import os
 import uuid
 import time
+from contextlib import contextmanager
 from threading import Lock
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
+
+from .engine.board import Board
+from .engine.move import Move
+from .engine.move_generator import MoveGenerator
+
+
+SESSION_BACKEND = os.environ.get('BOT_SESSION_BACKEND', 'memory')
+SESSION_REDIS_URL = os.environ.get('BOT_REDIS_URL', os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+SESSION_TTL_SECONDS = int(os.environ.get('BOT_SESSION_TTL', '3600'))
+# A game lock left by a crashed request expires after this long; it should
+# outlast the longest search (BOT_SEARCH_TIMEOUT)
+SESSION_LOCK_TTL_SECONDS = int(os.environ.get('BOT_SESSION_LOCK_TTL', '120'))
+
+
+class SessionConflict(Exception):
+    """The session was changed by another request since it was loaded"""
+
+
+class GameLocked(Exception):
+    """Another request is already changing the game"""
 
 
 class GameSession:
     """Represents a single chess game session"""
     
-    def __init__(self, game_id: str):
+    def __init__(self, game_id: str, start_fen: str = Board.START_FEN):
         self.game_id = game_id
-        self.fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        self.start_fen = start_fen
+        # Live position, advanced one ply at a time; keeps the game's
+        # repetition history, which a board rebuilt from a FEN would lose
+        self.board = Board(start_fen)
         self.moves = []  # List of UCI moves
+        self.applied_moves = []  # Move objects, for taking moves back
         self.created_at = time.time()
         self.last_accessed = time.time()
         self.player_color = 'white'  # Player plays as white by default
         self.difficulty = 'medium'   # easy, medium, hard
+        # Number of times the session was saved, to detect concurrent changes
+        self.version = 0
     
-    def update_position(self, fen: str, move: str = None):
-        """Update position after a move"""
-        self.fen = fen
-        if move:
-            self.moves.append(move)
-        self.last_accessed = time.time()
+    @property
+    def fen(self) -> str:
+        """FEN of the current position"""
+        return self.board.to_fen()
+    
+    def legal_moves(self) -> List[Move]:
+        """Legal moves in the current position"""
+        return MoveGenerator().generate_moves(self.board)
+    
+    def apply_move(self, move_uci: str) -> Optional[Move]:
+        """
+        Play a move on the live board.
+        Returns the move, or None if it isn't legal (the board is unchanged).
+        """
+        # Resolve against the legal moves: UCI strings lack the move flags
+        for move in self.legal_moves():
+            if move.to_uci() == move_uci:
+                self.board.make_move(move)
+                self.moves.append(move_uci)
+                self.applied_moves.append(move)
+                self.last_accessed = time.time()
+                return move
+        return None
     
-    def is_expired(self, timeout: int = 3600) -> bool:
+    def undo_move(self):
+        """Take back the last move"""
+        # A pawn move or capture cleared the repetition history, which
+        # unmaking can't restore; replay the game instead
+        irreversible = self.board.fifty_move_counter == 0
+        move = self.applied_moves.pop()
+        self.moves.pop()
+        if not irreversible:
+            self.board.unmake_move(move)
+            return
+        self.board = Board(self.start_fen)
+        for applied in self.applied_moves:
+            self.board.make_move(applied)
+    
+    def is_expired(self, timeout: int = SESSION_TTL_SECONDS) -> bool:
         """Check if session expired (default 1 hour)"""
         return time.time() - self.last_accessed > timeout
+    
+    def to_dict(self) -> dict:
+        """Serializable state; the board is rebuilt from the moves"""
+        return {
+            'game_id': self.game_id,
+            'start_fen': self.start_fen,
+            'moves': self.moves,
+            'player_color': self.player_color,
+            'difficulty': self.difficulty,
+            'created_at': self.created_at,
+            'last_accessed': self.last_accessed,
+            'version': self.version,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GameSession':
+        """Restore a session saved with to_dict, replaying its moves"""
+        session = cls(data['game_id'], data['start_fen'])
+        for move_uci in data['moves']:
+            if not session.apply_move(move_uci):
+                raise ValueError(f"Stored game {data['game_id']} has illegal move {move_uci}")
+        session.player_color = data['player_color']
+        session.difficulty = data['difficulty']
+        session.created_at = data['created_at']
+        session.last_accessed = data['last_accessed']
+        session.version = data['version']
+        return session
 
 
-class GameSessionManager:
-    """Manages multiple game sessions"""
+class InMemorySessionBackend:
+    """Sessions in this process's memory (single replica; lost on restart)"""
     
     def __init__(self):
         self.sessions: Dict[str, GameSession] = {}
         self.lock = Lock()
+        # Games a request is changing (see lock_game)
+        self.locked_games = set()
         self.cleanup_interval = 300  # Cleanup every 5 minutes
         self.last_cleanup = time.time()
     
+    def get(self, game_id: str) -> Optional[GameSession]:
+        with self.lock:
+            return self.sessions.get(game_id)
+    
+    def save(self, session: GameSession):
+        # Requests share the stored object, so only new sessions need adding
+        with self.lock:
+            self.sessions[session.game_id] = session
+    
+    def delete(self, game_id: str) -> bool:
+        with self.lock:
+            return self.sessions.pop(game_id, None) is not None
+    
+    @contextmanager
+    def lock_game(self, game_id: str):
+        with self.lock:
+            if game_id in self.locked_games:
+                raise GameLocked(game_id)
+            self.locked_games.add(game_id)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.locked_games.discard(game_id)
+    
+    def count(self) -> int:
+        with self.lock:
+            return len(self.sessions)
+    
+    def cleanup_expired(self) -> List[str]:
+        """Remove expired sessions. Returns their IDs."""
+        current_time = time.time()
+        
+        with self.lock:
+            # Only cleanup periodically
+            if current_time - self.last_cleanup < self.cleanup_interval:
+                return []
+            
+            expired = [
+                game_id for game_id, session in self.sessions.items()
+                if session.is_expired()
+            ]
+            
+            for game_id in expired:
+                del self.sessions[game_id]
+            
+            self.last_cleanup = current_time
+        
+        if expired:
+            print(f"Cleaned up {len(expired)} expired game sessions")
+        return expired
+
+
+class RedisSessionBackend:
+    """
+    Sessions in Redis as JSON, so any replica can serve any game and games
+    survive restarts. Redis expires sessions after SESSION_TTL_SECONDS
+    without access; expiry listeners aren't called for them (search workers
+    drop idle bots on their own).
+    """
+    
+    KEY_PREFIX = 'bot:session:'
+    LOCK_KEY_PREFIX = 'bot:session-lock:'
+    
+    # Delete a lock only if this request still holds it (it may have
+    # expired and been taken by another request)
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+    
+    def __init__(self, client=None, url: str = SESSION_REDIS_URL,
+                 ttl_seconds: int = SESSION_TTL_SECONDS,
+                 lock_ttl_seconds: int = SESSION_LOCK_TTL_SECONDS):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl_seconds = lock_ttl_seconds
+    
+    def _key(self, game_id: str) -> str:
+        return f"{self.KEY_PREFIX}{game_id}"
+    
+    def get(self, game_id: str) -> Optional[GameSession]:
+        # Reading a session keeps it alive, like last_accessed in memory
+        data = self.client.getex(self._key(game_id), ex=self.ttl_seconds)
+        if data is None:
+            return None
+        session = GameSession.from_dict(json.loads(data))
+        session.last_accessed = time.time()
+        return session
+    
+    def save(self, session: GameSession):
+        """
+        Store the session unless another request saved it since it was
+        loaded (raises SessionConflict).
+        """
+        import redis
+        
+        key = self._key(session.game_id)
+        data = session.to_dict()
+        data['version'] = session.version + 1
+        
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                stored = pipe.get(key)
+                if stored is not None and json.loads(stored)['version'] != session.version:
+                    raise SessionConflict(session.game_id)
+                pipe.multi()
+                pipe.set(key, json.dumps(data), ex=self.ttl_seconds)
+                pipe.execute()
+            except redis.WatchError:
+                raise SessionConflict(session.game_id)
+        session.version += 1
+    
+    def delete(self, game_id: str) -> bool:
+        return self.client.delete(self._key(game_id)) > 0
+    
+    @contextmanager
+    def lock_game(self, game_id: str):
+        key = f"{self.LOCK_KEY_PREFIX}{game_id}"
+        token = uuid.uuid4().hex
+        if not self.client.set(key, token, nx=True, px=self.lock_ttl_seconds * 1000):
+            raise GameLocked(game_id)
+        try:
+            yield
+        finally:
+            self.client.eval(self.RELEASE_LOCK_SCRIPT, 1, key, token)
+    
+    def count(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.KEY_PREFIX}*", count=1000))
+    
+    def cleanup_expired(self) -> List[str]:
+        # Redis expires keys itself
+        return []
+
+
+def create_session_backend(name: str = SESSION_BACKEND):
+    """Session backend by name ('memory' or 'redis')"""
+    if name == 'redis':
+        return RedisSessionBackend()
+    if name != 'memory':
+        raise ValueError(f"Unknown session backend: {name}")
+    return InMemorySessionBackend()
+
+
+class GameSessionManager:
+    """Manages multiple game sessions"""
+    
+    def __init__(self, backend=None):
+        self.backend = backend or InMemorySessionBackend()
+        # Called with the game_id of every session that expires
+        self.expiry_listeners: List[Callable[[str], None]] = []
+    
+    def add_expiry_listener(self, listener: Callable[[str], None]):
+        """Register a callback for expired sessions (e.g. to stop their searches)"""
+        self.expiry_listeners.append(listener)
+    
+    def _notify_expired(self, game_ids: List[str]):
+        """Run expiry listeners"""
+        for game_id in game_ids:
+            for listener in self.expiry_listeners:
+                try:
+                    listener(game_id)
+                except Exception as e:
+                    print(f"Expiry listener failed for game {game_id}: {e}")
+    
     def create_game(self, player_color: str = 'white', difficulty: str = 'medium') -> str:
         """
         Create a new game session.
@@ -49,72 +310,51 @@ class GameSessionManager:
         """
         game_id = str(uuid.uuid4())
         
-        with self.lock:
-            session = GameSession(game_id)
-            session.player_color = player_color
-            session.difficulty = difficulty
-            self.sessions[game_id] = session
-            
-            # Cleanup old sessions
-            self._cleanup_expired_sessions()
+        session = GameSession(game_id)
+        session.player_color = player_color
+        session.difficulty = difficulty
+        self.backend.save(session)
         
+        # Cleanup old sessions
+        self._notify_expired(self.backend.cleanup_expired())
         return game_id
     
     def get_game(self, game_id: str) -> Optional[GameSession]:
         """Get game session by ID"""
-        with self.lock:
-            session = self.sessions.get(game_id)
-            if session and not session.is_expired():
-                session.last_accessed = time.time()
-                return session
-            elif session:
-                # Remove expired session
-                del self.sessions[game_id]
-            return None
+        session = self.backend.get(game_id)
+        if session and not session.is_expired():
+            session.last_accessed = time.time()
+            return session
+        elif session:
+            # Remove expired session
+            self.backend.delete(game_id)
+            self._notify_expired([game_id])
+        return None
     
-    def update_game(self, game_id: str, fen: str, move: str = None) -> bool:
-        """Update game position"""
-        with self.lock:
-            session = self.sessions.get(game_id)
-            if session:
-                session.update_position(fen, move)
-                return True
-            return False
+    def lock_game(self, game_id: str):
+        """
+        Context manager held while a request changes a game, across every
+        replica sharing the backend (raises GameLocked if another request
+        holds it). Load the session inside it; save_game's version check
+        still catches a lock that expired mid-request.
+        """
+        return self.backend.lock_game(game_id)
+    
+    def save_game(self, session: GameSession):
+        """
+        Store a session's changes (raises SessionConflict if another request
+        changed the game meanwhile)
+        """
+        self.backend.save(session)
     
     def delete_game(self, game_id: str) -> bool:
         """Delete a game session"""
-        with self.lock:
-            if game_id in self.sessions:
-                del self.sessions[game_id]
-                return True
-            return False
+        return self.backend.delete(game_id)
     
     def get_game_count(self) -> int:
         """Get number of active games"""
-        with self.lock:
-            return len(self.sessions)
-    
-    def _cleanup_expired_sessions(self):
-        """Remove expired sessions"""
-        current_time = time.time()
-        
-        # Only cleanup periodically
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        expired = [
-            game_id for game_id, session in self.sessions.items()
-            if session.is_expired()
-        ]
-        
-        for game_id in expired:
-            del self.sessions[game_id]
-        
-        self.last_cleanup = current_time
-        
-        if expired:
-            print(f"Cleaned up {len(expired)} expired game sessions")
+        return self.backend.count()
 
 
 # Global session manager instance
-game_manager = GameSessionManager()
\ No newline at end of file
+game_manager = GameSessionManager(create_session_backend())
\ No newline at end of file
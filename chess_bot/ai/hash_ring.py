@@ -0,0 +1,66 @@
+"""
+Consistent hash ring - maps keys (game IDs) to nodes (search workers).
+
+Each node is placed on the ring at many virtual points, and a key belongs to
+the first node clockwise from its hash. Adding or removing a node only moves
+the keys in that node's arcs, so every other game keeps its owner (and the
+warm bot in it).
+"""
+
+import bisect
+import hashlib
+from typing import Hashable, Optional
+
+
+# Virtual points per node; more points spread keys more evenly
+DEFAULT_VIRTUAL_NODES = 64
+
+
+def _hash(value: str) -> int:
+    """Stable across processes and restarts, unlike hash()"""
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hashing of string keys onto a changing set of nodes"""
+
+    def __init__(self, nodes=(), virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        self.virtual_nodes = max(1, virtual_nodes)
+        self.points = []  # sorted hashes of every virtual point
+        self.owners = {}  # point hash -> node
+        self.nodes = set()
+        for node in nodes:
+            self.add_node(node)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node) -> bool:
+        return node in self.nodes
+
+    def add_node(self, node: Hashable):
+        """Put a node on the ring (no-op if present)"""
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.virtual_nodes):
+            point = _hash(f"{node}#{i}")
+            # Colliding points keep their first owner
+            if point not in self.owners:
+                self.owners[point] = node
+                bisect.insort(self.points, point)
+
+    def remove_node(self, node: Hashable):
+        """Take a node off the ring; its keys move to the next nodes (no-op if absent)"""
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        self.points = [point for point in self.points if self.owners[point] != node]
+        self.owners = {point: owner for point, owner in self.owners.items() if owner != node}
+
+    def get_node(self, key: str) -> Optional[Hashable]:
+        """Node owning key (None if the ring is empty)"""
+        if not self.points:
+            return None
+        index = bisect.bisect(self.points, _hash(key)) % len(self.points)
+        return self.owners[self.points[index]]
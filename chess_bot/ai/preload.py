@@ -0,0 +1,11 @@
+"""
+Importing this module warms the process up (see warmup.py).
+
+Preloading servers import it before forking: gunicorn.conf.py in the server
+master, and the search executor's fork server, so web and search workers
+start with the engine's read-only tables already shared.
+"""
+
+from .warmup import warm_up
+
+startup_report = warm_up()
@@ -0,0 +1,690 @@
+"""
+Search Executor - runs bot searches in dedicated worker processes so they
+never occupy a web worker's CPU.
+
+Views submit jobs to a bounded priority queue and wait on a Future. One
+dispatcher thread per worker process feeds it jobs over a pipe, keeping up
+to SEARCH_SLOTS_PER_WORKER in flight, and a reader thread collects the
+results. Inside the worker a SearchScheduler time-slices the in-flight
+searches, so one process serves many games without one hogging it.
+
+Each worker keeps its own BotPool, so jobs are routed by game_id on a
+consistent hash ring: a game's moves keep landing on the worker holding its
+warm transposition table and ponder search. When a worker dies its games
+move to the next worker on the ring and search cold until it is back. A job
+whose owner stays busy for BOT_AFFINITY_SPILL_MS may run cold on any free
+worker rather than keep waiting.
+
+With BOT_SEARCH_WORKERS=0 jobs run inline in the calling thread.
+"""
+
+import atexit
+import heapq
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from functools import partial
+
+from .bot_pool import BotPool, choose_time_limits, DIFFICULTY_THINK_TIME_MS, POOL_SPARE_BOT
+from .engine.governor import think_time_governor
+from .engine.result_cache import result_cache
+from .hash_ring import HashRing
+from .search_scheduler import SearchScheduler, SchedulerTask
+from .warmup import memory_usage
+
+
+NUM_SEARCH_WORKERS = int(os.environ.get('BOT_SEARCH_WORKERS', str(os.cpu_count() or 1)))
+MAX_QUEUED_SEARCHES = int(os.environ.get('BOT_SEARCH_QUEUE_SIZE', '32'))
+SEARCH_START_METHOD = os.environ.get('BOT_SEARCH_START_METHOD', 'forkserver')
+# Searches a worker time-slices at once; more slots trade per-search speed
+# for shorter queue waits when many games ask for moves together
+SEARCH_SLOTS_PER_WORKER = int(os.environ.get('BOT_SEARCH_SLOTS_PER_WORKER', '8'))
+# How long a queued job waits for its game's worker before any worker may take it
+AFFINITY_SPILL_MS = int(os.environ.get('BOT_AFFINITY_SPILL_MS', '500'))
+# Shortest sleep of a dispatcher waiting for jobs to spill, so a zero spill
+# delay can't make it spin
+MIN_DISPATCH_WAIT_MS = 10
+
+# Lower runs first: short easy searches shouldn't wait behind hard ones
+DIFFICULTY_PRIORITY = {
+    'easy': 0,
+    'medium': 1,
+    'hard': 2
+}
+
+# Control messages are sent to every worker and get no reply
+CONTROL_JOB_ID = -1
+
+# Control jobs the worker handles as soon as they arrive, instead of
+# scheduling them behind running searches
+IMMEDIATE_JOB_KINDS = ('cancel_search',)
+
+
+class ExecutorSaturated(Exception):
+    """The search queue is full; retry after retry_after seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Search queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def run_job(bot_pool: BotPool, kind: str, payload: dict, task: SchedulerTask = None):
+    """
+    Execute one job against a bot pool (in a worker, or inline).
+    task is the scheduler task running the job, if any.
+    """
+    if kind == 'bot_move':
+        return _run_bot_move(bot_pool, payload, task)
+    if kind == 'remove_bot':
+        bot_pool.remove_bot(payload['game_id'])
+        return None
+    if kind == 'cancel_search':
+        bot_pool.cancel_search(payload['game_id'])
+        return None
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def _run_bot_move(bot_pool: BotPool, payload: dict, task: SchedulerTask = None) -> dict:
+    """
+    Find the bot's move in payload['fen'] and start pondering on it.
+    payload: {game_id, difficulty, fen, start_fen, moves, player_move, clock, time_ms}
+    With start_fen and moves the bot applies just the moves it hasn't seen.
+    """
+    game_id = payload['game_id']
+    difficulty = payload.get('difficulty', 'medium')
+    player_move = payload.get('player_move')
+
+    # Real searches take priority over other games' ponder searches
+    bot_pool.stop_pondering(except_game_id=game_id)
+    bot = bot_pool.get_bot(game_id, difficulty)
+    bot_pool.active_games.add(game_id)
+
+    if payload.get('time_ms'):
+        soft_time_ms = time_ms = payload['time_ms']
+    else:
+        soft_time_ms, time_ms = choose_time_limits(bot, payload.get('clock'), difficulty)
+
+    if task is not None:
+        task.set_budget(time_ms)
+    try:
+        # Answer from the ponder search if the bot predicted this move
+        # (and pondered from the game's actual position). The ponder search
+        # runs on the bot's own thread, outside the scheduler, so a ponder
+        # hit isn't time-sliced: this task keeps the baton while it waits
+        # for the rest of the search, which is bounded by time_ms.
+        in_sync = 'moves' not in payload or bot.game_moves == payload['moves'][:-1]
+        if player_move and in_sync:
+            ponder_result = bot.ponder_hit(player_move, time_ms, soft_time_ms)
+        else:
+            ponder_result = None
+        if ponder_result:
+            move_uci, evaluation, nodes = ponder_result
+        else:
+            # Only this thread's search yields; the ponder search is over
+            if task is not None:
+                bot.searcher.yield_hook = task.yield_slice
+            if 'moves' in payload:
+                bot.sync_game(payload.get('start_fen') or payload['fen'], payload['moves'])
+            else:
+                bot.set_position(payload['fen'])
+            move_uci, evaluation, nodes = bot.think_timed(time_ms, soft_time_ms)
+    finally:
+        bot.searcher.yield_hook = None
+        bot_pool.active_games.discard(game_id)
+        # A cancel that arrived during this search must not stop the next one
+        bot_pool.clear_cancel(game_id)
+
+    if move_uci:
+        bot.make_move(move_uci)
+        # Think on the player's time, unless the game was removed meanwhile
+        if bot_pool.bots.get(game_id) is bot:
+            bot.start_pondering()
+
+    return {
+        'move': move_uci,
+        'evaluation': evaluation,
+        'nodes': nodes,
+        'ponder_hit': ponder_result is not None,
+        # The worker's governor, cache and pool state ride along for get_stats
+        'process_stats': _process_stats(bot_pool)
+    }
+
+
+def _process_stats(bot_pool: BotPool) -> dict:
+    """State of the process-wide search components"""
+    return {
+        'governor': think_time_governor.get_stats(),
+        'result_cache': result_cache.get_stats(),
+        'bot_pool': bot_pool.get_stats(),
+        'memory': memory_usage(),
+    }
+
+
+def _send_result(conn, send_lock, job_id: int, future: Future):
+    """Send a finished job's result back to the parent"""
+    error = future.exception()
+    if error is None:
+        message = (job_id, True, future.result())
+    else:
+        message = (job_id, False, f"{type(error).__name__}: {error}")
+    try:
+        with send_lock:
+            conn.send(message)
+    except OSError:
+        pass  # The parent is gone
+
+
+def _worker_main(conn):
+    """
+    Search worker process: schedule jobs from the pipe until told to stop.
+    Results are sent back as jobs finish, not in arrival order.
+    """
+    # Ctrl-C is handled by the parent, which shuts the workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    bot_pool = BotPool()
+    if POOL_SPARE_BOT:
+        bot_pool.prepare_spare_bot()
+    scheduler = SearchScheduler()
+    # The scheduler shares the CPU between this process's searches, so the
+    # governor mustn't shrink their budgets for it again
+    think_time_governor.time_sliced = True
+    send_lock = threading.Lock()
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        job_id, kind, payload = message
+        if kind in IMMEDIATE_JOB_KINDS:
+            run_job(bot_pool, kind, payload)
+            continue
+
+        # Control jobs go through the scheduler too, so only one thread
+        # touches the bot pool at a time
+        difficulty = payload.get('difficulty', 'medium')
+        future = scheduler.submit(
+            partial(run_job, bot_pool, kind, payload),
+            budget_ms=payload.get('time_ms') or DIFFICULTY_THINK_TIME_MS.get(difficulty, 2000),
+            priority=priority_for(difficulty)
+        )
+        if job_id != CONTROL_JOB_ID:
+            future.add_done_callback(partial(_send_result, conn, send_lock, job_id))
+
+
+class SearchJob:
+    """A queued unit of work and the Future its submitter waits on"""
+
+    def __init__(self, job_id: int, kind: str, payload: dict, priority: int):
+        self.job_id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.priority = priority
+        self.future = Future()
+        self.submitted_at = time.time()
+        self.started_at = None
+
+
+class _Worker:
+    """A worker process and the dispatcher and reader threads that serve it"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.alive = False
+        self.thread = None
+        self.reader_thread = None
+        self.in_flight = {}  # job_id -> SearchJob
+        self.process_stats = None  # latest reported by the process
+        self.control = deque()
+        self.send_lock = threading.Lock()
+
+
+class SearchExecutor:
+    """Process pool with a bounded priority queue for bot searches"""
+
+    def __init__(self, num_workers: int = NUM_SEARCH_WORKERS,
+                 max_queue_size: int = MAX_QUEUED_SEARCHES,
+                 start_method: str = SEARCH_START_METHOD,
+                 slots_per_worker: int = SEARCH_SLOTS_PER_WORKER,
+                 affinity_spill_ms: int = AFFINITY_SPILL_MS):
+        self.num_workers = max(0, num_workers)
+        self.max_queue_size = max_queue_size
+        self.start_method = start_method
+        self.slots_per_worker = max(1, slots_per_worker)
+        self.affinity_spill_ms = max(0, affinity_spill_ms)
+
+        self.queue = []  # heap of (priority, sequence, job)
+        self.condition = threading.Condition()
+        self.workers = []
+        self.started = False
+        self.shutting_down = False
+        self.job_ids = itertools.count(1)
+
+        # Live workers by index, and the worker that owns each game's bot
+        self.ring = HashRing()
+        self.game_workers = {}
+
+        # Inline mode: the calling thread runs jobs against a local pool
+        self.inline_bot_pool = BotPool()
+        self.inline_lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.worker_restarts = 0
+        self.affinity_hits = 0
+        self.affinity_spills = 0
+        self.rebalanced_games = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def start(self):
+        """Start the worker processes (done lazily on first submit)"""
+        with self.condition:
+            if self.started or self.num_workers == 0:
+                return
+            self.started = True
+
+        if self.start_method in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context(self.start_method)
+        else:
+            self.context = multiprocessing.get_context()
+        if self.context.get_start_method() == 'forkserver':
+            # Import and warm the engine up once in the fork server; workers
+            # share its pages
+            self.context.set_forkserver_preload([__name__, f'{__package__}.preload'])
+
+        for index in range(self.num_workers):
+            worker = _Worker(index)
+            self._start_process(worker)
+            worker.thread = threading.Thread(
+                target=self._dispatch_loop, args=(worker,), daemon=True,
+                name=f"search-dispatch-{index}"
+            )
+            worker.reader_thread = threading.Thread(
+                target=self._read_loop, args=(worker,), daemon=True,
+                name=f"search-reader-{index}"
+            )
+            self.workers.append(worker)
+            worker.thread.start()
+            worker.reader_thread.start()
+
+        atexit.register(self.shutdown)
+
+    def _start_process(self, worker: _Worker):
+        parent_conn, child_conn = self.context.Pipe()
+        worker.process = self.context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True,
+            name=f"search-worker-{worker.index}"
+        )
+        worker.process.start()
+        child_conn.close()
+        with self.condition:
+            worker.conn = parent_conn
+            worker.alive = True
+            self.ring.add_node(worker.index)
+            self.condition.notify_all()
+
+    def _mark_dead(self, worker: _Worker):
+        """Take a dead worker off the ring until it restarts (call with condition held)"""
+        worker.alive = False
+        self.ring.remove_node(worker.index)
+
+    def submit(self, kind: str, payload: dict, priority: int = 1) -> Future:
+        """
+        Queue a job. Returns a Future with the job's result.
+        Raises ExecutorSaturated when the queue is full.
+        """
+        job = SearchJob(next(self.job_ids), kind, payload, priority)
+
+        if self.num_workers == 0:
+            return self._run_inline(job)
+
+        self.start()
+        with self.condition:
+            if len(self.queue) >= self.max_queue_size:
+                self.rejected += 1
+                raise ExecutorSaturated(self._retry_after())
+            heapq.heappush(self.queue, (priority, job.job_id, job))
+            self.submitted += 1
+            # Wake every dispatcher: only the game's owner may take the job
+            self.condition.notify_all()
+        return job.future
+
+    def run(self, kind: str, payload: dict, priority: int = 1, timeout: float = None):
+        """Submit a job and wait for its result"""
+        return self.submit(kind, payload, priority).result(timeout=timeout)
+
+    def request_bot_move(self, session, payload: dict, priority: int = 1, timeout: float = None) -> dict:
+        """
+        Run a bot_move job answering the player's move, which is already on
+        session, and wait for its result. If no result comes back (the queue
+        is full, the search times out, is cancelled or fails) the player's
+        move is taken back, so the client can resend it, and the error is
+        raised. A timed-out search is cancelled so it stops using a worker.
+        """
+        try:
+            future = self.submit('bot_move', payload, priority)
+            try:
+                return future.result(timeout=timeout)
+            except FuturesTimeoutError:
+                self.cancel_game(payload['game_id'])
+                raise
+        except Exception:
+            session.undo_move()
+            raise
+
+    def broadcast(self, kind: str, payload: dict):
+        """Send a control job (e.g. remove_bot) to every worker, without waiting"""
+        if self.num_workers == 0:
+            with self.inline_lock:
+                run_job(self.inline_bot_pool, kind, payload)
+            return
+        if not self.started:
+            return
+
+        with self.condition:
+            if kind == 'remove_bot':
+                self.game_workers.pop(payload.get('game_id'), None)
+            for worker in self.workers:
+                worker.control.append((kind, payload))
+            self.condition.notify_all()
+
+    def cancel_game(self, game_id: str) -> int:
+        """
+        Abandon a game's searches: drop its queued jobs and stop the ones
+        workers are running (their submitters get a CancelledError or a
+        result from the interrupted search). Returns the number of jobs cancelled.
+        """
+        if self.num_workers == 0:
+            # The inline search runs in the caller's thread; stop it from here
+            self.inline_bot_pool.cancel_search(game_id)
+            return 0
+
+        cancelled = 0
+        with self.condition:
+            remaining = []
+            for entry in self.queue:
+                job = entry[2]
+                if job.payload.get('game_id') == game_id and job.future.cancel():
+                    cancelled += 1
+                else:
+                    remaining.append(entry)
+            if cancelled:
+                self.queue = remaining
+                heapq.heapify(self.queue)
+
+            for worker in self.workers:
+                running = sum(1 for job in worker.in_flight.values()
+                              if job.payload.get('game_id') == game_id)
+                if running:
+                    worker.control.append(('cancel_search', {'game_id': game_id}))
+                    cancelled += running
+            self.condition.notify_all()
+        return cancelled
+
+    def _run_inline(self, job: SearchJob) -> Future:
+        with self.condition:
+            self.submitted += 1
+        with self.inline_lock:
+            job.started_at = time.time()
+            self._record_start(job)
+            try:
+                result = run_job(self.inline_bot_pool, job.kind, job.payload)
+            except Exception as e:
+                self._record_finish(job, False)
+                job.future.set_exception(e)
+            else:
+                self._record_finish(job, True)
+                job.future.set_result(result)
+        return job.future
+
+    def _next_entry(self, worker: _Worker):
+        """
+        Best queued entry this worker may take: jobs of games it owns (or
+        without a game), or any job kept waiting past the spill delay
+        (call with condition held)
+        """
+        now = time.time()
+        best = None
+        # One pass over the heap; (priority, sequence) orders entries
+        for entry in self.queue:
+            if best is not None and entry[:2] >= best[:2]:
+                continue
+            job = entry[2]
+            game_id = job.payload.get('game_id')
+            owner = self.ring.get_node(game_id) if game_id else None
+            if (owner is None or owner == worker.index
+                    or (now - job.submitted_at) * 1000 >= self.affinity_spill_ms):
+                best = entry
+        return best
+
+    def _dispatch_wait(self, worker: _Worker):
+        """Seconds an idle dispatcher sleeps before checking again, or None (call with condition held)"""
+        # A full worker is woken when one of its searches finishes
+        if not self.queue or len(worker.in_flight) >= self.slots_per_worker:
+            return None
+        # Wake up to let waiting jobs of busy owners spill over
+        return max(self.affinity_spill_ms, MIN_DISPATCH_WAIT_MS) / 1000
+
+    def _has_work(self, worker: _Worker) -> bool:
+        """Check if the dispatcher has something to send (call with condition held)"""
+        if not worker.alive:
+            return False
+        return bool(worker.control) or (
+            len(worker.in_flight) < self.slots_per_worker and self._next_entry(worker) is not None
+        )
+
+    def _route(self, worker: _Worker, job: SearchJob):
+        """
+        Record where a game's job runs (call with condition held). When the
+        ring moved a game, its stale bot is dropped from the previous owner.
+        """
+        game_id = job.payload.get('game_id')
+        if not game_id:
+            return
+        if self.ring.get_node(game_id) != worker.index:
+            # Spilled: the owner keeps the game, and catches up on the next move
+            self.affinity_spills += 1
+            return
+
+        self.affinity_hits += 1
+        previous = self.game_workers.get(game_id)
+        if previous is not None and previous != worker.index and self.workers[previous].alive:
+            self.workers[previous].control.append(('remove_bot', {'game_id': game_id}))
+            self.rebalanced_games += 1
+        self.game_workers[game_id] = worker.index
+
+    def _dispatch_loop(self, worker: _Worker):
+        """Feed one worker: control messages first, then the best queued jobs it may take"""
+        while True:
+            with self.condition:
+                while not self.shutting_down and not self._has_work(worker):
+                    self.condition.wait(self._dispatch_wait(worker))
+                if self.shutting_down:
+                    return
+
+                if worker.control:
+                    job = None
+                    kind, payload = worker.control.popleft()
+                    message = (CONTROL_JOB_ID, kind, payload)
+                else:
+                    entry = self._next_entry(worker)
+                    self.queue.remove(entry)
+                    heapq.heapify(self.queue)
+                    job = entry[2]
+                    message = (job.job_id, job.kind, job.payload)
+
+                    # Skip jobs whose submitter gave up (requeued jobs are already running)
+                    if not job.future.running() and not job.future.set_running_or_notify_cancel():
+                        continue
+                    job.started_at = time.time()
+                    worker.in_flight[job.job_id] = job
+                    self._route(worker, job)
+                conn = worker.conn
+
+            if job is not None:
+                self._record_start(job)
+
+            try:
+                with worker.send_lock:
+                    conn.send(message)
+            except OSError:
+                # The worker died: the reader restarts it; requeue the job
+                with self.condition:
+                    self._mark_dead(worker)
+                    if job is not None:
+                        worker.in_flight.pop(job.job_id, None)
+                if job is not None:
+                    self._requeue(job)
+
+    def _read_loop(self, worker: _Worker):
+        """Collect one worker's results, restarting the process if it dies"""
+        while True:
+            try:
+                job_id, ok, result = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                with self.condition:
+                    self._mark_dead(worker)
+                    lost = list(worker.in_flight.values())
+                    worker.in_flight.clear()
+                    shutting_down = self.shutting_down
+                for job in lost:
+                    self._record_finish(job, False)
+                    job.future.set_exception(RuntimeError(f"Search worker died: {e}"))
+                if shutting_down:
+                    return
+                self._restart_worker(worker)
+                continue
+
+            with self.condition:
+                job = worker.in_flight.pop(job_id, None)
+                if ok and isinstance(result, dict) and 'process_stats' in result:
+                    worker.process_stats = result.pop('process_stats')
+                # A slot is free for the dispatcher
+                self.condition.notify_all()
+            if job is None:
+                continue
+
+            self._record_finish(job, ok)
+            if ok:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(RuntimeError(result))
+
+    def _requeue(self, job: SearchJob):
+        """Put a job that never reached its worker back at the front of its priority"""
+        with self.condition:
+            heapq.heappush(self.queue, (job.priority, job.job_id, job))
+            self.condition.notify_all()
+
+    def _restart_worker(self, worker: _Worker):
+        """Replace a dead worker process (its warm bots are lost)"""
+        try:
+            worker.conn.close()
+        except OSError:
+            pass
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=1)
+        self._start_process(worker)
+        with self.condition:
+            self.worker_restarts += 1
+
+    def _record_start(self, job: SearchJob):
+        with self.condition:
+            self.total_wait_ms += (job.started_at - job.submitted_at) * 1000
+
+    def _record_finish(self, job: SearchJob, ok: bool):
+        with self.condition:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.total_run_ms += (time.time() - job.started_at) * 1000
+
+    def _retry_after(self) -> int:
+        """Seconds until the queue is expected to have room (call with condition held)"""
+        finished = self.completed + self.failed
+        avg_run_s = (self.total_run_ms / finished / 1000) if finished else 2.0
+        workers = max(1, self.num_workers)
+        return max(1, int(len(self.queue) * avg_run_s / workers + 0.5))
+
+    def get_stats(self) -> dict:
+        """Queue and worker metrics"""
+        with self.condition:
+            finished = self.completed + self.failed
+            in_flight = sum(len(worker.in_flight) for worker in self.workers)
+            started = finished + in_flight
+            return {
+                'workers': self.num_workers,
+                'slots_per_worker': self.slots_per_worker,
+                'busy_workers': sum(1 for worker in self.workers if worker.in_flight),
+                'in_flight': in_flight,
+                'queue_depth': len(self.queue),
+                'max_queue_size': self.max_queue_size,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'worker_restarts': self.worker_restarts,
+                'ring_workers': len(self.ring),
+                'affinity_hits': self.affinity_hits,
+                'affinity_spills': self.affinity_spills,
+                'rebalanced_games': self.rebalanced_games,
+                'avg_queue_wait_ms': round(self.total_wait_ms / started, 1) if started else 0.0,
+                'avg_run_ms': round(self.total_run_ms / finished, 1) if finished else 0.0,
+                'governors': self._process_stats('governor'),
+                'result_caches': self._process_stats('result_cache'),
+                'bot_pools': self._process_stats('bot_pool'),
+                'worker_memory': self._process_stats('memory'),
+            }
+
+    def _process_stats(self, component: str) -> list:
+        """
+        A component's state (governor, result_cache, bot_pool or memory) in
+        each process running searches (call with condition held)
+        """
+        if self.num_workers == 0:
+            return [_process_stats(self.inline_bot_pool)[component]]
+        return [worker.process_stats[component] for worker in self.workers if worker.process_stats]
+
+    def shutdown(self):
+        """Stop the dispatcher threads and worker processes"""
+        with self.condition:
+            if self.shutting_down:
+                return
+            self.shutting_down = True
+            self.condition.notify_all()
+
+        for worker in self.workers:
+            try:
+                with worker.send_lock:
+                    worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+
+def priority_for(difficulty: str) -> int:
+    """Queue priority of a difficulty level"""
+    return DIFFICULTY_PRIORITY.get(difficulty, 1)
+
+
+# Global search executor instance
+search_executor = SearchExecutor()
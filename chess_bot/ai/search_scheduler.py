@@ -0,0 +1,178 @@
+"""
+Search Scheduler - time-slices many searches inside one process.
+
+The searcher is recursive, so a paused search has to keep its stack
+somewhere: each task gets a thread, but only the task holding the baton
+runs. A search hands the baton on from its yield hook (every
+TimeManager.CHECK_INTERVAL_NODES nodes) and parks until it is picked again.
+Switching wakes only the chosen task, cheap next to a slice of nodes.
+
+Next task to run, in order:
+1. tasks past their deadline (they only need a slice to notice and return)
+2. the smallest fraction of its own budget used so far, so a 500 ms easy
+   search and a 5 s hard search progress at the same relative rate
+3. earliest deadline, then lower difficulty priority
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+
+# Budget assumed until a task reports its real one
+DEFAULT_BUDGET_MS = 2000
+
+
+class SchedulerTask:
+    """A unit of work run by the scheduler; passed to the task function"""
+
+    def __init__(self, scheduler: 'SearchScheduler', task_id: int, function: Callable,
+                 budget_ms: int, priority: int):
+        self.scheduler = scheduler
+        self.task_id = task_id
+        self.function = function
+        self.priority = priority
+        self.future = Future()
+        self.finished = False
+        # Shares the scheduler's lock; notified when this task gets the baton
+        self.turn = threading.Condition(scheduler.lock)
+
+        self.submitted_at = time.time()
+        self.budget_ms = budget_ms
+        self.deadline = self.submitted_at + budget_ms / 1000
+        self.cpu_ms = 0.0
+        self.slice_started = None
+        self.first_run_at = None
+
+    def set_budget(self, budget_ms: int):
+        """
+        Report the search's time limit once known, just before searching.
+        Its deadline starts now, and setup time (e.g. creating the bot) is
+        not charged against the budget.
+        """
+        now = time.time()
+        self.budget_ms = max(1, budget_ms)
+        self.deadline = now + self.budget_ms / 1000
+        self.cpu_ms = 0.0
+        self.slice_started = now
+
+    def yield_slice(self):
+        """Let another task run if it should; returns when this task runs again"""
+        self.scheduler._yield(self)
+
+    def _sort_key(self, now: float) -> tuple:
+        expired = 0 if now >= self.deadline else 1
+        return (expired, self.cpu_ms / self.budget_ms, self.deadline, self.priority, self.task_id)
+
+
+class SearchScheduler:
+    """Cooperative round-robin of searches, one running at a time"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tasks = []  # unfinished tasks
+        self.current = None  # task holding the baton
+        self.task_ids = itertools.count(1)
+
+        # Metrics
+        self.completed = 0
+        self.switches = 0
+        self.max_start_delay_ms = 0.0
+
+    def submit(self, function: Callable, budget_ms: int = DEFAULT_BUDGET_MS,
+               priority: int = 1) -> Future:
+        """
+        Run function(task) as a scheduled task. Returns a Future with its result.
+        The function should call task.yield_slice() regularly (e.g. as the
+        searcher's yield hook) and may refine task.set_budget().
+        """
+        task = SchedulerTask(self, next(self.task_ids), function, budget_ms, priority)
+        thread = threading.Thread(target=self._run_task, args=(task,), daemon=True,
+                                  name=f"scheduled-search-{task.task_id}")
+        with self.lock:
+            self.tasks.append(task)
+            if self.current is None:
+                self._switch_to(self._pick_next())
+        thread.start()
+        return task.future
+
+    def _run_task(self, task: SchedulerTask):
+        """Task thread body: wait for the baton, run, pass the baton on"""
+        with self.lock:
+            while self.current is not task:
+                task.turn.wait()
+            task.first_run_at = task.slice_started = time.time()
+            self.max_start_delay_ms = max(
+                self.max_start_delay_ms, (task.first_run_at - task.submitted_at) * 1000
+            )
+
+        try:
+            result = task.function(task)
+        except BaseException as e:
+            outcome = (False, e)
+        else:
+            outcome = (True, result)
+
+        with self.lock:
+            self._account(task)
+            task.finished = True
+            self.tasks.remove(task)
+            self.completed += 1
+            self._switch_to(self._pick_next())
+
+        # Resolve outside the lock: done callbacks may submit new tasks
+        ok, value = outcome
+        if ok:
+            task.future.set_result(value)
+        else:
+            task.future.set_exception(value)
+
+    def _yield(self, task: SchedulerTask):
+        with self.lock:
+            # Background threads (e.g. a ponder search sharing the searcher)
+            # may still call the hook after the task finished
+            if task.finished or self.current is not task:
+                return
+            if len(self.tasks) == 1:
+                return
+
+            self._account(task)
+            next_task = self._pick_next()
+            if next_task is not task:
+                self._switch_to(next_task)
+                while self.current is not task:
+                    task.turn.wait()
+            task.slice_started = time.time()
+
+    def _account(self, task: SchedulerTask):
+        """Charge the slice that just ended (call with lock held)"""
+        if task.slice_started is not None:
+            task.cpu_ms += (time.time() - task.slice_started) * 1000
+            task.slice_started = None
+
+    def _pick_next(self):
+        """Task that should run next (call with lock held)"""
+        if not self.tasks:
+            return None
+        now = time.time()
+        return min(self.tasks, key=lambda task: task._sort_key(now))
+
+    def _switch_to(self, task):
+        """Hand the baton to task (call with lock held)"""
+        if task is not self.current:
+            self.switches += 1
+        self.current = task
+        if task is not None:
+            task.turn.notify()
+
+    def get_stats(self) -> dict:
+        """Scheduler metrics"""
+        with self.lock:
+            return {
+                'running_tasks': len(self.tasks),
+                'completed': self.completed,
+                'switches': self.switches,
+                'max_start_delay_ms': round(self.max_start_delay_ms, 1),
+            }
@@ -10,6 +10,11 @@ urlpatterns = [
     path('games/<str:game_id>/move/', views.make_move, name='make_move'),
     path('games/<str:game_id>/delete/', views.delete_game, name='delete_game'),
     
+    # Analysis endpoints
+    path('analysis/start/', views.start_analysis, name='start_analysis'),
+    path('analysis/<str:analysis_id>/stream/', views.stream_analysis, name='stream_analysis'),
+    path('analysis/<str:analysis_id>/stop/', views.stop_analysis, name='stop_analysis'),
+    
     # Utility endpoints
     path('stats/', views.get_stats, name='stats'),
     path('health/', views.health_check, name='health'),
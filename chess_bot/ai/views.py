@@ -2,58 +2,109 @@
 Improved Django views with game session support and better bot configuration.
 """
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from concurrent.futures import CancelledError, TimeoutError as FuturesTimeoutError
 import json
+import os
+import queue
 
-from .engine.move import Move
-from .engine.bot import Bot
 from .engine.board import Board
-from .game_session import game_manager
+from .engine.move_generator import MoveGenerator
+from .game_session import game_manager, GameLocked, SessionConflict
+from .analysis import analysis_manager
+from .search_executor import search_executor, ExecutorSaturated, priority_for
+from .bot_pool import parse_clock
+from .warmup import get_warmup_report, memory_usage
 
 
-# Bot instances with different difficulty levels
-# We keep multiple bot instances to avoid conflicts between games
-class BotPool:
-    """Pool of bot instances for handling multiple games"""
-    
-    def __init__(self):
-        self.bots = {}
-        self.max_bots = 100  # Maximum concurrent games
-    
-    def get_bot(self, game_id: str, difficulty: str = 'medium') -> Bot:
-        """Get or create bot for game"""
-        if game_id not in self.bots:
-            if len(self.bots) >= self.max_bots:
-                # Remove oldest bot
-                oldest = min(self.bots.keys())
-                del self.bots[oldest]
-            
-            bot = Bot()
-            # Configure bot based on difficulty
-            if difficulty == 'easy':
-                bot.max_think_time_ms = 500
-                bot.use_max_think_time = True
-            elif difficulty == 'medium':
-                bot.max_think_time_ms = 2000
-                bot.use_max_think_time = True
-            elif difficulty == 'hard':
-                bot.max_think_time_ms = 5000
-                bot.use_max_think_time = False
-            
-            self.bots[game_id] = bot
-        
-        return self.bots[game_id]
-    
-    def remove_bot(self, game_id: str):
-        """Remove bot from pool"""
-        if game_id in self.bots:
-            del self.bots[game_id]
+# Longest a request waits for its search job (queueing included)
+SEARCH_TIMEOUT_SECONDS = float(os.environ.get('BOT_SEARCH_TIMEOUT', '60'))
+
+
+def _saturated_response(error: ExecutorSaturated) -> JsonResponse:
+    """503 telling the client when to retry"""
+    response = JsonResponse({
+        'success': False,
+        'error': 'Bot is busy, please retry',
+        'retry_after': error.retry_after
+    }, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def _abandon_game(game_id: str):
+    """Stop a game's searches and drop its bot from every search worker"""
+    search_executor.cancel_game(game_id)
+    search_executor.broadcast('remove_bot', {'game_id': game_id})
+
+
+# Expired sessions shouldn't keep searching or hold warm bots
+game_manager.add_expiry_listener(_abandon_game)
+
+
+def _position_payload(session) -> dict:
+    """
+    The game's position for a bot_move job. The worker's bot replays only
+    the moves it hasn't seen, keeping its board and game history.
+    """
+    return {
+        'fen': session.fen,
+        'start_fen': session.start_fen,
+        'moves': list(session.moves)
+    }
+
+
+def _search_error_response(error: Exception) -> JsonResponse:
+    """Response for a bot_move job that ended without a result"""
+    if isinstance(error, FuturesTimeoutError):
+        return JsonResponse({
+            'success': False,
+            'error': 'Bot search timed out'
+        }, status=504)
+    if isinstance(error, CancelledError):
+        return JsonResponse({
+            'success': False,
+            'error': 'Game was closed'
+        }, status=410)
+    # e.g. the search worker died
+    return JsonResponse({
+        'success': False,
+        'error': f'Bot search failed: {error}'
+    }, status=502)
 
 
-# Global bot pool
-bot_pool = BotPool()
+def _bot_move_payload(game_id: str, session, clock: dict, player_move: str = None) -> dict:
+    """
+    A bot_move job for the session's current position. Think time comes from
+    the game clock if provided, else from the difficulty's strength profile.
+    """
+    payload = {
+        'game_id': game_id,
+        'difficulty': session.difficulty,
+        **_position_payload(session),
+        'clock': clock
+    }
+    if player_move:
+        payload['player_move'] = player_move
+    return payload
+
+
+def _wait_for_bot_move(game_id: str, future):
+    """
+    Wait for a queued bot_move job.
+    Returns (result, None), or (None, error response) if the search timed out
+    (it is cancelled, so it stops using a worker), the game was deleted or
+    the search failed.
+    """
+    try:
+        return future.result(timeout=SEARCH_TIMEOUT_SECONDS), None
+    except FuturesTimeoutError as e:
+        search_executor.cancel_game(game_id)
+        return None, _search_error_response(e)
+    except Exception as e:
+        return None, _search_error_response(e)
 
 
 @csrf_exempt
@@ -64,7 +115,11 @@ def create_game(request):
     
     Request body: {
         "player_color": "white" or "black",
-        "difficulty": "easy", "medium", or "hard"
+        "difficulty": "easy", "medium", or "hard",
+        "white_time_ms": 300000,  // optional game clock, for the bot's first move
+        "black_time_ms": 300000,
+        "white_increment_ms": 0,
+        "black_increment_ms": 0
     }
     
     Returns: {
@@ -85,35 +140,51 @@ def create_game(request):
             player_color = 'white'
         if difficulty not in ['easy', 'medium', 'hard']:
             difficulty = 'medium'
+        try:
+            clock = parse_clock(data)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         
         # Create game session
         game_id = game_manager.create_game(player_color, difficulty)
-        
-        # Get starting position
-        board = Board()
-        starting_fen = board.to_fen()
+        session = game_manager.get_game(game_id)
         
         # If player is black, bot makes first move
         first_move = None
         if player_color == 'black':
-            bot = bot_pool.get_bot(game_id, difficulty)
-            bot.set_position(starting_fen)
+            try:
+                future = search_executor.submit(
+                    'bot_move', _bot_move_payload(game_id, session, clock), priority_for(difficulty)
+                )
+            except ExecutorSaturated as e:
+                game_manager.delete_game(game_id)
+                return _saturated_response(e)
             
-            time_ms = 1000 if difficulty == 'easy' else 2000
-            move_uci, evaluation, nodes = bot.think_timed(time_ms)
+            bot_result, error_response = _wait_for_bot_move(game_id, future)
+            if error_response:
+                game_manager.delete_game(game_id)
+                return error_response
+            move_uci = bot_result['move']
             
-            if move_uci:
-                move_obj = Move.from_uci(move_uci)
-                board.make_move(move_obj)
-                game_manager.update_game(game_id, board.to_fen(), move_uci)
-                first_move = move_uci
+            if not move_uci or not session.apply_move(move_uci):
+                # The game would be stuck with the bot to move
+                game_manager.delete_game(game_id)
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Bot failed to find a move'
+                }, status=502)
+            first_move = move_uci
+            game_manager.save_game(session)
         
         return JsonResponse({
             'success': True,
             'game_id': game_id,
             'player_color': player_color,
             'difficulty': difficulty,
-            'starting_fen': board.to_fen(),
+            'starting_fen': session.fen,
             'bot_first_move': first_move,
             'game_url': f'/api/bot/games/{game_id}'
         })
@@ -174,7 +245,11 @@ def make_move(request, game_id):
     Make a move in a specific game and get bot's response.
     
     Request body: {
-        "move": "e2e4"  // UCI notation
+        "move": "e2e4",  // UCI notation
+        "white_time_ms": 300000,  // optional game clock
+        "black_time_ms": 300000,
+        "white_increment_ms": 0,
+        "black_increment_ms": 0
     }
     
     Returns: {
@@ -184,18 +259,11 @@ def make_move(request, game_id):
         "new_fen": "...",
         "evaluation": 20,
         "game_over": false,
-        "result": null
+        "result": null,
+        "ponder_hit": false
     }
     """
     try:
-        # Get game session
-        session = game_manager.get_game(game_id)
-        if not session:
-            return JsonResponse({
-                'success': False,
-                'error': 'Game not found or expired'
-            }, status=404)
-        
         # Parse request
         data = json.loads(request.body)
         player_move = data.get('move')
@@ -206,121 +274,153 @@ def make_move(request, game_id):
                 'error': 'No move provided'
             }, status=400)
         
-        # Load current position
-        board = Board(session.fen)
-        
-        # Make player's move
-        from .engine.move import Move
-        from .engine.move_generator import MoveGenerator
-        
-        move = Move.from_uci(player_move)
-        
-        # Validate move is legal
-        gen = MoveGenerator()
-        legal_moves = gen.generate_moves(board)
-        legal_move_ucis = [m.to_uci() for m in legal_moves]
-        
-        if player_move not in legal_move_ucis:
+        try:
+            clock = parse_clock(data)
+        except ValueError as e:
             return JsonResponse({
                 'success': False,
-                'error': 'Illegal move',
-                'legal_moves': legal_move_ucis
+                'error': str(e)
             }, status=400)
         
-        # Apply player's move
-        board.make_move(move)
-        game_manager.update_game(game_id, board.to_fen(), player_move)
-        
-        # Check if game is over
-        legal_moves_after = gen.generate_moves(board)
-        
-        if len(legal_moves_after) == 0:
-            # Game over - checkmate or stalemate
-            in_check = gen.is_in_check(board)
-            result = 'checkmate' if in_check else 'stalemate'
-            winner = session.player_color if in_check else None
+        # One move at a time per game, on every replica; loading the session
+        # inside the lock picks up the last move played
+        with game_manager.lock_game(game_id):
+            session = game_manager.get_game(game_id)
+            if not session:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Game not found or expired'
+                }, status=404)
             
-            return JsonResponse({
-                'success': True,
-                'player_move': player_move,
-                'bot_move': None,
-                'new_fen': board.to_fen(),
-                'game_over': True,
-                'result': result,
-                'winner': winner
-            })
-        
-        # Check fifty-move rule
-        if board.fifty_move_counter >= 100:
-            return JsonResponse({
-                'success': True,
-                'player_move': player_move,
-                'bot_move': None,
-                'new_fen': board.to_fen(),
-                'game_over': True,
-                'result': 'draw',
-                'reason': 'fifty_move_rule'
-            })
-        
-        # Get bot's move
-        bot = bot_pool.get_bot(game_id, session.difficulty)
-        bot.set_position(board.to_fen())
-        
-        # Calculate think time based on difficulty
-        time_ms = {
-            'easy': 500,
-            'medium': 2000,
-            'hard': 5000
-        }.get(session.difficulty, 2000)
-        
-        bot_move_uci, evaluation, nodes = bot.think_timed(time_ms)
-        
-        if not bot_move_uci:
-            return JsonResponse({
-                'success': False,
-                'error': 'Bot failed to find a move'
-            }, status=500)
-        
-        # Apply bot's move
-        bot_move = Move.from_uci(bot_move_uci)
-        board.make_move(bot_move)
-        game_manager.update_game(game_id, board.to_fen(), bot_move_uci)
-        
-        # Check if game is over after bot's move
-        legal_moves_final = gen.generate_moves(board)
-        
-        game_over = False
-        result = None
-        winner = None
-        
-        if len(legal_moves_final) == 0:
-            game_over = True
-            in_check = gen.is_in_check(board)
-            result = 'checkmate' if in_check else 'stalemate'
-            winner = 'bot' if in_check else None
-        elif board.fifty_move_counter >= 100:
-            game_over = True
-            result = 'draw'
+            response = _play_move(game_id, session, player_move, clock)
+            game_manager.save_game(session)
+            return response
+    
+    except GameLocked:
+        return JsonResponse({
+            'success': False,
+            'error': 'A move is already being played in this game'
+        }, status=409)
+    
+    except SessionConflict:
+        # Another request (possibly on another replica) moved in this game
+        # first; the search workers' bots may have seen the discarded moves
+        search_executor.broadcast('remove_bot', {'game_id': game_id})
+        return JsonResponse({
+            'success': False,
+            'error': 'Game was changed by another request, reload it'
+        }, status=409)
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+def _play_move(game_id: str, session, player_move: str, clock: dict) -> JsonResponse:
+    """Apply the player's move and the bot's reply to the session (hold the game's lock)"""
+    board = session.board
+    gen = MoveGenerator()
+    
+    # Validate and apply player's move
+    if not session.apply_move(player_move):
+        return JsonResponse({
+            'success': False,
+            'error': 'Illegal move',
+            'legal_moves': [m.to_uci() for m in session.legal_moves()]
+        }, status=400)
+    
+    # Check if game is over
+    legal_moves_after = gen.generate_moves(board)
+    
+    if len(legal_moves_after) == 0:
+        # Game over - checkmate or stalemate
+        in_check = gen.is_in_check(board)
+        result = 'checkmate' if in_check else 'stalemate'
+        winner = session.player_color if in_check else None
+        search_executor.broadcast('remove_bot', {'game_id': game_id})
         
         return JsonResponse({
             'success': True,
             'player_move': player_move,
-            'bot_move': bot_move_uci,
+            'bot_move': None,
             'new_fen': board.to_fen(),
-            'evaluation': evaluation,
-            'nodes_searched': nodes,
-            'game_over': game_over,
+            'game_over': True,
             'result': result,
             'winner': winner
         })
     
+    # Check fifty-move rule
+    if board.fifty_move_counter >= 100:
+        search_executor.broadcast('remove_bot', {'game_id': game_id})
+        return JsonResponse({
+            'success': True,
+            'player_move': player_move,
+            'bot_move': None,
+            'new_fen': board.to_fen(),
+            'game_over': True,
+            'result': 'draw',
+            'reason': 'fifty_move_rule'
+        })
+    
+    # If no bot move comes back the player's move is taken back, so a client
+    # told to retry can resend the same move.
+    try:
+        bot_result = search_executor.request_bot_move(
+            session, _bot_move_payload(game_id, session, clock, player_move),
+            priority_for(session.difficulty), SEARCH_TIMEOUT_SECONDS
+        )
+    except ExecutorSaturated as e:
+        return _saturated_response(e)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        return _search_error_response(e)
+    bot_move_uci = bot_result['move']
+    evaluation = bot_result['evaluation']
+    nodes = bot_result['nodes']
+    
+    # Apply bot's move
+    if not bot_move_uci or not session.apply_move(bot_move_uci):
+        session.undo_move()
         return JsonResponse({
             'success': False,
-            'error': str(e)
-        }, status=400)
+            'error': 'Bot failed to find a move'
+        }, status=500)
+    
+    # Check if game is over after bot's move
+    legal_moves_final = gen.generate_moves(board)
+    
+    game_over = False
+    result = None
+    winner = None
+    
+    if len(legal_moves_final) == 0:
+        game_over = True
+        in_check = gen.is_in_check(board)
+        result = 'checkmate' if in_check else 'stalemate'
+        winner = 'bot' if in_check else None
+    elif board.fifty_move_counter >= 100:
+        game_over = True
+        result = 'draw'
+    
+    # The worker started pondering; nothing to ponder once the game is over
+    if game_over:
+        search_executor.broadcast('remove_bot', {'game_id': game_id})
+    
+    return JsonResponse({
+        'success': True,
+        'player_move': player_move,
+        'bot_move': bot_move_uci,
+        'new_fen': board.to_fen(),
+        'evaluation': evaluation,
+        'nodes_searched': nodes,
+        'ponder_hit': bot_result['ponder_hit'],
+        'game_over': game_over,
+        'result': result,
+        'winner': winner
+    })
 
 
 @csrf_exempt
@@ -329,7 +429,7 @@ def delete_game(request, game_id):
     """Delete a game session"""
     try:
         success = game_manager.delete_game(game_id)
-        bot_pool.remove_bot(game_id)
+        _abandon_game(game_id)
         
         if success:
             return JsonResponse({
@@ -349,13 +449,142 @@ def delete_game(request, game_id):
         }, status=400)
 
 
+# Seconds between keepalive comments on an idle analysis stream
+SSE_KEEPALIVE_SECONDS = 5
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_analysis(analysis_id: str, subscription):
+    """Yield an analysis subscription's events as SSE until its final result"""
+    try:
+        while True:
+            try:
+                event, data = subscription.events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                # Comment line: keeps proxies from closing the stream
+                yield ": keepalive\n\n"
+                continue
+            
+            yield _sse_event(event, data)
+            if event in ('done', 'error'):
+                return
+    finally:
+        # Finished, or the client went away: the search stops unless other
+        # clients share it
+        analysis_manager.remove_analysis(analysis_id)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def start_analysis(request):
+    """
+    Start analysing a position in the background. A request identical to a
+    running analysis (same FEN, multipv and time) joins its search.
+    
+    Request body: {
+        "fen": "...",
+        "multipv": 3,  // optional, default 1
+        "time_ms": 10000  // optional, default 5000
+    }
+    
+    Returns: {
+        "success": true,
+        "analysis_id": "uuid-here",
+        "stream_url": "/api/bot/analysis/{analysis_id}/stream/"
+    }
+    """
+    try:
+        data = json.loads(request.body) if request.body else {}
+        fen = data.get('fen') or Board.START_FEN
+        Board(fen)  # Validate
+        
+        analysis_id = analysis_manager.start_analysis(
+            fen, int(data.get('multipv', 1)), int(data.get('time_ms', 5000))
+        )
+        if analysis_id is None:
+            response = JsonResponse({
+                'success': False,
+                'error': 'Too many analyses running'
+            }, status=503)
+            response['Retry-After'] = '5'
+            return response
+        
+        return JsonResponse({
+            'success': True,
+            'analysis_id': analysis_id,
+            'stream_url': f'/api/bot/analysis/{analysis_id}/stream/'
+        })
+    
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
+
+@require_http_methods(["GET"])
+def stream_analysis(request, analysis_id):
+    """
+    Stream an analysis as server-sent events.
+    
+    Events:
+        info: {"depth", "nodes", "time_ms", "lines": [{"move", "score", "mate", "pv"}]}
+              after every completed iteration
+        done: the final result (same fields plus "fen"), then the stream ends
+        error: {"error": "..."}
+    
+    Closing the stream stops the search (once no other client shares it).
+    """
+    subscription = analysis_manager.get_analysis(analysis_id)
+    if not subscription:
+        return JsonResponse({
+            'success': False,
+            'error': 'Analysis not found'
+        }, status=404)
+    
+    response = StreamingHttpResponse(
+        _stream_analysis(analysis_id, subscription),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def stop_analysis(request, analysis_id):
+    """Stop an analysis; its stream receives the final result and ends"""
+    if not analysis_manager.stop_analysis(analysis_id):
+        return JsonResponse({
+            'success': False,
+            'error': 'Analysis not found'
+        }, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Analysis stopped'
+    })
+
+
 @require_http_methods(["GET"])
 def get_stats(request):
     """Get server statistics"""
     return JsonResponse({
         'success': True,
         'active_games': game_manager.get_game_count(),
-        'total_bots': len(bot_pool.bots)
+        'running_analyses': analysis_manager.get_analysis_count(),
+        'analysis': analysis_manager.get_stats(),
+        'search_executor': search_executor.get_stats(),
+        'process': {
+            'pid': os.getpid(),
+            'memory': memory_usage(),
+            'warmup': get_warmup_report()
+        }
     })
 
 
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bot.settings')
 
 application = get_asgi_application()
+
+# Warm the engine up (tables, opening book, bitbase) at import time so it
+# never lands in request latency and, with a preloading server, is shared
+# by forked workers.
+import ai.preload  # noqa: E402,F401
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bot.settings')
 
 application = get_wsgi_application()
+
+# Warm the engine up (tables, opening book, bitbase) at import time so it
+# never lands in request latency and, with a preloading server, is shared
+# by forked workers.
+import ai.preload  # noqa: E402,F401
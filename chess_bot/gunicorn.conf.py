@@ -0,0 +1,56 @@
+"""
+Gunicorn settings for the bot service (run `gunicorn bot.wsgi` from this
+directory).
+
+The master loads the app and warms the engine up once (preload_app, see
+ai/preload.py), then forks the web workers, which share the engine's
+read-only tables, opening book and bitbase copy-on-write. Startup time is
+logged when the server is ready; each process's resident and shared memory
+is in /api/bot/stats/ (web worker under 'process', search workers under
+'search_executor.worker_memory').
+
+Scale a single web worker with BOT_WEB_THREADS: bot searches run in the
+search executor's processes, not in the web worker. Analysis searches do run
+in the web worker, one at a time per process (see ai/analysis.py). Each web
+worker has its own search executor (BOT_SEARCH_WORKERS processes, each with a
+spare bot and its own hash ring for game affinity), its own analysis
+sessions and, with the default in-process session backend, its own games.
+More than one web worker is refused unless sessions are in Redis
+(BOT_SESSION_BACKEND=redis); even then, size BOT_SEARCH_WORKERS per web
+worker, and analysis streams and stops must reach the worker that started
+the analysis.
+"""
+
+import os
+import time
+
+_started_at = time.time()
+
+bind = os.environ.get('BOT_BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('BOT_WEB_WORKERS', '1'))
+if workers > 1 and os.environ.get('BOT_SESSION_BACKEND', 'memory') != 'redis':
+    # A game created on one worker would be unknown (404) on the others
+    raise ValueError(
+        f"BOT_WEB_WORKERS={workers} needs shared sessions (BOT_SESSION_BACKEND=redis); "
+        "scale a single worker with BOT_WEB_THREADS instead"
+    )
+# Views block on search futures and analysis streams hold a thread each
+worker_class = 'gthread'
+threads = int(os.environ.get('BOT_WEB_THREADS', '8'))
+# Longer than the longest search a request waits for (BOT_SEARCH_TIMEOUT)
+timeout = int(os.environ.get('BOT_WEB_TIMEOUT', '120'))
+preload_app = True
+
+
+def when_ready(server):
+    from ai.warmup import get_warmup_report, memory_usage
+
+    server.log.info("Bot service ready in %.0f ms", (time.time() - _started_at) * 1000)
+    server.log.info("Engine warm-up: %s", get_warmup_report())
+    server.log.info("Master memory: %s", memory_usage())
+
+
+def post_fork(server, worker):
+    from ai.warmup import memory_usage
+
+    server.log.info("Worker %s forked: %s", worker.pid, memory_usage())
@@ -132,6 +132,210 @@ def test_checkmate_detection():
     print("✓ Checkmate detection works")
 
 
+def test_compact_opening_book():
+    """Test compiling and probing the binary opening book"""
+    print("\n=== Test: Compact Opening Book ===")
+    import os
+    import tempfile
+    from chess_bot.ai.engine.book_compiler import compile_book
+    from chess_bot.ai.engine.opening_book import CompactOpeningBook
+    
+    book_txt = (
+        "pos rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -\n"
+        "e2e4 300\n"
+        "d2d4 100\n"
+        "pos rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -\n"
+        "c7c5 70000\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "book.txt")
+        bin_path = os.path.join(tmp_dir, "book.bin")
+        with open(txt_path, "w") as f:
+            f.write(book_txt)
+        
+        assert compile_book(txt_path, bin_path) == 3, "Should write one record per move"
+        book = CompactOpeningBook(bin_path)
+        
+        board = Board()
+        print(f"Start position moves: {book.get_moves(board)}")
+        assert book.get_moves(board) == [("e2e4", 300), ("d2d4", 100)], "Most played move first"
+        
+        # En passant square from the double push must not affect the lookup
+        board.make_move(Move(12, 28, Move.PAWN_TWO_UP_FLAG))
+        move_uci, is_book = book.try_get_book_move(board)
+        assert is_book and move_uci == "c7c5", "Should find move after 1.e4"
+        
+        board.make_move(Move.from_uci("c7c5"))
+        assert book.try_get_book_move(board) == (None, False), "Position not in book"
+        book.close()
+    
+    print("✓ Compact opening book works")
+
+
+def test_shared_opening_book():
+    """Test the process-wide opening book is loaded once"""
+    print("\n=== Test: Shared Opening Book ===")
+    from chess_bot.ai.engine.book_loader import get_opening_book
+    from chess_bot.ai.engine.bot import Bot
+    
+    book = get_opening_book()
+    assert book is not None, "assets/Book.txt should be found"
+    assert get_opening_book() is book, "Book should be loaded once per process"
+    assert Bot().opening_book is book, "Bots should share the process book"
+    
+    move_uci, is_book = book.try_get_book_move(Board())
+    print(f"Book move from start: {move_uci}")
+    assert is_book, "Start position should be in book"
+    
+    print("✓ Shared opening book works")
+
+
+def test_pgn_book_builder():
+    """Test parsing PGN and building a book from the games"""
+    print("\n=== Test: PGN Book Builder ===")
+    import os
+    import tempfile
+    from chess_bot.ai.engine.pgn import iter_pgn_games, san_to_move
+    from chess_bot.ai.engine.book_builder import build_book_from_pgn
+    from chess_bot.ai.engine.opening_book import CompactOpeningBook
+    
+    pgn_text = (
+        '[Event "Game 1"]\n'
+        '[Result "1-0"]\n'
+        '\n'
+        '1. e4 {best by test} e5 (1... c5 2. Nf3) 2. Nf3 Nc6 3. Bc4 Nf6\n'
+        '4. O-O $1 Bc5 1-0\n'
+        '\n'
+        '[Event "Game 2"]\n'
+        '[Result "1/2-1/2"]\n'
+        '\n'
+        '1. e4 c5 {a multi-line\n'
+        'comment} 2. Nf3 1/2-1/2\n'
+        '\n'
+        '[Event "Game 3"]\n'
+        '[Result "*"]\n'
+        '\n'
+        '1. d4 *\n'
+    )
+    games = list(iter_pgn_games(pgn_text.splitlines(True)))
+    print(f"Parsed {len(games)} games: {[game.san_moves for game in games]}")
+    assert len(games) == 3, "Should parse three games"
+    assert games[0].san_moves == ["e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6", "O-O", "Bc5"], "Variations skipped"
+    assert games[1].san_moves == ["e4", "c5", "Nf3"], "Comments skipped"
+    assert games[0].result == "1-0" and games[2].result == "*"
+    
+    moves = [move for _, move in games[0].iter_moves()]
+    assert len(moves) == 8, "All moves should resolve"
+    assert moves[6].flag == Move.CASTLE_FLAG, "O-O should resolve to castling"
+    assert san_to_move(Board(), "Nd2") is None, "Illegal SAN should not resolve"
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pgn_path = os.path.join(tmp_dir, "games.pgn")
+        bin_path = os.path.join(tmp_dir, "book.bin")
+        with open(pgn_path, "w") as f:
+            f.write(pgn_text)
+        
+        build_book_from_pgn([pgn_path], bin_path, max_ply=4, workers=1)
+        book = CompactOpeningBook(bin_path)
+        
+        board = Board()
+        print(f"Start position moves: {book.get_moves(board)}")
+        assert book.get_moves(board) == [("e2e4", 2), ("d2d4", 1)], "Counts per move"
+        
+        board.make_move(Move(12, 28, Move.PAWN_TWO_UP_FLAG))
+        assert sorted(book.get_moves(board)) == [("c7c5", 1), ("e7e5", 1)]
+        book.close()
+    
+    print("✓ PGN book builder works")
+
+
+def test_kpk_bitbase():
+    """Test KPK bitbase results and probing from the search"""
+    print("\n=== Test: KPK Bitbase ===")
+    from chess_bot.ai.engine.bitbase import get_kpk_bitbase, KNOWN_WIN_SCORE
+    
+    bitbase = get_kpk_bitbase()
+    
+    # King on the sixth in front of the pawn wins with either side to move
+    assert bitbase.probe(Board("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1")) > KNOWN_WIN_SCORE
+    assert bitbase.probe(Board("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1")) < -KNOWN_WIN_SCORE
+    # Same for black, mirrored
+    assert bitbase.probe(Board("8/8/8/8/4p3/4k3/8/4K3 b - - 0 1")) > KNOWN_WIN_SCORE
+    # Defending king in front of the pawn draws
+    assert bitbase.probe(Board("8/8/8/8/8/4k3/4P3/4K3 w - - 0 1")) == 0
+    # Rook pawn with the defender in the corner draws
+    assert bitbase.probe(Board("k7/8/8/8/8/8/P7/K7 w - - 0 1")) == 0
+    assert bitbase.probe(Board()) is None, "Only KPK positions are probed"
+    
+    # An unwritable cache still yields a bitbase, with a logged warning
+    import logging
+    from chess_bot.ai.engine.bitbase import load_kpk_bitbase, logger as bitbase_logger
+    warnings = []
+    handler = logging.Handler()
+    handler.emit = warnings.append
+    bitbase_logger.addHandler(handler)
+    try:
+        uncached = load_kpk_bitbase("/proc/no-such-dir/KPK.bin")
+    finally:
+        bitbase_logger.removeHandler(handler)
+    assert uncached.bits == bitbase.bits, "Generated bitbase should match the cached one"
+    assert any("Could not cache" in record.getMessage() for record in warnings)
+    
+    # Only Ke4 keeps the win (taking the opposition)
+    board = Board("8/8/4k3/8/8/4K3/4P3/8 w - - 0 1")
+    searcher = Searcher(board)
+    best_move, score, _ = searcher.start_search(1000)
+    print(f"Best move: {best_move.to_uci()}, score: {score}")
+    assert best_move.to_uci() == "e3e4", "Should take the opposition"
+    assert score > KNOWN_WIN_SCORE, "Should report a known win"
+    assert searcher.current_depth > 1, "A won root should keep iterating"
+    
+    # Drawn roots need no deeper search
+    searcher = Searcher(Board("8/8/8/8/8/4k3/4P3/4K3 w - - 0 1"))
+    best_move, score, _ = searcher.start_search(1000)
+    assert score == 0 and searcher.current_depth == 1, "A drawn root should stop after depth 1"
+    
+    print("✓ KPK bitbase works")
+
+
+def test_endgame_recognizers():
+    """Test the material key and endgame recognizer dispatch"""
+    print("\n=== Test: Endgame Recognizers ===")
+    from chess_bot.ai.engine.endgames import material_key, probe_endgame, endgame_scale_factor
+    from chess_bot.ai.engine.evaluation import Evaluation
+    
+    board = Board()
+    assert board.material_key == material_key("KQRRBBNNPPPPPPPP", "KQRRBBNNPPPPPPPP")
+    
+    # Captures and promotions update the key, unmake restores it
+    board = Board("3n4/4P3/8/4k3/8/8/8/4K3 w - - 0 1")
+    start_key = board.material_key
+    capture_promotion = Move(52, 59, Move.PROMOTE_TO_QUEEN_FLAG)
+    board.make_move(capture_promotion)
+    assert board.material_key == material_key("KQ", "K"), "Key after capture-promotion"
+    board.unmake_move(capture_promotion)
+    assert board.material_key == start_key, "Unmake should restore key"
+    
+    # Dead draws are exact
+    assert probe_endgame(Board("8/8/8/4k3/8/8/8/4KN2 w - - 0 1")) == 0
+    assert probe_endgame(Board("8/8/8/4k3/8/8/8/3BK3 b - - 0 1")) == 0
+    assert probe_endgame(Board("8/8/8/4k3/8/8/8/4KNN1 w - - 0 1")) == 0
+    assert probe_endgame(Board("8/8/8/4k3/8/8/8/R3K3 w - - 0 1")) is None, "KRK is searched"
+    assert Evaluation.evaluate(Board("8/8/8/4k3/8/8/8/R3K3 b - - 0 1")) < -10000, "KRK is a known win"
+    
+    # Opposite-coloured bishops scale the evaluation down
+    assert endgame_scale_factor(Board("4k3/pp3b2/8/8/8/8/PPP2B2/4K3 w - - 0 1")) < 1.0
+    assert endgame_scale_factor(Board("4k3/pp2b3/8/8/8/8/PPP2B2/4K3 w - - 0 1")) == 1.0
+    
+    # Winning side promotes rather than staying in KPK
+    searcher = Searcher(Board("8/4P3/8/2k5/8/8/8/4K3 w - - 0 1"))
+    best_move, _, _ = searcher.start_search(1000)
+    print(f"Best move: {best_move.to_uci()}")
+    assert best_move.to_uci() == "e7e8q", "Should promote"
+    
+    print("✓ Endgame recognizers work")
+
+
 def test_search_basic():
     """Test basic search functionality"""
     print("\n=== Test: Basic Search ===")
@@ -207,6 +411,50 @@ def test_move_ordering():
     print("✓ Move ordering works")
 
 
+def test_history_heuristics():
+    """Test history, counter-move and continuation history tables"""
+    print("\n=== Test: History Heuristics ===")
+    from chess_bot.ai.engine.move_ordering import MoveOrdering
+    
+    board = Board()
+    gen = MoveGenerator()
+    ordering = MoveOrdering()
+    
+    prev_move = Move.from_uci("g1f3")
+    board.make_move(prev_move)
+    moves = gen.generate_moves(board)
+    counter_move = next(m for m in moves if m.to_uci() == "g8f6")
+    quiet_move = next(m for m in moves if m.to_uci() == "a7a6")
+    
+    ordering.update_history(counter_move, board, 6, prev_move, [quiet_move])
+    ordered_moves = ordering.order_moves(moves, board, None, ply_from_root=1, prev_move=prev_move)
+    print(f"First move: {ordered_moves[0].to_uci()}, last move: {ordered_moves[-1].to_uci()}")
+    assert ordered_moves[0].value == counter_move.value, "Counter move should be ordered first"
+    assert ordered_moves[-1].value == quiet_move.value, "Failed quiet move should get a malus"
+    
+    # Gravity keeps scores bounded
+    for _ in range(1000):
+        ordering.update_history(counter_move, board, 40, prev_move)
+    assert max(ordering.history) <= MoveOrdering.MAX_HISTORY, "History should stay bounded"
+    
+    prev_piece = board.square[prev_move.target_square]
+    continuation_offset = ordering._continuation_offset(board.white_to_move, prev_piece, prev_move)
+    continuation_before = max(ordering.continuation_history)
+    
+    start = time.time()
+    ordering.age_history()
+    ordering.age_history()
+    aging_ms = (time.time() - start) * 1000
+    print(f"Aging twice took {aging_ms:.1f}ms")
+    assert max(ordering.history) <= MoveOrdering.MAX_HISTORY // 4, "Aging should halve history"
+    assert aging_ms < 10, "Aging should be cheap"
+    # Continuation history is aged when its block is next used
+    assert ordering._continuation_offset(board.white_to_move, prev_piece, prev_move) == continuation_offset
+    assert max(ordering.continuation_history) == continuation_before >> 2, "Aging should halve continuation history"
+    
+    print("✓ History heuristics work")
+
+
 def test_repetition_detection():
     """Test repetition detection"""
     print("\n=== Test: Repetition Detection ===")
@@ -238,9 +486,815 @@ def test_repetition_detection():
     start_key = Zobrist.calculate_zobrist_key(Board())
     print(f"Repetition detected: {rep_table.contains(start_key)}")
     
+    # Seeded from the game history: earlier positions count as repetitions
+    rep_table.init(board.repetition_position_history)
+    assert rep_table.count == 5
+    rep_table.push(Zobrist.calculate_zobrist_key(Board()), False)
+    rep_table.push(board.repetition_position_history[1], False)
+    assert rep_table.contains(board.repetition_position_history[2]), "Game position should repeat"
+    rep_table.pop()
+    rep_table.pop()
+    assert rep_table.count == 5 and rep_table.counts[start_key] == 2
+    
+    # The searcher starts from the board's history
+    searcher = Searcher(board)
+    searcher.start_search(200, depth_limit=1)
+    assert searcher.repetition_table.hashes == board.repetition_position_history
+    
     print("✓ Repetition detection works")
 
 
+def test_time_manager():
+    """Test soft/hard time limits"""
+    print("\n=== Test: Time Manager ===")
+    from chess_bot.ai.engine.time_manager import TimeManager
+    
+    soft_ms, hard_ms = TimeManager.allocate(60000, 1000)
+    print(f"Allocated soft: {soft_ms}ms, hard: {hard_ms}ms")
+    assert 0 < soft_ms <= hard_ms, "Soft limit should not exceed hard limit"
+    assert hard_ms <= 60000 * TimeManager.MAX_CLOCK_FRACTION + 1000, "Hard limit should cap clock usage"
+    
+    # Without a clock, a difficulty's think time is the whole budget
+    from chess_bot.ai.bot_pool import choose_time_limits, DIFFICULTY_THINK_TIME_MS
+    soft_ms, hard_ms = choose_time_limits(None, None, 'hard')
+    assert soft_ms == hard_ms == DIFFICULTY_THINK_TIME_MS['hard'], "Fixed think time should not be halved"
+    
+    # Client clock fields are validated before they reach a search
+    from chess_bot.ai.bot_pool import parse_clock
+    assert parse_clock({"white_time_ms": 60000, "black_time_ms": 30000.0, "move": "e2e4"}) == \
+        {"white_time_ms": 60000, "black_time_ms": 30000}
+    for bad_value in ("fast", None, -1, 1.5, True):
+        try:
+            parse_clock({"white_time_ms": bad_value})
+        except ValueError as e:
+            assert str(e) == "white_time_ms must be a non-negative integer"
+        else:
+            assert False, f"Clock value {bad_value!r} should be rejected"
+    
+    board = Board()
+    searcher = Searcher(board)
+    start = time.time()
+    best_move, eval_score, nodes = searcher.start_search(300)
+    elapsed_ms = (time.time() - start) * 1000
+    print(f"300ms search took {elapsed_ms:.0f}ms")
+    assert best_move is not None, "Should find a move"
+    assert elapsed_ms < 300 + 150, "Search should respect the hard limit"
+    
+    print("✓ Time manager works")
+
+
+def test_principal_variation_search():
+    """Test PVS with aspiration windows finds a simple tactic"""
+    print("\n=== Test: Principal Variation Search ===")
+    board = Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    searcher = Searcher(board)
+    
+    best_move, eval_score, nodes = searcher.start_search(1500)
+    print(f"Best move: {best_move.to_uci()}, eval: {eval_score}, depth: {searcher.current_depth}")
+    assert best_move.to_uci() == "d2d5", "Should capture the hanging queen"
+    assert searcher.current_depth >= Searcher.ASPIRATION_MIN_DEPTH, "Should reach aspiration depths"
+    assert eval_score > 0, "Winning side should have a positive score"
+    
+    print("✓ Principal variation search works")
+
+
+def test_pruning():
+    """Test null move and switchable pruning"""
+    print("\n=== Test: Pruning ===")
+    from chess_bot.ai.engine.pruning import PruningConfig
+    
+    board = Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    initial_fen = board.to_fen()
+    initial_zobrist = board.zobrist_key
+    board.make_null_move()
+    assert not board.white_to_move, "Null move should pass the turn"
+    assert board.zobrist_key != initial_zobrist, "Null move should change zobrist"
+    board.unmake_null_move()
+    assert board.to_fen() == initial_fen, "FEN should be restored"
+    assert board.zobrist_key == initial_zobrist, "Zobrist should be restored"
+    
+    config = PruningConfig.from_dict({'null_move': False})
+    assert not config.null_move and config.futility, "Only null move should be disabled"
+    assert PruningConfig.LMR_TABLE[20][20] > PruningConfig.LMR_TABLE[4][4], "Reductions grow with depth and index"
+    
+    for config in (PruningConfig(), PruningConfig.disabled()):
+        searcher = Searcher(Board(initial_fen), pruning=config)
+        best_move, eval_score, nodes = searcher.start_search(1000)
+        print(f"{config.to_dict()}: {best_move.to_uci()} depth {searcher.current_depth}, {nodes} nodes")
+        assert best_move.to_uci() == "d2d5", "Should capture the hanging queen"
+    
+    print("✓ Pruning works")
+
+
+def test_pondering():
+    """Test ponder hit and ponder miss"""
+    print("\n=== Test: Pondering ===")
+    from chess_bot.ai.engine.bot import Bot
+    
+    fen = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+    bot = Bot(use_opening_book=False)
+    bot.set_position(fen)
+    bot_move, _, _ = bot.think_timed(1000)
+    bot.make_move(bot_move)
+    position_after_bot_move = bot.get_board_fen()
+    
+    assert bot.start_pondering(), "Should start pondering"
+    ponder_move = bot.ponder_move.to_uci()
+    print(f"Bot played {bot_move}, pondering on {ponder_move}")
+    
+    # Miss: board goes back to the position after the bot's move
+    time.sleep(0.2)
+    assert bot.ponder_hit("a7a6" if ponder_move != "a7a6" else "h7h6", 1000) is None, "Should be a ponder miss"
+    assert not bot.is_pondering, "Miss should stop pondering"
+    assert bot.get_board_fen() == position_after_bot_move, "Miss should restore the board"
+    
+    # Hit: answer comes from the running search
+    assert bot.start_pondering(), "Should start pondering again"
+    time.sleep(0.5)
+    start = time.time()
+    result = bot.ponder_hit(bot.ponder_move.to_uci(), 500)
+    elapsed_ms = (time.time() - start) * 1000
+    print(f"Ponder hit answered {result[0] if result else None} in {elapsed_ms:.0f}ms")
+    assert result is not None and result[0], "Ponder hit should return a move"
+    assert elapsed_ms < 250, "Ponder hit should answer from the running search"
+    
+    # Hit straight after the ponder search starts: the real limit still applies
+    bot.set_position(fen)
+    bot.make_move(bot_move)
+    assert bot.start_pondering(), "Should start pondering a third time"
+    start = time.time()
+    result = bot.ponder_hit(bot.ponder_move.to_uci(), 300)
+    elapsed_ms = (time.time() - start) * 1000
+    print(f"Immediate ponder hit answered in {elapsed_ms:.0f}ms")
+    assert result is not None, "Immediate ponder hit should return a move"
+    assert elapsed_ms < 300 + 250, "Immediate ponder hit should respect its time limit"
+    
+    # Through the search scheduler, only the scheduled task's thread yields
+    import threading
+    from functools import partial
+    from chess_bot.ai.bot_pool import BotPool
+    from chess_bot.ai.search_executor import run_job
+    from chess_bot.ai.search_scheduler import SearchScheduler
+    
+    yields = []
+    
+    def scheduled_job(payload, task):
+        task_thread = threading.current_thread()
+        yield_slice = task.yield_slice
+        
+        def recording_yield():
+            yields.append(threading.current_thread() is task_thread)
+            yield_slice()
+        task.yield_slice = recording_yield
+        return run_job(pool, "bot_move", payload, task)
+    
+    pool = BotPool()
+    scheduler = SearchScheduler()
+    # Past the opening book's plies
+    payload = {"game_id": "ponder-game", "difficulty": "hard", "time_ms": 500,
+               "fen": fen.replace(" 4 4", " 4 20")}
+    result = scheduler.submit(partial(scheduled_job, payload)).result(timeout=30)
+    bot = pool.bots["ponder-game"]
+    assert bot.is_pondering, "The bot should ponder after its move"
+    time.sleep(0.2)
+    payload = dict(payload, player_move=bot.ponder_move.to_uci(), fen=bot.get_board_fen())
+    result = scheduler.submit(partial(scheduled_job, payload)).result(timeout=30)
+    bot.stop_pondering()
+    print(f"Scheduled ponder hit: {result['ponder_hit']}, {len(yields)} yields")
+    assert result["ponder_hit"], "Second job should be a ponder hit"
+    assert yields and all(yields), "Only the scheduled thread should yield"
+    
+    print("✓ Pondering works")
+
+
+def test_multipv_analysis():
+    """Test PV extraction and MultiPV root lines"""
+    print("\n=== Test: MultiPV Analysis ===")
+    from chess_bot.ai.engine.bot import Bot
+    
+    bot = Bot(use_opening_book=False)
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    result = bot.analyse(fen, multipv=3, time_ms=3000)
+    
+    for line in result["lines"]:
+        print(f"  {line['move']}: {line['score']} pv {' '.join(line['pv'])}")
+    
+    lines = result["lines"]
+    assert len(lines) == 3, "Should return three lines"
+    assert len({line["move"] for line in lines}) == 3, "Lines should start with different moves"
+    
+    # Every PV starts with its move and is playable
+    generator = MoveGenerator()
+    for line in lines:
+        assert line["pv"][0] == line["move"], "PV should start with the line's move"
+        board = Board(fen)
+        for move_uci in line["pv"]:
+            legal = {move.to_uci(): move for move in generator.generate_moves(board)}
+            assert move_uci in legal, f"Illegal PV move {move_uci}"
+            board.make_move(legal[move_uci])
+    
+    # Every completed iteration is reported as it finishes
+    infos = []
+    result = bot.analyse(fen, multipv=1, time_ms=1000, on_info=infos.append)
+    print(f"Iterations reported: {[info['depth'] for info in infos]}")
+    assert [info["depth"] for info in infos] == list(range(1, result["depth"] + 1)), "One info per depth"
+    assert infos[-1]["lines"] == result["lines"], "Last info should match the result"
+    
+    # Mate is reported in moves
+    result = bot.analyse("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", multipv=2, time_ms=2000)
+    assert result["lines"][0]["move"] == "a1a8" and result["lines"][0]["mate"] == 1, "Should find mate in 1"
+    assert len(result["lines"]) == 2 and result["lines"][1]["mate"] is None
+    
+    print("✓ MultiPV analysis works")
+
+
+def test_search_executor():
+    """Test running bot searches through the search executor"""
+    print("\n=== Test: Search Executor ===")
+    from chess_bot.ai.search_executor import SearchExecutor, ExecutorSaturated
+    
+    payload = {"game_id": "game-1", "difficulty": "easy", "time_ms": 200,
+               "fen": "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"}
+    
+    # Inline mode runs in the calling thread
+    inline = SearchExecutor(num_workers=0)
+    result = inline.run("bot_move", payload)
+    assert result["move"] is not None and not result["ponder_hit"]
+    assert "game-1" in inline.inline_bot_pool.bots, "Bot should stay warm for the game"
+    inline.broadcast("remove_bot", {"game_id": "game-1"})
+    assert "game-1" not in inline.inline_bot_pool.bots
+    
+    # Worker process with a one-job queue
+    executor = SearchExecutor(num_workers=1, max_queue_size=1, slots_per_worker=1)
+    try:
+        futures = [executor.submit("bot_move", payload)]
+        saturated = False
+        for _ in range(3):
+            try:
+                futures.append(executor.submit("bot_move", payload))
+            except ExecutorSaturated as e:
+                saturated = e.retry_after >= 1
+        assert saturated, "Full queue should reject with a retry delay"
+        
+        for future in futures:
+            assert future.result(timeout=60)["move"] is not None
+        
+        stats = executor.get_stats()
+        print(f"Executor stats: {stats}")
+        assert stats["completed"] == len(futures) and stats["rejected"] >= 1
+        
+        # A search that times out takes the player's move back
+        from concurrent.futures import TimeoutError as FuturesTimeoutError
+        from chess_bot.ai.game_session import GameSession
+        session = GameSession("game-2", "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+        fen_before = session.fen
+        session.apply_move("e1g1")
+        timed_out = False
+        try:
+            executor.request_bot_move(session, {
+                "game_id": "game-2", "difficulty": "hard", "time_ms": 5000,
+                "fen": session.fen, "start_fen": session.start_fen,
+                "moves": list(session.moves), "player_move": "e1g1"
+            }, timeout=0.3)
+        except FuturesTimeoutError:
+            timed_out = True
+        assert timed_out, "Search should time out"
+        assert session.fen == fen_before and not session.moves, "Player's move should be taken back"
+        assert session.apply_move("e1g1"), "The same move should be accepted again"
+    finally:
+        executor.shutdown()
+    
+    print("✓ Search executor works")
+
+
+def test_search_cancellation():
+    """Test cancelling searches through a cancel token and the executor"""
+    print("\n=== Test: Search Cancellation ===")
+    import threading
+    from chess_bot.ai.search_executor import SearchExecutor
+    
+    # A token set from another thread stops a long search
+    board = Board()
+    searcher = Searcher(board)
+    searcher.cancel_token = threading.Event()
+    threading.Timer(0.3, searcher.cancel_token.set).start()
+    start = time.time()
+    best_move, _, _ = searcher.start_search(20000)
+    elapsed = time.time() - start
+    print(f"Cancelled search returned {best_move.to_uci() if best_move else None} after {elapsed:.2f}s")
+    assert elapsed < 3, "Search should stop soon after the token is set"
+    
+    # Cancelling a game stops its running job and drops its queued ones
+    executor = SearchExecutor(num_workers=1, slots_per_worker=1)
+    try:
+        payload = {"game_id": "game-1", "difficulty": "hard", "time_ms": 30000,
+                   "fen": Board().to_fen()}
+        running = executor.submit("bot_move", payload)
+        queued = executor.submit("bot_move", payload)
+        deadline = time.time() + 60
+        while not running.running() and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)
+        
+        start = time.time()
+        assert executor.cancel_game("game-1") == 2
+        assert queued.cancelled()
+        running.result(timeout=10)
+        print(f"Running job stopped {time.time() - start:.2f}s after cancel")
+        assert time.time() - start < 5
+    finally:
+        executor.shutdown()
+    
+    print("✓ Search cancellation works")
+
+
+def test_search_scheduler():
+    """Test time-slicing several searches in one thread pool"""
+    print("\n=== Test: Search Scheduler ===")
+    import gc
+    from chess_bot.ai.search_scheduler import SearchScheduler
+    
+    fens = [Board.START_FEN,
+            "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+            "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"]
+    budgets = [1500, 1000, 500, 1500]
+    
+    def make_task(searcher, time_ms):
+        def run(task):
+            searcher.yield_hook = task.yield_slice
+            task.set_budget(time_ms)
+            start = time.time()
+            best_move, _, nodes = searcher.start_search(time_ms)
+            return best_move, nodes, (time.time() - start) * 1000
+        return run
+    
+    searchers = [Searcher(Board(fen)) for fen in fens]
+    # A full garbage collection walks every transposition table and would
+    # stall whichever task triggers it for about a second
+    gc.collect()
+    gc.freeze()
+    try:
+        scheduler = SearchScheduler()
+        start = time.time()
+        futures = [scheduler.submit(make_task(searcher, budget), budget_ms=budget)
+                   for searcher, budget in zip(searchers, budgets)]
+        results = [future.result(timeout=30) for future in futures]
+        total_ms = (time.time() - start) * 1000
+    finally:
+        gc.unfreeze()
+    
+    for budget, (best_move, nodes, elapsed_ms) in zip(budgets, results):
+        print(f"Budget {budget}ms: {best_move.to_uci() if best_move else None}, "
+              f"{nodes} nodes, {elapsed_ms:.0f}ms")
+        assert best_move is not None and nodes > 0, "Every search should get CPU"
+        assert elapsed_ms < budget + 500, "Searches should stop near their deadline"
+    
+    stats = scheduler.get_stats()
+    print(f"Scheduler stats: {stats}, total {total_ms:.0f}ms")
+    assert stats["completed"] == len(fens) and stats["switches"] > len(fens)
+    
+    # A worker with every slot busy leaves its dispatcher asleep, even
+    # when queued jobs may spill at once
+    from chess_bot.ai.search_executor import SearchExecutor
+    executor = SearchExecutor(num_workers=1, slots_per_worker=1, affinity_spill_ms=0)
+    try:
+        payload = {"difficulty": "hard", "time_ms": 1500, "fen": fens[3]}
+        futures = [executor.submit("bot_move", dict(payload, game_id=f"game-{i}")) for i in range(2)]
+        time.sleep(0.5)
+        cpu_start = time.process_time()
+        time.sleep(0.5)
+        dispatcher_cpu_ms = (time.process_time() - cpu_start) * 1000
+        print(f"Dispatcher CPU while the worker is full: {dispatcher_cpu_ms:.0f}ms")
+        assert dispatcher_cpu_ms < 100, "Dispatcher should not spin"
+        for future in futures:
+            assert future.result(timeout=30)["move"] is not None
+    finally:
+        executor.shutdown()
+    
+    print("✓ Search scheduler works")
+
+
+def test_strength_profiles():
+    """Test node-budget and depth-limited difficulty levels"""
+    print("\n=== Test: Strength Profiles ===")
+    import random
+    from chess_bot.ai.engine.bot import Bot
+    from chess_bot.ai.engine.strength import StrengthProfile, get_strength_profile
+    
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    
+    # Node and depth limits end the search, not the clock
+    searcher = Searcher(Board(fen))
+    start = time.time()
+    searcher.start_search(10000, node_limit=500)
+    assert searcher.nodes_searched <= 500 and time.time() - start < 5
+    searcher.start_search(10000, depth_limit=2)
+    assert searcher.current_depth == 2
+    
+    easy = get_strength_profile("easy")
+    bot = Bot(use_opening_book=False)
+    bot.set_strength(easy)
+    assert not bot.ponder_enabled, "Limited profiles shouldn't ponder"
+    legal = {move.to_uci() for move in MoveGenerator().generate_moves(Board(fen))}
+    for _ in range(3):
+        bot.set_position(fen)
+        move, _, nodes = bot.think_timed(10000)
+        print(f"Easy: {move} ({nodes} nodes, depth {bot.searcher.current_depth})")
+        assert move in legal and nodes <= easy.node_limit
+    
+    # Noisy selection stays within the window, and mates are always played
+    lines = [("a", 50, []), ("b", 30, []), ("c", -200, [])]
+    noisy = StrengthProfile("test", eval_noise=100, multipv=3, selection_window=40)
+    rng = random.Random(1)
+    picks = {noisy.choose_line(lines, rng)[0] for _ in range(50)}
+    assert picks == {"a", "b"}, f"Unexpected picks {picks}"
+    mate_lines = [("m", Searcher.IMMEDIATE_MATE_SCORE - 3, []), ("b", 30, [])]
+    assert all(noisy.choose_line(mate_lines, rng)[0] == "m" for _ in range(20))
+    assert get_strength_profile("hard").is_deterministic
+    
+    print("✓ Strength profiles work")
+
+
+def test_think_time_governor():
+    """Test scaling think time by the number of active searches"""
+    print("\n=== Test: Think-Time Governor ===")
+    from chess_bot.ai.engine.governor import ThinkTimeGovernor
+    
+    governor = ThinkTimeGovernor(min_scale=0.25, min_time_ms=100, max_time_ms=10000)
+    # Ignore the host's load average so the test is deterministic
+    governor.LOAD_CHECK_INTERVAL_SECONDS = float("inf")
+    governor.last_load_check = time.time()
+    
+    with governor.track_search():
+        assert governor.adjust_limits(2000, 1000) == (1000, 2000, None), "One search is not scaled"
+        assert governor.adjust_limits(50, 20) == (20, 50, None), "Unscaled budgets below min_time_ms are kept"
+        assert governor.adjust_limits(20000)[1] == 20000, "Unscaled budgets above max_time_ms are kept"
+        governor.record_search(3000, 1500, contended=False)
+        
+        with governor.track_search(), governor.track_search():
+            soft_ms, hard_ms, node_limit = governor.adjust_limits(2000, 1000)
+            print(f"3 active searches: soft {soft_ms}ms, hard {hard_ms}ms, nodes {node_limit}")
+            assert hard_ms == 666 and soft_ms == 333
+            assert node_limit == 2000 * 666 // 1000, "Scaled searches get a node cap"
+            
+            with governor.track_search(), governor.track_search(), governor.track_search():
+                assert governor.adjust_limits(2000)[1] == 500, "Scale is bounded by min_scale"
+                assert governor.adjust_limits(200)[1] == 100, "Time is bounded by min_time_ms"
+                assert governor.adjust_limits(50, 20)[:2] == (20, 50), "Budgets below min_time_ms are never raised"
+    
+    stats = governor.get_stats()
+    print(f"Governor stats: {stats}")
+    assert stats["active_searches"] == 0 and stats["scale"] == 1.0
+    assert stats["scaled_searches"] == 4 and stats["nps_estimate"] == 2000
+    
+    # Under a search scheduler each search keeps its budget: the scheduler
+    # already splits the CPU between them
+    from functools import partial
+    from chess_bot.ai.search_scheduler import SearchScheduler
+    governor = ThinkTimeGovernor(time_sliced=True)
+    governor.LOAD_CHECK_INTERVAL_SECONDS = float("inf")
+    governor.last_load_check = time.time()
+    
+    def governed_search(searcher, task):
+        with governor.track_search():
+            concurrent = governor.active_searches
+            soft_ms, hard_ms, node_limit = governor.adjust_limits(1000, 1000)
+            task.set_budget(hard_ms)
+            searcher.yield_hook = task.yield_slice
+            searcher.start_search(hard_ms, soft_ms, node_limit=node_limit)
+            return concurrent, hard_ms
+    
+    searchers = [Searcher(Board()) for _ in range(2)]
+    scheduler = SearchScheduler()
+    futures = [scheduler.submit(partial(governed_search, searcher), budget_ms=1000)
+               for searcher in searchers]
+    results = [future.result(timeout=30) for future in futures]
+    print(f"Time-sliced searches (active, budget): {results}")
+    assert max(concurrent for concurrent, _ in results) == 2, "Searches should overlap"
+    assert all(hard_ms == 1000 for _, hard_ms in results), "Time-sliced searches should keep their budget"
+    
+    print("✓ Think-time governor works")
+
+
+def test_live_game_session():
+    """Test the session's live board and syncing the bot by move deltas"""
+    print("\n=== Test: Live Game Session ===")
+    from chess_bot.ai.game_session import GameSession
+    from chess_bot.ai.engine.bot import Bot
+    
+    session = GameSession("game-1")
+    board = session.board
+    for move in ["e2e4", "g8f6", "e4e5", "d7d5"]:
+        assert session.apply_move(move), f"{move} should be legal"
+    assert session.apply_move("e1e3") is None, "Illegal moves are rejected"
+    # The double push set the en passant square, so the capture is legal
+    assert session.apply_move("e5d6")
+    assert session.board is board
+    assert session.fen == Board(session.fen).to_fen()
+    
+    session.undo_move()
+    board = session.board
+    assert session.moves == ["e2e4", "g8f6", "e4e5", "d7d5"]
+    assert session.fen == "rnbqkb1r/ppp1pppp/5n2/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3"
+    
+    # Reversible moves keep the repetition history on the live board
+    for move in ["g1f3", "f6g8", "f3g1"]:
+        session.apply_move(move)
+    assert len(board.repetition_position_history) == 4
+    
+    # The bot applies only the moves it hasn't seen
+    bot = Bot(use_opening_book=False)
+    bot.sync_game(session.start_fen, session.moves[:2])
+    bot_board = bot.board
+    bot.sync_game(session.start_fen, session.moves)
+    assert bot.board is bot_board and bot.board.to_fen() == session.fen
+    assert bot.board.repetition_position_history == board.repetition_position_history
+    
+    # A different game rebuilds the board
+    bot.sync_game(session.start_fen, ["d2d4"])
+    assert bot.game_moves == ["d2d4"] and bot.board.to_fen().startswith("rnbqkbnr/pppppppp/8/8/3P4")
+    
+    print("✓ Live game session works")
+
+
+def test_session_backend():
+    """Test session serialization and the in-memory session backend"""
+    print("\n=== Test: Session Backend ===")
+    import json
+    from chess_bot.ai.game_session import GameSession, GameSessionManager, InMemorySessionBackend
+    
+    manager = GameSessionManager(InMemorySessionBackend())
+    expired = []
+    manager.add_expiry_listener(expired.append)
+    
+    game_id = manager.create_game('black', 'easy')
+    session = manager.get_game(game_id)
+    for move in ["e2e4", "g8f6", "g1f3", "f6g8", "f3g1"]:
+        session.apply_move(move)
+    manager.save_game(session)
+    assert manager.get_game(game_id) is session and manager.get_game_count() == 1
+    
+    # A game is changed by one request at a time
+    from chess_bot.ai.game_session import GameLocked
+    with manager.lock_game(game_id):
+        try:
+            with manager.lock_game(game_id):
+                assert False, "A locked game shouldn't be locked again"
+        except GameLocked:
+            pass
+        with manager.lock_game("other-game"):
+            pass
+    with manager.lock_game(game_id):
+        pass
+    
+    # A stored session is rebuilt by replaying its moves
+    restored = GameSession.from_dict(json.loads(json.dumps(session.to_dict())))
+    assert restored.fen == session.fen and restored.moves == session.moves
+    assert restored.difficulty == 'easy' and restored.player_color == 'black'
+    assert restored.board.repetition_position_history == session.board.repetition_position_history
+    
+    # Expired sessions are dropped and reported to listeners
+    session.last_accessed -= 2 * 3600
+    assert manager.get_game(game_id) is None
+    assert expired == [game_id] and manager.get_game_count() == 0
+    assert not manager.delete_game(game_id)
+    
+    print("✓ Session backend works")
+
+
+def test_hash_ring():
+    """Test consistent hashing of games onto search workers"""
+    print("\n=== Test: Hash Ring ===")
+    from chess_bot.ai.hash_ring import HashRing
+    from chess_bot.ai.search_executor import SearchExecutor
+    
+    assert HashRing().get_node("game-1") is None
+    
+    ring = HashRing([0, 1, 2, 3])
+    game_ids = [f"game-{i}" for i in range(2000)]
+    owners = {game_id: ring.get_node(game_id) for game_id in game_ids}
+    counts = [list(owners.values()).count(node) for node in range(4)]
+    print(f"Games per worker: {counts}")
+    assert min(counts) > 250, "Games should spread over every worker"
+    
+    # Removing a worker only moves its own games
+    ring.remove_node(2)
+    for game_id, owner in owners.items():
+        new_owner = ring.get_node(game_id)
+        assert new_owner == owner if owner != 2 else new_owner != 2
+    
+    # Adding it back restores the original owners
+    ring.add_node(2)
+    assert all(ring.get_node(game_id) == owner for game_id, owner in owners.items())
+    
+    # A game's moves keep going to the same worker process
+    executor = SearchExecutor(num_workers=2, slots_per_worker=1)
+    try:
+        payload = {"game_id": "game-1", "difficulty": "easy", "time_ms": 100,
+                   "fen": "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"}
+        for _ in range(3):
+            executor.run("bot_move", payload, timeout=60)
+        stats = executor.get_stats()
+        print(f"Executor stats: {stats}")
+        assert stats["affinity_hits"] == 3 and stats["ring_workers"] == 2
+        assert executor.game_workers["game-1"] == executor.ring.get_node("game-1")
+        executor.broadcast("remove_bot", {"game_id": "game-1"})
+        assert "game-1" not in executor.game_workers
+    finally:
+        executor.shutdown()
+    
+    print("✓ Hash ring works")
+
+
+def test_result_cache():
+    """Test sharing search results between games through the result cache"""
+    print("\n=== Test: Result Cache ===")
+    from chess_bot.ai.engine.bot import Bot
+    from chess_bot.ai.engine.result_cache import ResultCache
+    from chess_bot.ai.engine.strength import get_strength_profile
+    
+    # LRU eviction, deeper results win
+    cache = ResultCache(max_entries=2)
+    boards = [Board(fen) for fen in (Board.START_FEN,
+                                     "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+                                     "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2")]
+    cache.store(boards[0], "hard", 4, 5000, [("e2e4", 30, "e7e5")])
+    cache.store(boards[0], "hard", 3, 800, [("d2d4", 20, None)])
+    assert cache.lookup(boards[0], "hard") is None, "No target to compare against"
+    assert cache.lookup(boards[0], "hard", min_depth=4)["lines"] == [["e2e4", 30, "e7e5"]]
+    assert cache.lookup(boards[0], "hard", min_nodes=5000) is not None
+    assert cache.lookup(boards[0], "easy", min_depth=1) is None
+    cache.store(boards[1], "hard", 4, 5000, [("e7e5", -20, None)])
+    cache.store(boards[2], "hard", 4, 5000, [("g1f3", 25, None)])
+    assert cache.lookup(boards[0], "hard", min_depth=4) is None, "Least recently used entry is evicted"
+    
+    # Shallower than this search would get: search again
+    assert cache.lookup(boards[1], "hard", min_depth=5) is None
+    assert cache.lookup(boards[1], "hard", min_depth=5, min_nodes=6000) is None
+    assert cache.lookup(boards[1], "hard", min_depth=5, min_nodes=4000) is not None
+    
+    # Time-limited searches are compared by the nodes their budget buys
+    from chess_bot.ai.engine.governor import ThinkTimeGovernor
+    bot = Bot(use_opening_book=False)
+    bot.governor = ThinkTimeGovernor()
+    assert bot._search_target(1000, 500) == (None, None), "No speed measured yet"
+    bot.governor.nps_estimate = 10000
+    assert bot._search_target(1000, 500) == (None, 5000)
+    bot.set_strength(get_strength_profile('medium'))
+    assert bot._search_target(1000, 500) == (5, 2000), "Limited profiles stop at their own limits"
+    
+    # A second game reaching the same position gets the move without searching
+    cache = ResultCache()
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    first = Bot(use_opening_book=False)
+    first.result_cache = cache
+    first.set_strength(get_strength_profile('medium'))
+    first.set_position(fen)
+    # A generous time cap, so the profile's limits end the search
+    move, _, nodes = first.think_timed(10000)
+    assert nodes > 0
+    
+    second = Bot(use_opening_book=False)
+    second.result_cache = cache
+    second.set_strength(get_strength_profile('medium'))
+    second.set_position(fen)
+    start = time.time()
+    cached_move, _, cached_nodes = second.think_timed(10000)
+    print(f"Searched {move} in {nodes} nodes, cached {cached_move} in {(time.time() - start) * 1000:.0f}ms")
+    assert cached_nodes == 0 and cache.get_stats()["hits"] == 1
+    assert cached_move in [line[0] for line in cache.lookup(second.board, "medium", 5, 2000)["lines"]]
+    
+    # The cached line's reply gives the bot something to ponder on
+    second.ponder_enabled = True
+    second.make_move(cached_move)
+    assert second.start_pondering(100), "Ponder on the cached line's reply"
+    second.stop_pondering()
+    
+    print("✓ Result cache works")
+
+
+def test_analysis_coalescing():
+    """Test identical analysis requests sharing one search"""
+    print("\n=== Test: Analysis Coalescing ===")
+    from chess_bot.ai.analysis import AnalysisManager
+    
+    def next_final(subscription):
+        while True:
+            event, data = subscription.events.get(timeout=30)
+            if event in ('done', 'error'):
+                return event, data
+    
+    manager = AnalysisManager()
+    assert manager.max_sessions == 1, "One analysis search per web process"
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    first = manager.start_analysis(fen, multipv=2, time_ms=3000)
+    second = manager.start_analysis(fen.replace(" ", "  "), multipv=2, time_ms=3000)
+    assert first and second and first != second
+    assert manager.start_analysis(fen, multipv=1, time_ms=3000) is None, "Different request needs its own search"
+    stats = manager.get_stats()
+    assert stats["searches_started"] == 1 and stats["coalesced_requests"] == 1
+    
+    # One client stopping ends only its own stream
+    time.sleep(0.5)
+    manager.stop_analysis(first)
+    event, _ = next_final(manager.get_analysis(first))
+    assert event == 'done' and manager.get_analysis_count() == 1, "Shared search keeps running"
+    manager.remove_analysis(first)
+    
+    event, result = next_final(manager.get_analysis(second))
+    assert event == 'done' and len(result["lines"]) == 2
+    manager.remove_analysis(second)
+    assert manager.get_analysis_count() == 0 and not manager.subscriptions
+    
+    # The next search reuses the finished search's bot
+    start = time.time()
+    third = manager.start_analysis(fen, multipv=1, time_ms=300)
+    assert (time.time() - start) * 1000 < 100, "Starting an analysis should not wait for a bot"
+    event, _ = next_final(manager.get_analysis(third))
+    bot_stats = manager.get_stats()["bots"]
+    assert event == 'done' and bot_stats["created"] == 1 and bot_stats["reused"] == 1, "Bots should be reused"
+    manager.remove_analysis(third)
+    
+    print("✓ Analysis coalescing works")
+
+
+def test_bot_pool_eviction():
+    """Test LRU, memory-budget and idle eviction in the bot pool"""
+    print("\n=== Test: Bot Pool Eviction ===")
+    from chess_bot.ai.bot_pool import BotPool
+    
+    pool = BotPool(max_bots=2, memory_budget_mb=100000, idle_seconds=3600)
+    first = pool.get_bot("a", "easy")
+    pool.get_bot("b", "easy")
+    assert pool.get_bot("a", "easy") is first, "Bot stays warm for its game"
+    
+    # Full: the least recently used bot goes, not the smallest game_id
+    pool.get_bot("c", "easy")
+    assert list(pool.bots) == ["a", "c"] and pool.evictions["capacity"] == 1
+    
+    # Active games keep their bots
+    pool.active_games.add("a")
+    pool.get_bot("d", "easy")
+    assert list(pool.bots) == ["a", "d"]
+    
+    # Over the memory budget, busy bots are kept and the pool runs over
+    pool.max_bots = 10
+    pool.memory_budget_bytes = first.memory_bytes()
+    pool.get_bot("e", "easy")
+    assert list(pool.bots) == ["a", "e"] and pool.evictions["memory"] == 1
+    assert pool.over_budget == 1
+    
+    # Idle bots release their memory
+    pool.active_games.discard("a")
+    pool.idle_seconds = 0
+    pool.IDLE_CHECK_INTERVAL_SECONDS = 0
+    time.sleep(0.01)
+    pool.evict_idle()
+    stats = pool.get_stats()
+    print(f"Pool stats: {stats}")
+    assert not pool.bots and stats["evictions"]["idle"] == 2 and stats["memory_mb"] == 0
+    
+    # The spare bot counts against the budget, and a new game's bot
+    # makes room for itself
+    pool.idle_seconds = 3600
+    pool.memory_budget_bytes = first.memory_bytes() * 3 // 2
+    pool.get_bot("f", "easy")
+    pool.prepare_spare_bot()
+    assert pool.memory_bytes() == pool.bot_bytes["f"] + pool.spare_bot.memory_bytes()
+    pool.get_bot("g", "easy")
+    assert list(pool.bots) == ["g"] and pool.evictions["memory"] == 2
+    assert pool.spare_bot is None and pool.memory_bytes() <= pool.memory_budget_bytes
+    
+    print("✓ Bot pool eviction works")
+
+
+def test_warmup():
+    """Test the pre-fork warm-up and shared read-only tables"""
+    print("\n=== Test: Warm-up ===")
+    from chess_bot.ai import warmup
+    from chess_bot.ai.bot_pool import BotPool
+    
+    report = warmup.warm_up(freeze=False)
+    print(f"Warm-up: {report}")
+    assert warmup.warm_up() is report, "Warm-up runs once per process"
+    assert report["total_ms"] >= report["opening_book_ms"] and report["frozen_objects"] == 0
+    assert report["memory"]["rss_mb"] > 0 or report["memory"].get("max_rss_mb")
+    
+    # Move generators share one set of tables
+    assert MoveGenerator().num_squares_to_edge is MoveGenerator().num_squares_to_edge
+    assert MoveGenerator.NUM_SQUARES_TO_EDGE[0] == [7, 0, 0, 7, 0, 0, 7, 0]
+    
+    # The spare bot serves the first new game
+    pool = BotPool()
+    pool.prepare_spare_bot()
+    spare = pool.spare_bot
+    assert pool.get_bot("game-1", "easy") is spare and pool.spare_bot is None
+    assert spare.strength.name == "easy"
+    
+    print("✓ Warm-up works")
+
+
 def test_performance():
     """Test performance benchmarks"""
     print("\n=== Test: Performance Benchmark ===")
@@ -298,8 +1352,31 @@ def run_all_tests():
         test_checkmate_detection,
         test_transposition_table,
         test_move_ordering,
+        test_history_heuristics,
         test_repetition_detection,
+        test_compact_opening_book,
+        test_shared_opening_book,
+        test_pgn_book_builder,
+        test_kpk_bitbase,
+        test_endgame_recognizers,
         test_search_basic,
+        test_time_manager,
+        test_principal_variation_search,
+        test_pruning,
+        test_pondering,
+        test_multipv_analysis,
+        test_search_executor,
+        test_search_cancellation,
+        test_search_scheduler,
+        test_strength_profiles,
+        test_think_time_governor,
+        test_live_game_session,
+        test_session_backend,
+        test_hash_ring,
+        test_result_cache,
+        test_analysis_coalescing,
+        test_bot_pool_eviction,
+        test_warmup,
         test_performance,
     ]
     